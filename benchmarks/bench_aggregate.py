@@ -0,0 +1,55 @@
+"""Range sums with AggregateTreapMap against scanning.
+
+Usage: python benchmarks/bench_aggregate.py [n]
+"""
+
+from __future__ import annotations
+import gc
+import operator
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.aggregate_treap_map import AggregateTreapMap
+from py_treaps.priorities import RandomPriorities
+
+
+def main(n: int) -> None:
+    gc.disable()
+    treap = AggregateTreapMap.from_sorted(
+        ((i, i % 1000) for i in range(n)), op=operator.add, identity=0,
+        priorities=RandomPriorities(0, bits=32),
+    )
+    rng = random.Random(0)
+    for width in (100, 10000, n // 2):
+        if width >= n:
+            # a window as wide as the map leaves no room to place it
+            continue
+        ranges = []
+        for _ in range(10):
+            lo = rng.randrange(n - width)
+            ranges.append((lo, lo + width))
+
+        start = time.perf_counter()
+        scanned = [sum(value for key, value in treap.items() if lo <= key < hi) for lo, hi in ranges]
+        full_scan = (time.perf_counter() - start) / len(ranges)
+
+        start = time.perf_counter()
+        windowed = [sum(treap.values(lo, hi)) for lo, hi in ranges]
+        range_scan = (time.perf_counter() - start) / len(ranges)
+
+        start = time.perf_counter()
+        aggregated = [treap.aggregate(lo, hi) for lo, hi in ranges]
+        aggregate = (time.perf_counter() - start) / len(ranges)
+
+        assert scanned == windowed == aggregated
+        print(
+            f"width {width:>8}: full scan {full_scan * 1e3:9.2f} ms   "
+            f"range scan {range_scan * 1e3:9.3f} ms   aggregate {aggregate * 1e6:7.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,53 @@
+"""Batched insert_many against a loop of inserts.
+
+Usage: python benchmarks/bench_batch_insert.py [n]
+
+A map of n keys receives batches of different sizes, half of whose
+keys are already present.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def fresh(n: int) -> TreapMap:
+    return TreapMap.from_sorted(
+        ((2 * i, i) for i in range(n)), priorities=RandomPriorities(0, bits=32)
+    )
+
+
+def main(n: int) -> None:
+    gc.disable()
+    rng = random.Random(0)
+    for batch_size in (100, 1000, 10000, 100000):
+        if batch_size > n:
+            break
+        batch = [(rng.randrange(2 * n), 0) for _ in range(batch_size)]
+
+        treap = fresh(n)
+        start = time.perf_counter()
+        for key, value in batch:
+            treap.insert(key, value)
+        loop = time.perf_counter() - start
+
+        treap = fresh(n)
+        start = time.perf_counter()
+        treap.insert_many(batch)
+        batched = time.perf_counter() - start
+
+        print(
+            f"batch {batch_size:>7}: insert loop {loop / batch_size * 1e6:7.2f} us/key"
+            f"   insert_many {batched / batch_size * 1e6:7.2f} us/key"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
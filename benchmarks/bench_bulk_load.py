@@ -0,0 +1,44 @@
+"""Build time for n inserts against the linear-time bulk load.
+
+Usage: python benchmarks/bench_bulk_load.py [n]
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def timed(label: str, build) -> None:
+    start = time.perf_counter()
+    treap = build()
+    print(f"{label:>28}: {time.perf_counter() - start:7.3f}s  ({len(treap)} keys)")
+
+
+def main(n: int) -> None:
+    gc.disable()
+    items = [(i, i) for i in range(n)]
+    shuffled = items[:]
+    random.Random(0).shuffle(shuffled)
+
+    def insert_loop():
+        treap = TreapMap(priorities=RandomPriorities(0, bits=32))
+        for key, value in shuffled:
+            treap.insert(key, value)
+        return treap
+
+    timed("insert loop (shuffled)", insert_loop)
+    timed("from_sorted (sorted)", lambda: TreapMap.from_sorted(
+        items, priorities=RandomPriorities(0, bits=32)))
+    timed("from_sorted (shuffled)", lambda: TreapMap.from_sorted(
+        shuffled, priorities=RandomPriorities(0, bits=32)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
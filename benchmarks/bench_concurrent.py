@@ -0,0 +1,97 @@
+"""ConcurrentTreapMap against a TreapMap behind one global lock.
+
+Usage: python benchmarks/bench_concurrent.py [n] [threads]
+
+Each thread runs a stream of operations where the given share are
+writes (insert or remove) and the rest are lookups. Reported are the
+total throughput and the 99th percentile lookup latency. Under the GIL
+threads do not run Python code in parallel, so the difference comes
+from readers no longer queueing behind writers.
+"""
+
+from __future__ import annotations
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.concurrent_treap_map import ConcurrentTreapMap
+from py_treaps.persistent_treap_map import PersistentTreapMap
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+OPS_PER_THREAD = 20000
+
+
+class LockedTreapMap:
+    """The baseline: every call on a TreapMap holds one lock."""
+
+    def __init__(self, treap: TreapMap):
+        self.treap = treap
+        self.lock = threading.Lock()
+
+    def lookup(self, key):
+        with self.lock:
+            return self.treap.lookup(key)
+
+    def insert(self, key, value):
+        with self.lock:
+            self.treap.insert(key, value)
+
+    def remove(self, key):
+        with self.lock:
+            return self.treap.remove(key)
+
+
+def run(treap, n: int, threads: int, write_share: float) -> tuple:
+    latencies = []
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        clock = time.perf_counter
+        mine = []
+        for _ in range(OPS_PER_THREAD):
+            key = rng.randrange(2 * n)
+            if rng.random() < write_share:
+                if rng.random() < 0.5:
+                    treap.insert(key, key)
+                else:
+                    treap.remove(key)
+            else:
+                start = clock()
+                treap.lookup(key)
+                mine.append(clock() - start)
+        latencies.extend(mine)
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+    return threads * OPS_PER_THREAD / elapsed, p99
+
+
+def main(n: int, threads: int) -> None:
+    items = [(i, i) for i in range(0, 2 * n, 2)]
+    print(f"n = {n}, {threads} threads, {OPS_PER_THREAD} ops each")
+    for write_share in (0.01, 0.1, 0.5):
+        locked = LockedTreapMap(TreapMap.from_sorted(items, priorities=RandomPriorities(0, bits=32)))
+        concurrent: ConcurrentTreapMap = ConcurrentTreapMap(RandomPriorities(0, bits=32))
+        concurrent.apply(lambda version: PersistentTreapMap.from_sorted(items, version.priorities))
+        for name, treap in (("global lock", locked), ("concurrent", concurrent)):
+            throughput, p99 = run(treap, n, threads, write_share)
+            print(f"{write_share:4.0%} writes, {name:>11}: {throughput:9.0f} ops/s, "
+                  f"p99 lookup {p99 * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10**5,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
@@ -0,0 +1,67 @@
+"""Seek-then-step access: cursors against a fresh lookup per step.
+
+Usage: python benchmarks/bench_cursor.py [n]
+
+Each query finds a key and then reads its next 8 neighbours. The
+baseline looks every neighbour up from the root. A second test seeks
+from key to key a short distance apart, against seeking from the root.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+STEPS = 8
+
+
+def main(n: int) -> None:
+    gc.disable()
+    treap = TreapMap.from_sorted(((i, i) for i in range(n)), priorities=RandomPriorities(0, bits=32))
+    rng = random.Random(0)
+    starts = [rng.randrange(n - STEPS) for _ in range(20000)]
+
+    start = time.perf_counter()
+    for key in starts:
+        for offset in range(STEPS + 1):
+            treap.lookup(key + offset)
+    lookups = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cursor = treap.cursor()
+    for key in starts:
+        cursor.seek(key)
+        for _ in range(STEPS):
+            cursor.next()
+            cursor.value
+    stepping = time.perf_counter() - start
+
+    targets = [0]
+    for _ in range(20000):
+        targets.append((targets[-1] + rng.randrange(1, 64)) % n)
+    start = time.perf_counter()
+    for key in targets:
+        treap.cursor(key)
+    from_root = time.perf_counter() - start
+    start = time.perf_counter()
+    cursor = treap.cursor()
+    for key in targets:
+        cursor.seek(key)
+    finger = time.perf_counter() - start
+
+    queries = len(starts)
+    print(f"n = {n}, {queries} queries of 1 + {STEPS} keys")
+    print(f"lookup per key  {lookups / queries * 1e6:6.2f} us/query")
+    print(f"seek then next  {stepping / queries * 1e6:6.2f} us/query")
+    print(f"seeks ~32 keys apart: from root {from_root / len(targets) * 1e6:5.2f} us, "
+          f"finger {finger / len(targets) * 1e6:5.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,74 @@
+"""Compare the object-node TreapMap with the array-backed ArrayTreapMap.
+
+Usage: python benchmarks/bench_engines.py [n]
+
+Reports seconds for n random inserts, n lookups, one full iteration and
+n removes, plus the memory held by the filled map.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from py_treaps.array_treap_map import ArrayTreapMap
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def memory_used(factory, keys) -> int:
+    # measured on a separate build: tracemalloc distorts the timings
+    gc.collect()
+    tracemalloc.start()
+    treap = factory()
+    for key in keys:
+        treap.insert(key, key)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory
+
+
+def run(name: str, factory, keys) -> None:
+    memory = memory_used(factory, keys)
+
+    start = time.perf_counter()
+    treap = factory()
+    for key in keys:
+        treap.insert(key, key)
+    insert = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        treap.lookup(key)
+    lookup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in treap:
+        pass
+    iterate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        treap.remove(key)
+    remove = time.perf_counter() - start
+
+    print(
+        f"{name:>14}: insert {insert:7.3f}s  lookup {lookup:7.3f}s  "
+        f"iterate {iterate:7.3f}s  remove {remove:7.3f}s  "
+        f"{memory / len(keys):6.1f} B/entry"
+    )
+
+
+def main(n: int) -> None:
+    keys = list(range(n))
+    random.Random(0).shuffle(keys)
+    run("TreapMap", lambda: TreapMap(priorities=RandomPriorities(0, bits=32)), keys)
+    run("ArrayTreapMap", lambda: ArrayTreapMap(priorities=RandomPriorities(0, bits=32)), keys)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,59 @@
+"""Cost of operation counters: never enabled, enabled, and disabled again.
+
+Usage: python benchmarks/bench_instrumentation.py [n]
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.instrumentation import OperationHistogram, instrument, uninstrument
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def workload(treap: TreapMap, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        treap.insert(key, key)
+    for key in keys:
+        treap.lookup(key)
+    for key in keys:
+        treap.remove(key)
+    return time.perf_counter() - start
+
+
+def main(n: int) -> None:
+    gc.disable()
+    keys = list(range(n))
+    random.Random(0).shuffle(keys)
+
+    plain = workload(TreapMap(priorities=RandomPriorities(0, bits=32)), keys)
+
+    treap = TreapMap(priorities=RandomPriorities(0, bits=32))
+    histogram = OperationHistogram()
+    instrument(treap, histogram)
+    enabled = workload(treap, keys)
+    uninstrument(treap)
+    disabled = workload(treap, keys)
+    # a fresh map after the same allocations, to separate heap effects
+    fresh = workload(TreapMap(priorities=RandomPriorities(0, bits=32)), keys)
+
+    print(f"n = {n}, insert + lookup + remove of every key")
+    print(f"never instrumented {plain:7.3f}s")
+    print(f"instrumented       {enabled:7.3f}s")
+    print(f"uninstrumented     {disabled:7.3f}s")
+    print(f"fresh map again    {fresh:7.3f}s")
+    for operation in ("insert", "lookup", "remove"):
+        print(f"{operation:>7}: mean nodes visited "
+              f"{histogram.mean(operation, 'nodes_visited'):5.1f}, p99 "
+              f"{histogram.percentile(operation, 'nodes_visited', 99)}, mean rotations "
+              f"{histogram.mean(operation, 'rotations'):4.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**5)
@@ -0,0 +1,42 @@
+"""Scanning a 1,000-key window with irange against a full walk.
+
+Usage: python benchmarks/bench_irange.py [n]
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def main(n: int, window: int = 1000) -> None:
+    gc.disable()
+    treap = TreapMap.from_sorted(
+        ((i, i) for i in range(n)), priorities=RandomPriorities(0, bits=32)
+    )
+    lo = random.Random(0).randrange(n - window)
+    hi = lo + window
+
+    start = time.perf_counter()
+    walked = [key for key in treap if lo <= key < hi]
+    walk = time.perf_counter() - start
+
+    repeat = 100
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ranged = list(treap.irange(lo, hi))
+    irange = (time.perf_counter() - start) / repeat
+    assert ranged == walked
+
+    print(f"n = {n}, window = {window}")
+    print(f"full walk {walk * 1e3:10.2f} ms   irange {irange * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,112 @@
+"""Per-operation cost of the iterative hot paths against the old
+recursive versions.
+
+Usage: python benchmarks/bench_iterative.py [n]
+
+The recursive functions below are the TreapMap implementations that the
+loops replaced, kept here as the baseline.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def recursive_lookup(key, current_node):
+    if not current_node:
+        return None
+    elif current_node.key == key:
+        return current_node
+    elif key < current_node.key:
+        return recursive_lookup(key, current_node.left_child)
+    else:
+        return recursive_lookup(key, current_node.right_child)
+
+
+def recursive_insert(treap, key, value, current_node):
+    if key < current_node.key:
+        if current_node.left_child is not None:
+            return recursive_insert(treap, key, value, current_node.left_child)
+        current_node.left_child = treap.node_type(
+            key, value, parent=current_node, priority=treap.priorities(key)
+        )
+        return current_node.left_child
+    elif key > current_node.key:
+        if current_node.right_child is not None:
+            return recursive_insert(treap, key, value, current_node.right_child)
+        current_node.right_child = treap.node_type(
+            key, value, parent=current_node, priority=treap.priorities(key)
+        )
+        return current_node.right_child
+    else:
+        current_node.value = value
+        return current_node
+
+
+def recursive_traverse(current_node):
+    if current_node.left_child is not None:
+        yield from recursive_traverse(current_node.left_child)
+    yield current_node.key
+    if current_node.right_child is not None:
+        yield from recursive_traverse(current_node.right_child)
+
+
+def per_op(seconds: float, n: int) -> str:
+    return f"{seconds / n * 1e9:8.0f} ns/op"
+
+
+def main(n: int) -> None:
+    # collector passes over millions of live nodes would swamp the timings
+    gc.disable()
+    keys = list(range(n))
+    random.Random(0).shuffle(keys)
+
+    old = TreapMap(priorities=RandomPriorities(0, bits=32))
+    start = time.perf_counter()
+    for key in keys:
+        if old.root is None:
+            old.insert(key, key)
+        else:
+            old.priority_reorder(recursive_insert(old, key, key, old.root))
+            old.size += 1
+    old_insert = time.perf_counter() - start
+
+    new = TreapMap(priorities=RandomPriorities(0, bits=32))
+    start = time.perf_counter()
+    for key in keys:
+        new.insert(key, key)
+    new_insert = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        recursive_lookup(key, old.root)
+    old_lookup = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys:
+        new.lookup(key)
+    new_lookup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in recursive_traverse(old.root):
+        pass
+    old_iter = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in new:
+        pass
+    new_iter = time.perf_counter() - start
+
+    print(f"n = {n}")
+    print(f"insert   recursive {per_op(old_insert, n)}   iterative {per_op(new_insert, n)}")
+    print(f"lookup   recursive {per_op(old_lookup, n)}   iterative {per_op(new_lookup, n)}")
+    print(f"iterate  recursive {per_op(old_iter, n)}   iterative {per_op(new_iter, n)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
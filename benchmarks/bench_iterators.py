@@ -0,0 +1,42 @@
+"""Full-map iteration: traverse against the checked iterators.
+
+Usage: python benchmarks/bench_iterators.py [n]
+"""
+
+from __future__ import annotations
+import gc
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def timed(iterator) -> float:
+    start = time.perf_counter()
+    deque(iterator, maxlen=0)
+    return time.perf_counter() - start
+
+
+def main(n: int) -> None:
+    gc.disable()
+    treap = TreapMap.from_sorted(((i, i) for i in range(n)), priorities=RandomPriorities(0, bits=32))
+    cases = [
+        ("traverse(root)", lambda: treap.traverse(treap.root)),
+        ("iter", lambda: iter(treap)),
+        ("reversed", lambda: reversed(treap)),
+        ("items()", lambda: treap.items()),
+        ("values(reverse)", lambda: treap.values(reverse=True)),
+        ("irange(-1, n)", lambda: treap.irange(-1, n)),
+    ]
+    print(f"n = {n}")
+    for name, make in cases:
+        best = min(timed(make()) for _ in range(3))
+        print(f"{name:>16}: {best:7.3f}s  {best / n * 1e9:6.0f} ns/key")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,63 @@
+"""Join throughput: spine merging against the old sentinel-root join.
+
+Usage: python benchmarks/bench_join.py [n]
+
+Each round splits a map at a random key and joins the halves back
+together. The old join, reproduced below, hung both trees under a
+'dummy' node with the maximum priority and rotated it down via remove.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def sentinel_join(self: TreapMap, other: TreapMap) -> None:
+    if self.root is None:
+        self.root, self.size = other.root, other.size
+        return
+    if other.root is None:
+        return
+    dummy_root = self.node_type(
+        key='dummy', value=None, priority=self.priorities.max_priority
+    )
+    if self.root.key < other.root.key:
+        dummy_root.left_child, dummy_root.right_child = self.root, other.root
+    else:
+        dummy_root.left_child, dummy_root.right_child = other.root, self.root
+    self.root.parent = dummy_root
+    other.root.parent = dummy_root
+    self._update_node(dummy_root)
+    self.root = dummy_root
+    self.size = dummy_root.size
+    self.remove(key='dummy')
+
+
+def main(n: int, count: int = 5000) -> None:
+    gc.disable()
+    for name, join in (("sentinel join", sentinel_join), ("spine merge", TreapMap.join)):
+        treap = TreapMap.from_sorted(
+            ((i, i) for i in range(n)), priorities=RandomPriorities(0, bits=32)
+        )
+        rng = random.Random(0)
+        joining = 0.0
+        for _ in range(count):
+            left, right = treap.split(rng.randrange(n))
+            start = time.perf_counter()
+            join(left, right)
+            joining += time.perf_counter() - start
+            treap = left
+        assert len(treap) == n
+        print(f"{name:>14}: {joining / count * 1e6:7.2f} us per join, "
+              f"{count / joining:10.0f} joins/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
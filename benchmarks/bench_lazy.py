@@ -0,0 +1,59 @@
+"""Range add and assign: LazyTreapMap against writing every value.
+
+Usage: python benchmarks/bench_lazy.py [n]
+
+Each update covers a random range of about a tenth of the keys. The
+baseline walks the range with `items` and reinserts each key.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.lazy_treap_map import LazyTreapMap
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def main(n: int) -> None:
+    gc.disable()
+    items = [(i, 0) for i in range(n)]
+    plain = TreapMap.from_sorted(items, priorities=RandomPriorities(0, bits=32))
+    lazy = LazyTreapMap.from_sorted(items, priorities=RandomPriorities(0, bits=32))
+    rng = random.Random(0)
+    ranges = []
+    for _ in range(200):
+        lo = rng.randrange(n - n // 10)
+        ranges.append((lo, lo + n // 10))
+
+    start = time.perf_counter()
+    for lo, hi in ranges[:20]:
+        for key, value in list(plain.items(lo, hi)):
+            plain.insert(key, value + 1)
+    eager = (time.perf_counter() - start) / 20
+
+    start = time.perf_counter()
+    for i, (lo, hi) in enumerate(ranges):
+        if i % 2:
+            lazy.add_range(1, lo, hi)
+        else:
+            lazy.assign_range(i, lo, hi)
+    deferred = (time.perf_counter() - start) / len(ranges)
+
+    start = time.perf_counter()
+    for lo, hi in ranges:
+        lazy.lookup((lo + hi) // 2)
+    lookup = (time.perf_counter() - start) / len(ranges)
+
+    print(f"n = {n}, ranges of {n // 10} keys")
+    print(f"rewrite each value  {eager * 1e3:10.2f} ms per update")
+    print(f"add/assign_range    {deferred * 1e3:10.4f} ms per update")
+    print(f"lookup after        {lookup * 1e6:10.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
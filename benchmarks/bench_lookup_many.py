@@ -0,0 +1,50 @@
+"""Batched lookup_many against a loop of lookups.
+
+Usage: python benchmarks/bench_lookup_many.py [n]
+
+Batches are drawn from a window of the key space: density is the
+fraction of the map's key range that the window spans, so dense batches
+share long search-path prefixes.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def main(n: int) -> None:
+    gc.disable()
+    treap = TreapMap.from_sorted(
+        ((i, i) for i in range(n)), priorities=RandomPriorities(0, bits=32)
+    )
+    rng = random.Random(0)
+    print(f"{'batch':>8} {'window':>8} {'loop us/key':>12} {'many us/key':>12}")
+    for batch_size in (10, 100, 1000, 10000):
+        for density in (0.001, 0.1, 1.0):
+            window = min(n, max(batch_size, int(n * density)))
+            start_key = rng.randrange(n - window + 1)
+            batch = sorted(rng.randrange(start_key, start_key + window) for _ in range(batch_size))
+            repeat = max(1, 20000 // batch_size)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                [treap.lookup(key) for key in batch]
+            loop = (time.perf_counter() - start) / (repeat * batch_size)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                treap.lookup_many(batch)
+            many = (time.perf_counter() - start) / (repeat * batch_size)
+
+            print(f"{batch_size:>8} {window:>8} {loop * 1e6:>12.2f} {many * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
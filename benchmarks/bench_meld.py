@@ -0,0 +1,49 @@
+"""meld against inserting every key of the smaller map into the larger.
+
+Usage: python benchmarks/bench_meld.py [n]
+
+The larger map holds n keys; the smaller holds m keys drawn from the
+same key space, from very skewed (m = 100) to balanced (m = n).
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def build(keys, seed) -> TreapMap:
+    return TreapMap.from_sorted(
+        ((key, key) for key in sorted(keys)), priorities=RandomPriorities(seed, bits=32)
+    )
+
+
+def main(n: int) -> None:
+    gc.disable()
+    rng = random.Random(0)
+    large_keys = rng.sample(range(4 * n), n)
+    for m in (100, n // 100, n // 10, n):
+        small_keys = rng.sample(range(4 * n), m)
+
+        large, small = build(large_keys, 1), build(small_keys, 2)
+        start = time.perf_counter()
+        for key, value in small.items():
+            large.insert(key, value)
+        loop = time.perf_counter() - start
+
+        large, small = build(large_keys, 1), build(small_keys, 2)
+        start = time.perf_counter()
+        large.meld(small)
+        meld = time.perf_counter() - start
+
+        print(f"n = {n:>8}, m = {m:>8}: insert loop {loop * 1e3:9.2f} ms   meld {meld * 1e3:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,56 @@
+"""floor/ceiling against scanning the map for the nearest key.
+
+Usage: python benchmarks/bench_nearest.py [n]
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def scan_floor(treap: TreapMap, key):
+    best = None
+    for other in treap:
+        if key < other:
+            break
+        best = other
+    return (best, treap[best]) if best is not None else None
+
+
+def main(n: int) -> None:
+    gc.disable()
+    treap = TreapMap.from_sorted(
+        ((i, i) for i in range(0, 2 * n, 2)), priorities=RandomPriorities(0, bits=32)
+    )
+    rng = random.Random(0)
+    queries = [rng.randrange(2 * n) for _ in range(20)]
+
+    start = time.perf_counter()
+    scanned = [scan_floor(treap, key) for key in queries]
+    scan = (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    found = [treap.floor(key) for key in queries]
+    floor = (time.perf_counter() - start) / len(queries)
+    assert scanned == found
+
+    many = [rng.randrange(2 * n) for _ in range(100000)]
+    start = time.perf_counter()
+    for key in many:
+        treap.ceiling(key)
+    ceiling = (time.perf_counter() - start) / len(many)
+
+    print(f"n = {n}")
+    print(f"floor by iteration {scan * 1e6:12.1f} us")
+    print(f"floor()            {floor * 1e6:12.2f} us")
+    print(f"ceiling()          {ceiling * 1e6:12.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
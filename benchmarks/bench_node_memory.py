@@ -0,0 +1,74 @@
+"""Bytes-per-entry of the TreapNode layouts.
+
+Usage: python benchmarks/bench_node_memory.py [n ...]
+
+Each layout is measured by allocating `n` nodes linked into a complete
+binary tree. Keys and values are allocated before measuring starts, so
+the numbers are the per-entry cost of the node objects themselves.
+"""
+
+from __future__ import annotations
+import gc
+import sys
+import tracemalloc
+from typing import List, Optional
+
+sys.path.insert(0, ".")
+
+from py_treaps.treap_node import SlimTreapNode, TreapNode
+
+
+class DictTreapNode:
+    """The pre-__slots__ TreapNode layout, kept here for comparison."""
+
+    def __init__(self, key, value, parent=None, priority=None):
+        self.key = key
+        self.value = value
+        self.priority = priority
+        self.parent = parent
+        self.left_child = None
+        self.right_child = None
+
+
+def build(node_type, keys: List[int], value: object) -> List[object]:
+    nodes = [node_type(k, value, priority=0) for k in keys]
+    for i, node in enumerate(nodes):
+        left, right = 2 * i + 1, 2 * i + 2
+        if left < len(nodes):
+            node.left_child = nodes[left]
+            nodes[left].parent = node
+        if right < len(nodes):
+            node.right_child = nodes[right]
+            nodes[right].parent = node
+    return nodes
+
+
+def bytes_per_entry(node_type, n: int) -> float:
+    keys = list(range(1000, 1000 + n))
+    value = object()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes: Optional[List[object]] = build(node_type, keys, value)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding the nodes is not part of the tree
+    list_bytes = sys.getsizeof(nodes)
+    nodes = None
+    return (after - before - list_bytes) / n
+
+
+def main(sizes: List[int]) -> None:
+    layouts = [
+        ("dict (old)", DictTreapNode),
+        ("TreapNode", TreapNode),
+        ("SlimTreapNode", SlimTreapNode),
+    ]
+    print(f"{'n':>10} " + " ".join(f"{name:>14}" for name, _ in layouts))
+    for n in sizes:
+        row = [bytes_per_entry(node_type, n) for _, node_type in layouts]
+        print(f"{n:>10} " + " ".join(f"{b:>14.1f}" for b in row))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10**5, 10**6])
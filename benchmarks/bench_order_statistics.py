@@ -0,0 +1,51 @@
+"""rank/select against iterating the map and counting.
+
+Usage: python benchmarks/bench_order_statistics.py [n]
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+from itertools import islice
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def main(n: int) -> None:
+    gc.disable()
+    treap = TreapMap.from_sorted(
+        ((i, i) for i in range(n)), priorities=RandomPriorities(0, bits=32)
+    )
+    rng = random.Random(0)
+    queries = [rng.randrange(n) for _ in range(20)]
+
+    start = time.perf_counter()
+    for i in queries:
+        next(islice(treap, i, None))
+    scan_select = (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    for i in queries:
+        treap.select(i)
+    select = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    for key in queries:
+        sum(1 for other in treap if other < key)
+    scan_rank = (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    for key in queries:
+        treap.rank(key)
+    rank = (time.perf_counter() - start) / len(queries)
+
+    print(f"n = {n}")
+    print(f"select: iterate {scan_select * 1e6:12.1f} us   select {select * 1e6:8.2f} us")
+    print(f"rank:   iterate {scan_rank * 1e6:12.1f} us   rank   {rank * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,88 @@
+"""PersistentTreapMap snapshots against copying a mutable TreapMap.
+
+Usage: python benchmarks/bench_persistent.py [n]
+
+A map of n keys takes 1000 updates, and a snapshot is kept after every
+100th. The mutable map snapshots with `copy()`; the persistent map keeps
+its old versions. Memory is what the snapshots hold beyond the live map.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from py_treaps.persistent_treap_map import PersistentTreapMap
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+UPDATES = 1000
+EVERY = 100
+
+
+def run_mutable(n: int, updates) -> tuple:
+    treap = TreapMap.from_sorted(((i, i) for i in range(n)), priorities=RandomPriorities(0, bits=32))
+    start = time.perf_counter()
+    for key, value in updates:
+        treap.insert(key, value)
+    plain = time.perf_counter() - start
+
+    snapshots = []
+    start = time.perf_counter()
+    for i, (key, value) in enumerate(updates, 1):
+        treap.insert(key, value)
+        if i % EVERY == 0:
+            snapshots.append(treap.copy())
+    with_snapshots = time.perf_counter() - start
+    return plain, with_snapshots, snapshots
+
+
+def run_persistent(n: int, updates) -> tuple:
+    treap = PersistentTreapMap.from_sorted(((i, i) for i in range(n)), RandomPriorities(0, bits=32))
+    start = time.perf_counter()
+    for key, value in updates:
+        treap = treap.insert(key, value)
+    plain = time.perf_counter() - start
+
+    snapshots = []
+    start = time.perf_counter()
+    for i, (key, value) in enumerate(updates, 1):
+        treap = treap.insert(key, value)
+        if i % EVERY == 0:
+            snapshots.append(treap.snapshot())
+    with_snapshots = time.perf_counter() - start
+    return plain, with_snapshots, snapshots
+
+
+def snapshot_memory(run, n: int, updates) -> int:
+    gc.collect()
+    tracemalloc.start()
+    _, _, snapshots = run(n, updates)
+    held = tracemalloc.get_traced_memory()[0]
+    del snapshots[:-1]
+    gc.collect()
+    held -= tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held
+
+
+def main(n: int) -> None:
+    gc.disable()
+    rng = random.Random(0)
+    updates = [(rng.randrange(2 * n), i) for i in range(UPDATES)]
+
+    print(f"n = {n}, {UPDATES} updates, snapshot every {EVERY}")
+    for name, run in (("TreapMap + copy()", run_mutable), ("PersistentTreapMap", run_persistent)):
+        plain, with_snapshots, _ = run(n, updates)
+        memory = snapshot_memory(run, n, updates)
+        print(f"{name:>20}: updates {plain / UPDATES * 1e6:7.1f} us each, "
+              f"with snapshots {with_snapshots:7.3f}s, "
+              f"{UPDATES // EVERY - 1} older snapshots hold {memory / 2**20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**5)
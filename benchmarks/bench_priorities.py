@@ -0,0 +1,47 @@
+"""First-insert latency and insert throughput for each priority source.
+
+Usage: python benchmarks/bench_priorities.py [n]
+
+The pooled source is limited to `TreapNode.MAX_PRIORITY` nodes per
+process, so it is only run while `n` fits in the pool.
+"""
+
+from __future__ import annotations
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import HashPriorities, PooledPriorities, RandomPriorities
+from py_treaps.treap_map import TreapMap
+from py_treaps.treap_node import TreapNode
+
+
+def run(name: str, source, keys) -> None:
+    treap = TreapMap(priorities=source)
+    start = time.perf_counter()
+    treap.insert(keys[0], keys[0])
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys[1:]:
+        treap.insert(key, key)
+    rest = time.perf_counter() - start
+    print(
+        f"{name:>22}: first insert {first * 1e6:9.1f} us, "
+        f"{len(keys) / (first + rest):10.0f} inserts/s"
+    )
+
+
+def main(n: int) -> None:
+    keys = list(range(n))
+    random.Random(0).shuffle(keys)
+    if n <= TreapNode.MAX_PRIORITY:
+        run("PooledPriorities", PooledPriorities(), keys)
+    run("RandomPriorities(16)", RandomPriorities(seed=0), keys)
+    run("RandomPriorities(32)", RandomPriorities(seed=0, bits=32), keys)
+    run("HashPriorities(32)", HashPriorities(), keys)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,60 @@
+"""TreapSequence against list for edits in the middle of a long sequence.
+
+Usage: python benchmarks/bench_sequence.py [n]
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_sequence import TreapSequence
+
+EDITS = 2000
+
+
+def timed(function, positions) -> float:
+    start = time.perf_counter()
+    for i in positions:
+        function(i)
+    return (time.perf_counter() - start) / len(positions)
+
+
+def main(n: int) -> None:
+    gc.disable()
+    start = time.perf_counter()
+    sequence = TreapSequence(range(n), RandomPriorities(0, bits=32))
+    build = time.perf_counter() - start
+    plain = list(range(n))
+    rng = random.Random(0)
+    positions = [rng.randrange(n // 4, 3 * n // 4) for _ in range(EDITS)]
+
+    print(f"n = {n}, built in {build:.2f}s; times per operation")
+    rows = [
+        ("insert(i, x)", lambda i: plain.insert(i, 0), lambda i: sequence.insert(i, 0)),
+        ("del s[i]", lambda i: plain.__delitem__(i), lambda i: sequence.__delitem__(i)),
+        ("s[i]", lambda i: plain[i], lambda i: sequence[i]),
+        ("s[i:i+100]", lambda i: plain[i:i + 100], lambda i: sequence[i:i + 100]),
+        ("del s[i:i+100]", lambda i: plain.__delitem__(slice(i, i + 100)),
+         lambda i: sequence.__delitem__(slice(i, i + 100))),
+    ]
+    for name, on_list, on_sequence in rows:
+        print(f"{name:>15}: list {timed(on_list, positions) * 1e6:9.2f} us   "
+              f"TreapSequence {timed(on_sequence, positions) * 1e6:9.2f} us")
+
+    tail = TreapSequence(range(n), RandomPriorities(1, bits=32))
+    start = time.perf_counter()
+    sequence.concat(tail)
+    concat = time.perf_counter() - start
+    start = time.perf_counter()
+    plain.extend(range(n))
+    extend = time.perf_counter() - start
+    print(f"{'concat':>15}: list {extend * 1e6:9.2f} us   TreapSequence {concat * 1e6:9.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,72 @@
+"""Saving and restoring a TreapMap: dump/load against re-inserting items.
+
+Usage: python benchmarks/bench_serialization.py [n]
+
+The baseline pickles the (key, value) pairs and inserts them one by one
+on load. Peak memory is what tracemalloc sees allocated during the save
+on top of the map itself.
+"""
+
+from __future__ import annotations
+import gc
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def peak_during(function) -> int:
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(n: int) -> None:
+    gc.disable()
+    treap = TreapMap.from_sorted(((i, i * 2) for i in range(n)), priorities=RandomPriorities(0, bits=32))
+    directory = tempfile.mkdtemp()
+    items_path = os.path.join(directory, "items.pickle")
+    treap_path = os.path.join(directory, "map.treap")
+
+    def save_items() -> None:
+        with open(items_path, "wb") as file:
+            pickle.dump(list(treap.items()), file, pickle.HIGHEST_PROTOCOL)
+
+    def load_items() -> TreapMap:
+        with open(items_path, "rb") as file:
+            loaded = TreapMap(priorities=RandomPriorities(0, bits=32))
+            for key, value in pickle.load(file):
+                loaded.insert(key, value)
+            return loaded
+
+    rows = []
+    for name, save, load, path in (
+        ("pickle + insert", save_items, load_items, items_path),
+        ("dump / load", lambda: treap.dump(treap_path), lambda: TreapMap.load(treap_path), treap_path),
+    ):
+        start = time.perf_counter()
+        save()
+        save_time = time.perf_counter() - start
+        start = time.perf_counter()
+        load()
+        load_time = time.perf_counter() - start
+        peak = peak_during(save)
+        rows.append((name, save_time, load_time, os.path.getsize(path), peak))
+
+    print(f"n = {n}")
+    for name, save_time, load_time, size, peak in rows:
+        print(f"{name:>16}: save {save_time:6.2f}s  load {load_time:6.2f}s  "
+              f"file {size / 2**20:6.1f} MiB  save peak {peak / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,70 @@
+"""difference and intersection against per-key remove/lookup loops.
+
+Usage: python benchmarks/bench_set_operations.py [n]
+
+The larger map holds n keys; the smaller holds m keys, half of which
+are also in the larger map.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def build(keys, seed) -> TreapMap:
+    return TreapMap.from_sorted(
+        ((key, key) for key in sorted(keys)), priorities=RandomPriorities(seed, bits=32)
+    )
+
+
+def timed(operation) -> float:
+    start = time.perf_counter()
+    operation()
+    return time.perf_counter() - start
+
+
+def main(n: int) -> None:
+    gc.disable()
+    rng = random.Random(0)
+    large_keys = rng.sample(range(2 * n), n)
+    for m in (100, n // 100, n // 10, n):
+        small_keys = rng.sample(large_keys, m // 2) + rng.sample(range(2 * n, 3 * n), m - m // 2)
+
+        def remove_loop():
+            large, small = build(large_keys, 1), build(small_keys, 2)
+            start = time.perf_counter()
+            for key in small:
+                large.remove(key)
+            return time.perf_counter() - start
+
+        def difference():
+            large, small = build(large_keys, 1), build(small_keys, 2)
+            return timed(lambda: large.difference(small))
+
+        def lookup_loop():
+            large, small = build(large_keys, 1), build(small_keys, 2)
+            start = time.perf_counter()
+            result = small._new_empty()
+            result.bulk_load((key, value) for key, value in small.items() if key in large)
+            return time.perf_counter() - start
+
+        def intersection():
+            large, small = build(large_keys, 1), build(small_keys, 2)
+            return timed(lambda: small.intersection(large))
+
+        print(
+            f"n = {n:>8}, m = {m:>8}: "
+            f"remove loop {remove_loop() * 1e3:8.2f} ms  difference {difference() * 1e3:8.2f} ms  "
+            f"lookup loop {lookup_loop() * 1e3:8.2f} ms  intersection {intersection() * 1e3:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
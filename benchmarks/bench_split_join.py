@@ -0,0 +1,43 @@
+"""Cost of split followed by join as the map grows.
+
+Usage: python benchmarks/bench_split_join.py [max_n]
+
+With subtree sizes maintained on every node, both operations touch only
+the nodes along one or two root-to-leaf paths, so the time per
+split/join pair should grow logarithmically with n.
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def main(max_n: int) -> None:
+    gc.disable()
+    rng = random.Random(0)
+    n = 1000
+    while n <= max_n:
+        treap = TreapMap.from_sorted(
+            ((i, i) for i in range(n)), priorities=RandomPriorities(0, bits=32)
+        )
+        rounds = 2000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            left, right = treap.split(rng.randrange(n))
+            left.join(right)
+            treap = left
+        elapsed = time.perf_counter() - start
+        assert len(treap) == n
+        print(f"n = {n:>9}: {elapsed / rounds * 1e6:8.2f} us per split + join")
+        n *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
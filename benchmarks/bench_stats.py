@@ -0,0 +1,38 @@
+"""Cost of TreapMap.stats and how real shapes compare with 2 ln n.
+
+Usage: python benchmarks/bench_stats.py [n]
+"""
+
+from __future__ import annotations
+import gc
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+
+def main(n: int) -> None:
+    gc.disable()
+    keys = list(range(n))
+    random.Random(0).shuffle(keys)
+    treap = TreapMap(priorities=RandomPriorities(0, bits=32))
+    for key in keys:
+        treap.insert(key, key)
+
+    start = time.perf_counter()
+    stats = treap.stats()
+    elapsed = time.perf_counter() - start
+
+    print(f"n = {n}: stats() took {elapsed:.3f}s ({elapsed / n * 1e9:.0f} ns/node)")
+    print(f"height {stats.height}, balance factor {treap.balance_factor():.2f}, "
+          f"leaves {stats.leaf_count}")
+    print(f"mean depth {stats.mean_depth:.1f} vs 2 ln n = {stats.expected_depth:.1f}; "
+          f"p50 {stats.depth_percentile(50)}, p99 {stats.depth_percentile(99)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
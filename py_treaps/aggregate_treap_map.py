@@ -0,0 +1,142 @@
+"""
+This module contains AggregateTreapMap, a TreapMap in which every node
+caches an aggregate of the values in its subtree.
+
+The aggregate is defined by a monoid: an associative binary operation
+with an identity element, such as `operator.add` with 0, `min` with
+infinity, or `max` with minus infinity. A `measure` function may map
+each value to the element that gets aggregated.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Optional, Tuple, Type, cast
+
+from py_treaps.priorities import PrioritySource
+from py_treaps.treap import KT, VT
+from py_treaps.treap_map import TreapMap
+from py_treaps.treap_node import AggregateTreapNode, TreapNode
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class AggregateTreapMap(TreapMap[KT, VT]):
+    """A TreapMap answering range aggregates in O(log n).
+
+    Args:
+        op: An associative function combining two aggregates. It does not
+            need to be commutative; aggregates are combined in key order.
+        identity: The identity element of `op`, returned for empty ranges.
+        measure: Maps a value to the element that is aggregated. Defaults
+            to the value itself.
+        node_type: The node class; it must provide an `agg` slot.
+        priorities: The priority source, as for TreapMap.
+    """
+
+    def __init__(
+        self,
+        op: Callable[[Any, Any], Any],
+        identity: Any,
+        measure: Optional[Callable[[VT], Any]] = None,
+        node_type: Type[TreapNode] = AggregateTreapNode,
+        priorities: Optional[PrioritySource] = None,
+    ):
+        super().__init__(node_type, priorities)
+        self.op = op
+        self.identity = identity
+        self.measure = _identity if measure is None else measure
+
+    def _new_empty(self) -> AggregateTreapMap[KT, VT]:
+        return AggregateTreapMap(
+            self.op, self.identity, self.measure, self.node_type, self.priorities
+        )
+
+    def _update_node(self, node: TreapNode) -> None:
+        aggregate_node = cast(AggregateTreapNode, node)
+        left = cast(Optional[AggregateTreapNode], node.left_child)
+        right = cast(Optional[AggregateTreapNode], node.right_child)
+        agg = self.measure(node.value)
+        size = 1
+        if left is not None:
+            agg = self.op(left.agg, agg)
+            size += left.size
+        if right is not None:
+            agg = self.op(agg, right.agg)
+            size += right.size
+        aggregate_node.agg = agg
+        aggregate_node.size = size
+
+    def _refresh_path(self, node: Optional[TreapNode]) -> None:
+        self._update_path(node)
+
+    def aggregate(
+        self,
+        lo: Optional[KT] = None,
+        hi: Optional[KT] = None,
+        inclusive: Tuple[bool, bool] = (True, False),
+    ) -> Any:
+        """Aggregate the values whose keys lie between two bounds.
+
+        The range is resolved along at most two root-to-leaf paths using
+        the cached subtree aggregates, so this runs in O(log n).
+
+        Args:
+            lo: The lower bound, or `None` for no lower bound.
+            hi: The upper bound, or `None` for no upper bound.
+            inclusive: Whether `lo` and `hi` themselves are in range.
+
+        Returns:
+            The aggregate of the values in range, in key order, or the
+            identity if the range is empty.
+        """
+        lo_inclusive, hi_inclusive = inclusive
+        op = self.op
+        measure = self.measure
+
+        def above_lo(key: KT) -> bool:
+            return lo is None or lo < key or (lo_inclusive and not key < lo)
+
+        def below_hi(key: KT) -> bool:
+            return hi is None or key < hi or (hi_inclusive and not hi < key)
+
+        # find the highest node inside the range
+        node = self.root
+        while node is not None:
+            if not above_lo(node.key):
+                node = node.right_child
+            elif not below_hi(node.key):
+                node = node.left_child
+            else:
+                break
+        if node is None:
+            return self.identity
+        split_node = cast(AggregateTreapNode, node)
+
+        # walk towards `lo`, collecting nodes and right subtrees in range
+        left_acc = self.identity
+        node = split_node.left_child
+        while node is not None:
+            if above_lo(node.key):
+                part = measure(node.value)
+                if node.right_child is not None:
+                    part = op(part, cast(AggregateTreapNode, node.right_child).agg)
+                left_acc = op(part, left_acc)
+                node = node.left_child
+            else:
+                node = node.right_child
+
+        # walk towards `hi`, collecting left subtrees and nodes in range
+        right_acc = self.identity
+        node = split_node.right_child
+        while node is not None:
+            if below_hi(node.key):
+                part = measure(node.value)
+                if node.left_child is not None:
+                    part = op(cast(AggregateTreapNode, node.left_child).agg, part)
+                right_acc = op(right_acc, part)
+                node = node.right_child
+            else:
+                node = node.left_child
+
+        return op(op(left_acc, measure(split_node.value)), right_acc)
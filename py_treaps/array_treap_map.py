@@ -0,0 +1,646 @@
+"""
+This module contains ArrayTreapMap, a TreapMap storage engine that keeps
+its nodes in parallel arrays instead of TreapNode objects.
+
+Node `i` is described by `keys[i]`, `values[i]`, `priority[i]`,
+`left[i]`, `right[i]`, `parent[i]` and `count[i]` (the size of its
+subtree). Slot 0 is a sentinel standing in for "no node": its count is
+always 0, so subtree sizes can be read without checking for children.
+Removed slots go on a free list and are reused by later inserts.
+
+Every map owns its store. Once fewer than half of the allocated slots
+hold live nodes, the map compacts its nodes into a fresh store, so
+removals and discarded split halves give their memory back.
+"""
+
+from __future__ import annotations
+import typing
+from array import array
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from py_treaps.comparable import KT, VT
+from py_treaps.priorities import PrioritySource, RandomPriorities
+from py_treaps.treap import Treap
+from py_treaps.treap_map import _CONFLICT_POLICIES
+
+NIL = 0
+
+
+class _ArrayStore:
+    """The parallel arrays holding every node of one map."""
+
+    __slots__ = ("keys", "values", "priority", "left", "right", "parent", "count", "free")
+
+    def __init__(self):
+        self.keys: List[Any] = [None]
+        self.values: List[Any] = [None]
+        self.priority = array("Q", [0])
+        self.left = array("q", [NIL])
+        self.right = array("q", [NIL])
+        self.parent = array("q", [NIL])
+        self.count = array("q", [0])
+        self.free: List[int] = []
+
+    def alloc(self, key: KT, value: VT, priority: int, parent: int) -> int:
+        if self.free:
+            index = self.free.pop()
+            self.keys[index] = key
+            self.values[index] = value
+            self.priority[index] = priority
+            self.left[index] = NIL
+            self.right[index] = NIL
+            self.parent[index] = parent
+            self.count[index] = 1
+        else:
+            index = len(self.keys)
+            self.keys.append(key)
+            self.values.append(value)
+            self.priority.append(priority)
+            self.left.append(NIL)
+            self.right.append(NIL)
+            self.parent.append(parent)
+            self.count.append(1)
+        return index
+
+    def release(self, index: int) -> None:
+        # drop the references so removed keys and values can be collected
+        self.keys[index] = None
+        self.values[index] = None
+        self.free.append(index)
+
+    def allocated(self) -> int:
+        """Return the number of slots in use or on the free list."""
+        return len(self.keys) - 1
+
+    def copy_subtree(self, source: _ArrayStore, root: int) -> int:
+        """Copy the subtree at `root` of another store into this one.
+
+        Returns:
+            The slot of the copied root, whose parent is NIL.
+        """
+        copies = {NIL: NIL}
+        stack = [root] if root != NIL else []
+        while stack:
+            index = stack.pop()
+            copy = self.alloc(
+                source.keys[index],
+                source.values[index],
+                source.priority[index],
+                copies[source.parent[index]] if index != root else NIL,
+            )
+            self.count[copy] = source.count[index]
+            copies[index] = copy
+            for child in (source.right[index], source.left[index]):
+                if child != NIL:
+                    stack.append(child)
+        for index, copy in copies.items():
+            if index != NIL:
+                self.left[copy] = copies[source.left[index]]
+                self.right[copy] = copies[source.right[index]]
+        return copies[root]
+
+    def release_subtree(self, root: int) -> None:
+        """Release every slot of the subtree at `root`."""
+        stack = [root] if root != NIL else []
+        while stack:
+            index = stack.pop()
+            for child in (self.left[index], self.right[index]):
+                if child != NIL:
+                    stack.append(child)
+            self.release(index)
+
+
+class ArrayNodeView:
+    """A read-only, TreapNode-like view of one slot of an ArrayTreapMap.
+
+    Attributes:
+        index (int): The slot of the node in the store.
+    """
+
+    __slots__ = ("_store", "index")
+
+    def __init__(self, store: _ArrayStore, index: int):
+        self._store = store
+        self.index = index
+
+    def _view(self, index: int) -> Optional[ArrayNodeView]:
+        return ArrayNodeView(self._store, index) if index != NIL else None
+
+    @property
+    def key(self) -> KT:
+        return self._store.keys[self.index]
+
+    @property
+    def value(self) -> VT:
+        return self._store.values[self.index]
+
+    @property
+    def priority(self) -> int:
+        return self._store.priority[self.index]
+
+    @property
+    def parent(self) -> Optional[ArrayNodeView]:
+        return self._view(self._store.parent[self.index])
+
+    @property
+    def left_child(self) -> Optional[ArrayNodeView]:
+        return self._view(self._store.left[self.index])
+
+    @property
+    def right_child(self) -> Optional[ArrayNodeView]:
+        return self._view(self._store.right[self.index])
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, ArrayNodeView)
+            and other._store is self._store
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self._store), self.index))
+
+
+class ArrayTreapMap(Treap[KT, VT]):
+    """A Treap whose nodes live in parallel arrays addressed by index.
+
+    It implements the whole Treap interface, including `meld`,
+    `difference` and `balance_factor`, so code written against Treap can
+    switch between it and TreapMap. The TreapMap extras beyond that
+    interface, such as order statistics, key ranges and cursors, are not
+    available. `get_root_node` returns an ArrayNodeView instead of a
+    TreapNode. Priorities are stored as
+    unsigned 64-bit integers, so priority sources must stay within 64
+    bits.
+
+    Since every map owns its store, `split` copies the smaller half into
+    a new store and `join` copies the smaller map into the store of the
+    larger one. Both cost O(min(m, n)) on top of the O(log n) of
+    TreapMap, where m and n are the sizes of the two parts.
+    """
+
+    def __init__(self, priorities: Optional[PrioritySource] = None):
+        self.priorities = RandomPriorities() if priorities is None else priorities
+        self.store = _ArrayStore()
+        self.root = NIL
+        self.size = 0
+
+    def _empty_like(self) -> ArrayTreapMap[KT, VT]:
+        return ArrayTreapMap(self.priorities)
+
+    def _compact(self) -> None:
+        # Move the live nodes to a fresh store once most slots are free
+        if 2 * self.size < self.store.allocated():
+            store = _ArrayStore()
+            self.root = store.copy_subtree(self.store, self.root)
+            self.store = store
+
+    def length(self) -> int:
+        return self.size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def count_nodes(self) -> int:
+        return sum(1 for _ in self.__iter__())
+
+    def get_root_node(self) -> Optional[ArrayNodeView]:
+        return ArrayNodeView(self.store, self.root) if self.root != NIL else None
+
+    def find(self, key: KT) -> int:
+        """Return the slot holding `key`, or NIL if it is absent."""
+        keys = self.store.keys
+        left = self.store.left
+        right = self.store.right
+        index = self.root
+        while index != NIL:
+            node_key = keys[index]
+            if key == node_key:
+                return index
+            index = left[index] if key < node_key else right[index]
+        return NIL
+
+    def lookup(self, key: KT) -> Optional[VT]:
+        index = self.find(key)
+        return self.store.values[index] if index != NIL else None
+
+    def __getitem__(self, key: KT) -> Optional[VT]:
+        return self.lookup(key)
+
+    def __contains__(self, key: KT) -> bool:
+        return self.find(key) != NIL
+
+    def _update(self, index: int) -> None:
+        store = self.store
+        store.count[index] = 1 + store.count[store.left[index]] + store.count[store.right[index]]
+
+    def _rotate_up(self, index: int) -> None:
+        """Rotate the node at `index` above its parent."""
+        store = self.store
+        left, right, parent = store.left, store.right, store.parent
+        above = parent[index]
+        grandparent = parent[above]
+        if left[above] == index:
+            inner = right[index]
+            left[above] = inner
+            right[index] = above
+        else:
+            inner = left[index]
+            right[above] = inner
+            left[index] = above
+        if inner != NIL:
+            parent[inner] = above
+        parent[above] = index
+        parent[index] = grandparent
+        if grandparent == NIL:
+            self.root = index
+        elif left[grandparent] == above:
+            left[grandparent] = index
+        else:
+            right[grandparent] = index
+        self._update(above)
+        self._update(index)
+
+    def insert(self, key: KT, value: VT) -> None:
+        store = self.store
+        keys, left, right = store.keys, store.left, store.right
+        above = NIL
+        index = self.root
+        while index != NIL:
+            node_key = keys[index]
+            if key == node_key:
+                store.values[index] = value
+                return
+            above = index
+            index = left[index] if key < node_key else right[index]
+
+        index = store.alloc(key, value, self.priorities(key), above)
+        if above == NIL:
+            self.root = index
+        elif key < keys[above]:
+            left[above] = index
+        else:
+            right[above] = index
+        self.size += 1
+
+        count, parent, priority = store.count, store.parent, store.priority
+        ancestor = above
+        while ancestor != NIL:
+            count[ancestor] += 1
+            ancestor = parent[ancestor]
+        while parent[index] != NIL and priority[index] > priority[parent[index]]:
+            self._rotate_up(index)
+
+    def remove(self, key: KT) -> Optional[VT]:
+        index = self.find(key)
+        if index == NIL:
+            return None
+        store = self.store
+        left, right, parent, priority = store.left, store.right, store.parent, store.priority
+
+        # rotate the node down until it is a leaf
+        while left[index] != NIL or right[index] != NIL:
+            if left[index] == NIL:
+                child = right[index]
+            elif right[index] == NIL:
+                child = left[index]
+            elif priority[left[index]] > priority[right[index]]:
+                child = left[index]
+            else:
+                child = right[index]
+            self._rotate_up(child)
+
+        above = parent[index]
+        if above == NIL:
+            self.root = NIL
+        elif left[above] == index:
+            left[above] = NIL
+        else:
+            right[above] = NIL
+        while above != NIL:
+            store.count[above] -= 1
+            above = parent[above]
+
+        value = store.values[index]
+        store.release(index)
+        self.size -= 1
+        self._compact()
+        return value
+
+    def _split_at(self, index: int, threshold: KT) -> Tuple[int, int, int]:
+        """Split the subtree at `index` around `threshold` in one descent.
+
+        Returns:
+            The roots of the subtrees of keys less than and greater than
+            `threshold`, with their parents set to NIL, and between them
+            the detached slot holding `threshold`, or NIL.
+        """
+        store = self.store
+        keys, left, right, parent = store.keys, store.left, store.right, store.parent
+        left_root = right_root = NIL
+        left_tail = right_tail = NIL
+        left_rest = right_rest = equal = NIL
+        visited = []
+        while index != NIL:
+            key = keys[index]
+            if key < threshold:
+                visited.append(index)
+                if left_tail == NIL:
+                    left_root = index
+                else:
+                    right[left_tail] = index
+                parent[index] = left_tail
+                left_tail = index
+                index = right[index]
+            elif threshold < key:
+                visited.append(index)
+                if right_tail == NIL:
+                    right_root = index
+                else:
+                    left[right_tail] = index
+                parent[index] = right_tail
+                right_tail = index
+                index = left[index]
+            else:
+                # the children of the threshold node close off both sides
+                equal = index
+                left_rest, right_rest = left[index], right[index]
+                left[index] = right[index] = parent[index] = NIL
+                self._update(index)
+                break
+        if left_tail == NIL:
+            left_root = left_rest
+        else:
+            right[left_tail] = left_rest
+        if left_rest != NIL:
+            parent[left_rest] = left_tail
+        if right_tail == NIL:
+            right_root = right_rest
+        else:
+            left[right_tail] = right_rest
+        if right_rest != NIL:
+            parent[right_rest] = right_tail
+        for index in reversed(visited):
+            self._update(index)
+        return left_root, equal, right_root
+
+    def _merge(self, low: int, high: int) -> int:
+        """Merge two subtrees whose keys are all below and above each other.
+
+        Returns:
+            The root of the result, with its parent set to NIL.
+        """
+        store = self.store
+        left, right, parent, priority = store.left, store.right, store.parent, store.priority
+        # zip the right spine of `low` with the left spine of `high`
+        root = above = NIL
+        attach_right = False
+        visited = []
+        while low != NIL and high != NIL:
+            if priority[low] > priority[high]:
+                node, low = low, right[low]
+                next_right = True
+            else:
+                node, high = high, left[high]
+                next_right = False
+            if above == NIL:
+                root = node
+            elif attach_right:
+                right[above] = node
+            else:
+                left[above] = node
+            parent[node] = above
+            above, attach_right = node, next_right
+            visited.append(node)
+        rest = low if low != NIL else high
+        if above == NIL:
+            if rest != NIL:
+                parent[rest] = NIL
+            return rest
+        if attach_right:
+            right[above] = rest
+        else:
+            left[above] = rest
+        if rest != NIL:
+            parent[rest] = above
+        for index in reversed(visited):
+            self._update(index)
+        return root
+
+    def _end_key(self, right: bool) -> KT:
+        # The largest key if `right`, else the smallest; the map is not empty
+        children = self.store.right if right else self.store.left
+        index = self.root
+        while children[index] != NIL:
+            index = children[index]
+        return self.store.keys[index]
+
+    def _set_children(self, index: int, low: int, high: int) -> int:
+        store = self.store
+        store.left[index] = low
+        store.right[index] = high
+        if low != NIL:
+            store.parent[low] = index
+        if high != NIL:
+            store.parent[high] = index
+        self._update(index)
+        return index
+
+    def _set_root(self, root: int) -> None:
+        self.store.parent[root] = NIL
+        self.root = root
+        self.size = self.store.count[root]
+
+    def _gather(self, other: ArrayTreapMap[KT, VT]) -> Tuple[int, int]:
+        """Move the nodes of both maps into the larger of the two stores.
+
+        The smaller map is copied. Afterwards this map owns the store and
+        `other` is empty.
+
+        Returns:
+            The roots of this map's and the other map's nodes.
+        """
+        if other.size > self.size:
+            self.store, other.store = other.store, self.store
+            mine = self.store.copy_subtree(other.store, self.root)
+            theirs = other.root
+        else:
+            mine = self.root
+            theirs = self.store.copy_subtree(other.store, other.root)
+        other.store = _ArrayStore()
+        other.root = NIL
+        other.size = 0
+        return mine, theirs
+
+    def split(self, threshold: KT) -> List[Treap[KT, VT]]:
+        store = self.store
+        left_root, equal, right_root = self._split_at(self.root, threshold)
+        # the threshold key itself goes right
+        if equal != NIL:
+            right_root = self._merge(equal, right_root)
+
+        # the larger half keeps this store, the smaller one moves out
+        left_treap = self._empty_like()
+        right_treap = self._empty_like()
+        if store.count[left_root] < store.count[right_root]:
+            small, small_root, large, large_root = left_treap, left_root, right_treap, right_root
+        else:
+            small, small_root, large, large_root = right_treap, right_root, left_treap, left_root
+        small.root = small.store.copy_subtree(store, small_root)
+        small.size = store.count[small_root]
+        store.release_subtree(small_root)
+        large.store, large.root, large.size = store, large_root, store.count[large_root]
+        large._compact()
+        self.store = _ArrayStore()
+        self.root = NIL
+        self.size = 0
+        return [left_treap, right_treap]
+
+    def join(self, _other: Treap[KT, VT]) -> None:
+        """Join with a Treap whose keys all lie on one side of this one's.
+
+        Raises:
+            ValueError: If `other` is this map, or if the key ranges of
+                the two maps overlap.
+        """
+        other = typing.cast(ArrayTreapMap, _other)
+        if other is self:
+            raise ValueError("cannot join a map with itself")
+        if self.size and other.size:
+            if self.store.keys[self.root] < other.store.keys[other.root]:
+                low, high = self, other
+            else:
+                low, high = other, self
+            if not low._end_key(right=True) < high._end_key(right=False):
+                raise ValueError("cannot join maps whose key ranges overlap")
+        mine, theirs = self._gather(other)
+        store = self.store
+        if mine == NIL or theirs == NIL:
+            root = mine if mine != NIL else theirs
+        elif store.keys[mine] < store.keys[theirs]:
+            root = self._merge(mine, theirs)
+        else:
+            root = self._merge(theirs, mine)
+        self._set_root(root)
+
+    def meld(
+        self,
+        other: Treap[KT, VT],
+        conflict: Union[str, Callable[[KT, VT, VT], VT]] = "theirs",
+    ) -> None:
+        """Meld another ArrayTreapMap into this one; see TreapMap.meld.
+
+        Runs in O(m log(n/m + 1)) after copying the smaller map into the
+        store of the larger. The other map is left empty.
+        """
+        if other is self:
+            return
+        resolve = _CONFLICT_POLICIES[conflict] if isinstance(conflict, str) else conflict
+        mine, theirs = self._gather(typing.cast(ArrayTreapMap, other))
+        self._set_root(self._union(mine, theirs, resolve))
+        self._compact()
+
+    def _union(self, mine: int, theirs: int, resolve: Callable[[KT, VT, VT], VT]) -> int:
+        # Split the subtree with the lower root on the key of the other root
+        if mine == NIL:
+            return theirs
+        if theirs == NIL:
+            return mine
+        store = self.store
+        if store.priority[mine] >= store.priority[theirs]:
+            root = mine
+            low, equal, high = self._split_at(theirs, store.keys[root])
+            if equal != NIL:
+                store.values[root] = resolve(store.keys[root], store.values[root], store.values[equal])
+            left = self._union(store.left[root], low, resolve)
+            right = self._union(store.right[root], high, resolve)
+        else:
+            root = theirs
+            low, equal, high = self._split_at(mine, store.keys[root])
+            if equal != NIL:
+                store.values[root] = resolve(store.keys[root], store.values[equal], store.values[root])
+            left = self._union(low, store.left[root], resolve)
+            right = self._union(high, store.right[root], resolve)
+        if equal != NIL:
+            store.release(equal)
+        return self._set_children(root, left, right)
+
+    def difference(self, other: Treap[KT, VT]) -> None:
+        """Remove the keys of another ArrayTreapMap from this one.
+
+        Runs in O(m log(n/m + 1)) after copying the smaller map into the
+        store of the larger. The other map is left empty; the difference
+        of a map with itself is empty.
+        """
+        if other is self:
+            self.store = _ArrayStore()
+            self.root = NIL
+            self.size = 0
+            return
+        mine, theirs = self._gather(typing.cast(ArrayTreapMap, other))
+        self._set_root(self._difference(mine, theirs))
+        self._compact()
+
+    def _difference(self, mine: int, theirs: int) -> int:
+        # Keep the nodes of `mine` whose keys are not in `theirs`, and
+        # release every node of `theirs`
+        store = self.store
+        if mine == NIL or theirs == NIL:
+            store.release_subtree(theirs)
+            return mine
+        low, equal, high = self._split_at(mine, store.keys[theirs])
+        left = self._difference(low, store.left[theirs])
+        right = self._difference(high, store.right[theirs])
+        store.release(theirs)
+        if equal != NIL:
+            store.release(equal)
+        return self._merge(left, right)
+
+    def balance_factor(self) -> float:
+        """Return the height divided by the minimum height for this size.
+
+        An empty or perfectly balanced map has a balance factor of 1.0.
+        """
+        if self.size == 0:
+            return 1.0
+        left, right = self.store.left, self.store.right
+        height = 0
+        stack = [(self.root, 1)]
+        while stack:
+            index, depth = stack.pop()
+            height = max(height, depth)
+            for child in (left[index], right[index]):
+                if child != NIL:
+                    stack.append((child, depth + 1))
+        return height / self.size.bit_length()
+
+    def __str__(self) -> str:
+        if self.root == NIL:
+            return "Empty Treap"
+        store = self.store
+        lines = []
+        stack = [(self.root, 0)]
+        while stack:
+            index, depth = stack.pop()
+            if index == NIL:
+                lines.append(f"{' ' * depth * 2}- None\n")
+                continue
+            lines.append(
+                f"{' ' * depth * 2}- (Key: {store.keys[index]}, "
+                f"Value: {store.values[index]}, Priority: {store.priority[index]})\n"
+            )
+            stack.append((store.right[index], depth + 1))
+            stack.append((store.left[index], depth + 1))
+        return "".join(lines)
+
+    def __iter__(self) -> typing.Iterator[KT]:
+        keys, left, right = self.store.keys, self.store.left, self.store.right
+        stack = []
+        index = self.root
+        while stack or index != NIL:
+            while index != NIL:
+                stack.append(index)
+                index = left[index]
+            index = stack.pop()
+            yield keys[index]
+            index = right[index]
@@ -0,0 +1,90 @@
+"""
+This module contains ConcurrentTreapMap, a thread-safe treap map for
+many readers and a few writers.
+
+The map holds one PersistentTreapMap version at a time. Readers take
+whatever version is current and never lock: a version never changes, so
+a reader cannot observe a half-finished update. Writers serialize on a
+lock, build the next version by path copying and then swap it in with a
+single attribute assignment, which is atomic in CPython.
+"""
+
+from __future__ import annotations
+import threading
+import typing
+from collections.abc import Iterable
+from typing import Callable, Optional, Tuple
+
+from py_treaps.comparable import KT, VT
+from py_treaps.persistent_treap_map import PersistentTreapMap
+from py_treaps.priorities import PrioritySource
+
+
+class ConcurrentTreapMap(typing.Generic[KT, VT], Iterable):
+    """A treap map whose readers never wait for its writers.
+
+    Lookups and iteration run against the version that was current when
+    they started, so iterators see a stable snapshot even while other
+    threads keep writing.
+
+    Args:
+        priorities: The priority source, as for TreapMap. It is only
+            called by writers, under the write lock.
+    """
+
+    def __init__(self, priorities: Optional[PrioritySource] = None):
+        self._current: PersistentTreapMap[KT, VT] = PersistentTreapMap(priorities)
+        self._write_lock = threading.Lock()
+
+    def snapshot(self) -> PersistentTreapMap[KT, VT]:
+        """Return the current version, in O(1). Later writes do not change it."""
+        return self._current
+
+    def lookup(self, key: KT) -> Optional[VT]:
+        return self._current.lookup(key)
+
+    def __getitem__(self, key: KT) -> Optional[VT]:
+        return self._current.lookup(key)
+
+    def __contains__(self, key: KT) -> bool:
+        return key in self._current
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def __iter__(self) -> typing.Iterator[KT]:
+        return iter(self._current)
+
+    def items(self) -> typing.Iterator[Tuple[KT, VT]]:
+        """Iterate over the (key, value) pairs of the current version."""
+        return self._current.items()
+
+    def insert(self, key: KT, value: VT) -> None:
+        with self._write_lock:
+            self._current = self._current.insert(key, value)
+
+    def remove(self, key: KT) -> Optional[VT]:
+        with self._write_lock:
+            current = self._current
+            value = current.lookup(key)
+            self._current = current.remove(key)
+        return value
+
+    def apply(
+        self, update: Callable[[PersistentTreapMap[KT, VT]], PersistentTreapMap[KT, VT]]
+    ) -> PersistentTreapMap[KT, VT]:
+        """Replace the current version with `update(current)`, atomically.
+
+        Readers see either the version before or the version after, never
+        anything in between, so this is how to change several keys at
+        once. Other writers wait until `update` returns.
+
+        Returns:
+            The new current version.
+        """
+        with self._write_lock:
+            self._current = update(self._current)
+            return self._current
+
+    def __str__(self) -> str:
+        return str(self._current)
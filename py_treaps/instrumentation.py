@@ -0,0 +1,224 @@
+"""
+This module contains opt-in operation counters for TreapMap.
+
+`instrument(treap, hook)` installs counting wrappers for `insert`,
+`remove`, `lookup`, `split` and `join` as attributes of that one map, and
+`uninstrument(treap)` removes them again. Maps that were never
+instrumented run the plain methods, so the counters cost nothing while
+disabled.
+
+Every instrumented call reports an OperationRecord to the hook. The hook
+can be any callable, such as a metrics exporter or an OperationHistogram.
+
+Key comparisons are counted by searching with a proxy for the key. The
+proxy delegates every comparison to the real key, so key types must
+return `NotImplemented` for operands they do not know, as the built-in
+types do. Operations on an instrumented map are slower than usual, and
+the reported `elapsed` time includes that overhead.
+"""
+
+from __future__ import annotations
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, DefaultDict, NamedTuple
+
+from py_treaps.treap_map import TreapMap
+
+OPERATIONS = ("insert", "remove", "lookup", "split", "join")
+
+
+class OperationRecord(NamedTuple):
+    """What one operation on an instrumented TreapMap cost.
+
+    For `join` no search takes place: `comparisons` counts the two key
+    comparisons, one of the roots and one of the ends of the key ranges,
+    and `nodes_visited` the spine nodes zipped together.
+    """
+
+    operation: str
+    comparisons: int
+    nodes_visited: int
+    rotations: int
+    elapsed: float
+
+
+class OperationHistogram:
+    """A hook collecting the distribution of every counter per operation.
+
+    Attributes:
+        calls (Counter): The number of records seen per operation.
+        elapsed (Counter): The total time spent per operation, in seconds.
+        histograms (dict): Maps `(operation, counter)` to a Counter from
+            each observed value of the counter to how often it was seen.
+    """
+
+    COUNTERS = ("comparisons", "nodes_visited", "rotations")
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.elapsed: Counter = Counter()
+        self.histograms: DefaultDict[Any, Counter] = defaultdict(Counter)
+
+    def __call__(self, record: OperationRecord) -> None:
+        self.calls[record.operation] += 1
+        self.elapsed[record.operation] += record.elapsed
+        for counter in self.COUNTERS:
+            self.histograms[record.operation, counter][getattr(record, counter)] += 1
+
+    def mean(self, operation: str, counter: str) -> float:
+        """Return the mean of a counter over the calls of an operation."""
+        histogram = self.histograms[operation, counter]
+        calls = sum(histogram.values())
+        if calls == 0:
+            return 0.0
+        return sum(value * count for value, count in histogram.items()) / calls
+
+    def percentile(self, operation: str, counter: str, percent: float) -> int:
+        """Return the value of a counter that `percent` % of calls stay at or below."""
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+        histogram = self.histograms[operation, counter]
+        calls = sum(histogram.values())
+        needed = max(1, -(-calls * percent // 100))
+        seen = 0
+        for value in sorted(histogram):
+            seen += histogram[value]
+            if seen >= needed:
+                return value
+        return 0
+
+
+class _CountingKey:
+    """Stands in for a searched key, counting comparisons made against it.
+
+    Consecutive comparisons against the same node key count as a single
+    node visited.
+    """
+
+    __slots__ = ("key", "comparisons", "nodes_visited", "_last")
+
+    def __init__(self, key: Any):
+        self.key = key
+        self.comparisons = 0
+        self.nodes_visited = 0
+        self._last: Any = self
+
+    def _seen(self, other: Any) -> Any:
+        self.comparisons += 1
+        if other is not self._last:
+            self.nodes_visited += 1
+            self._last = other
+        return self.key
+
+    def __eq__(self, other: Any) -> bool:
+        return self._seen(other) == other
+
+    def __ne__(self, other: Any) -> bool:
+        return self._seen(other) != other
+
+    def __lt__(self, other: Any) -> bool:
+        return self._seen(other) < other
+
+    def __le__(self, other: Any) -> bool:
+        return self._seen(other) <= other
+
+    def __gt__(self, other: Any) -> bool:
+        return self._seen(other) > other
+
+    def __ge__(self, other: Any) -> bool:
+        return self._seen(other) >= other
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+
+class _Counts:
+    __slots__ = ("rotations", "updates")
+
+    def __init__(self):
+        self.rotations = 0
+        self.updates = 0
+
+
+def instrument(treap: TreapMap, hook: Callable[[OperationRecord], Any]) -> None:
+    """Report the cost of every operation on one TreapMap to `hook`.
+
+    Instrumenting a map again replaces its hook. Maps returned by `split`
+    are not instrumented.
+
+    Args:
+        treap: The map to instrument.
+        hook: Called with an OperationRecord after each `insert`,
+            `remove`, `lookup`, `split` and `join`.
+    """
+    uninstrument(treap)
+    cls = type(treap)
+    counts = _Counts()
+    clock = time.perf_counter
+
+    def _rotate_up(node):
+        counts.rotations += 1
+        cls._rotate_up(treap, node)
+
+    def _update_node(node):
+        counts.updates += 1
+        cls._update_node(treap, node)
+
+    def measure(operation: str, method: Callable, key: Any, *args: Any) -> Any:
+        probe = _CountingKey(key)
+        counts.rotations = 0
+        start = clock()
+        result = method(treap, probe, *args)
+        elapsed = clock() - start
+        record = OperationRecord(
+            operation, probe.comparisons, probe.nodes_visited, counts.rotations, elapsed
+        )
+        return result, record
+
+    def searching(operation: str, method: Callable) -> Callable:
+        def wrapper(key, *args):
+            result, record = measure(operation, method, key, *args)
+            hook(record)
+            return result
+        return wrapper
+
+    def insert(key, value):
+        # the priority source and the new node must see the real key, not
+        # the probe; both are restored before the hook can run
+        priorities, node_type = treap.priorities, treap.node_type
+        treap.priorities = lambda probe: priorities(key)
+        treap.node_type = lambda probe, *args, **kwargs: node_type(key, *args, **kwargs)
+        try:
+            _, record = measure("insert", cls.insert, key, value)
+        finally:
+            treap.priorities, treap.node_type = priorities, node_type
+        hook(record)
+
+    def join(other):
+        counts.rotations = counts.updates = 0
+        comparisons = 2 * int(treap.root is not None and other.root is not None)
+        start = clock()
+        cls.join(treap, other)
+        elapsed = clock() - start
+        hook(OperationRecord("join", comparisons, counts.updates, counts.rotations, elapsed))
+
+    treap.__dict__.update(
+        _rotate_up=_rotate_up,
+        _update_node=_update_node,
+        insert=insert,
+        remove=searching("remove", cls.remove),
+        lookup=searching("lookup", cls.lookup),
+        split=searching("split", cls.split),
+        join=join,
+    )
+
+
+def uninstrument(treap: TreapMap) -> None:
+    """Remove the counters installed by `instrument`, if any."""
+    for name in OPERATIONS + ("_rotate_up", "_update_node"):
+        treap.__dict__.pop(name, None)
+
+
+def is_instrumented(treap: TreapMap) -> bool:
+    """Return whether `instrument` is active on a TreapMap."""
+    return "insert" in treap.__dict__
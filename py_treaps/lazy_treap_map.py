@@ -0,0 +1,369 @@
+"""
+This module contains LazyTreapMap, an AggregateTreapMap that can add to
+or assign every value in a key range in O(log n).
+
+A range update touches the nodes on the two boundary paths and tags the
+roots of the subtrees in between with a pending update instead of
+visiting them. A tagged node has already applied the update to its own
+value and aggregate; its children receive it only when something is
+about to look below the node. Every method that descends, rotates,
+splits or merges first pushes the pending updates off the nodes it
+passes through.
+
+Values are updated arithmetically, so they must support `+`, and the
+aggregate must follow the values: `add(delta)` on a range whose
+aggregate is `agg` must give `agg + repeat(delta, size)`. That holds
+for sums, minima and maxima, with `repeat` as described below.
+
+A range update counts as a modification of the map: like inserting or
+removing a key, it makes open iterators and cursors raise RuntimeError,
+since they may already have passed the nodes it tags.
+"""
+
+from __future__ import annotations
+import operator
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Type, cast
+
+from py_treaps.aggregate_treap_map import AggregateTreapMap
+from py_treaps.priorities import PrioritySource
+from py_treaps.treap import KT, VT
+from py_treaps.treap_node import LazyTreapNode, TreapNode
+
+
+def _repeat_sum(value: Any, count: int) -> Any:
+    return value * count
+
+
+class LazyTreapMap(AggregateTreapMap[KT, VT]):
+    """An AggregateTreapMap with O(log n) range add and range assign.
+
+    Args:
+        op: The aggregate operation, as for AggregateTreapMap. Values are
+            aggregated as they are; there is no `measure`.
+        identity: The identity element of `op`.
+        repeat: Called as `repeat(value, count)`, returns the aggregate of
+            `count` copies of `value`. The default, `value * count`,
+            suits `operator.add`; use `lambda value, count: value` for
+            `min` or `max`.
+        node_type: The node class; it must provide the LazyTreapNode slots.
+        priorities: The priority source, as for TreapMap.
+    """
+
+    def __init__(
+        self,
+        op: Callable[[Any, Any], Any] = operator.add,
+        identity: Any = 0,
+        repeat: Callable[[Any, int], Any] = _repeat_sum,
+        node_type: Type[TreapNode] = LazyTreapNode,
+        priorities: Optional[PrioritySource] = None,
+    ):
+        super().__init__(op, identity, None, node_type, priorities)
+        self.repeat = repeat
+
+    def _new_empty(self) -> LazyTreapMap[KT, VT]:
+        return LazyTreapMap(self.op, self.identity, self.repeat, self.node_type, self.priorities)
+
+    # applying and pushing updates
+
+    def _apply(self, node: TreapNode, assign: Any, add: Any) -> None:
+        # Apply an update to a whole subtree: now to its root, later below it
+        lazy_node = cast(LazyTreapNode, node)
+        if assign is not None:
+            lazy_node.value = assign
+            lazy_node.agg = self.repeat(assign, node.size)
+            lazy_node.assign = assign
+            lazy_node.add = None
+        if add is not None:
+            lazy_node.value = lazy_node.value + add
+            lazy_node.agg = lazy_node.agg + self.repeat(add, node.size)
+            if lazy_node.assign is not None:
+                lazy_node.assign = lazy_node.assign + add
+            elif lazy_node.add is not None:
+                lazy_node.add = lazy_node.add + add
+            else:
+                lazy_node.add = add
+
+    def _push(self, node: TreapNode) -> None:
+        # Hand the update pending on a node down to its children
+        lazy_node = cast(LazyTreapNode, node)
+        assign, add = lazy_node.assign, lazy_node.add
+        if assign is None and add is None:
+            return
+        if node.left_child is not None:
+            self._apply(node.left_child, assign, add)
+        if node.right_child is not None:
+            self._apply(node.right_child, assign, add)
+        lazy_node.assign = lazy_node.add = None
+
+    def _push_path(self, key: KT, node: Optional[TreapNode], on_equal: Optional[str]) -> None:
+        # Push along the search path for `key`; at a node holding `key` stop,
+        # or carry on "left" or "right" as the caller's own descent will
+        while node is not None:
+            self._push(node)
+            node_key = node.key
+            if key < node_key:
+                node = node.left_child
+            elif node_key < key:
+                node = node.right_child
+            elif on_equal == "left":
+                node = node.left_child
+            elif on_equal == "right":
+                node = node.right_child
+            else:
+                return
+
+    def _push_spine(self, node: Optional[TreapNode], right: bool) -> None:
+        while node is not None:
+            self._push(node)
+            node = node.right_child if right else node.left_child
+
+    def _push_subtree(self, node: Optional[TreapNode]) -> None:
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            self._push(node)
+            if node.left_child is not None:
+                stack.append(node.left_child)
+            if node.right_child is not None:
+                stack.append(node.right_child)
+
+    def _settle(self, node: TreapNode) -> None:
+        ancestors = []
+        while node.parent is not None:
+            node = node.parent
+            ancestors.append(node)
+        for ancestor in reversed(ancestors):
+            self._push(ancestor)
+
+    # every way of reaching below a node pushes first
+
+    def _update_node(self, node: TreapNode) -> None:
+        self._push(node)
+        super()._update_node(node)
+
+    def recursive_lookup(self, key: KT, current_node: TreapNode) -> Optional[TreapNode]:
+        self._push_path(key, current_node, None)
+        return super().recursive_lookup(key, current_node)
+
+    def _find_many(self, keys: Any) -> List[Optional[TreapNode]]:
+        return [self.recursive_lookup(key, self.root) for key in keys]
+
+    def insert(self, key: KT, value: VT) -> None:
+        self._push_path(key, self.root, None)
+        super().insert(key, value)
+
+    def _rotate_up(self, current_node: TreapNode) -> None:
+        self._push(current_node.parent)
+        self._push(current_node)
+        super()._rotate_up(current_node)
+
+    def _split_nodes(
+        self, root: Optional[TreapNode], threshold: KT
+    ) -> Tuple[Optional[TreapNode], Optional[TreapNode], Optional[TreapNode]]:
+        self._push_path(threshold, root, None)
+        return super()._split_nodes(root, threshold)
+
+    def _merge_nodes(
+        self, low: Optional[TreapNode], high: Optional[TreapNode]
+    ) -> Optional[TreapNode]:
+        self._push_spine(low, right=True)
+        self._push_spine(high, right=False)
+        return super()._merge_nodes(low, high)
+
+    def _union_nodes(self, mine: Any, theirs: Any, resolve: Any) -> Any:
+        for node in (mine, theirs):
+            if node is not None:
+                self._push(node)
+        return super()._union_nodes(mine, theirs, resolve)
+
+    def _difference_nodes(self, mine: Any, theirs: Any) -> Any:
+        if mine is not None:
+            self._push(mine)
+        return super()._difference_nodes(mine, theirs)
+
+    def _intersection_nodes(self, mine: Any, theirs: Any, resolve: Any) -> Any:
+        if mine is not None:
+            self._push(mine)
+        return super()._intersection_nodes(mine, theirs, resolve)
+
+    def _symmetric_difference_nodes(self, mine: Any, theirs: Any) -> Any:
+        for node in (mine, theirs):
+            if node is not None:
+                self._push(node)
+        return super()._symmetric_difference_nodes(mine, theirs)
+
+    def _walk(self, reverse: bool = False) -> Iterator[TreapNode]:
+        self._push_subtree(self.root)
+        return super()._walk(reverse)
+
+    def _iter_nodes(self, current_node: Optional[TreapNode]) -> Iterator[TreapNode]:
+        self._push_subtree(current_node)
+        return super()._iter_nodes(current_node)
+
+    def _iter_preorder(self) -> Iterator[TreapNode]:
+        # a pre-order walk reaches every parent first, so it can push as it goes
+        for node in super()._iter_preorder():
+            self._push(node)
+            yield node
+
+    def __str__(self) -> str:
+        self._push_subtree(self.root)
+        return super().__str__()
+
+    def _first_node(self) -> Optional[TreapNode]:
+        self._push_spine(self.root, right=False)
+        return super()._first_node()
+
+    def _last_node(self) -> Optional[TreapNode]:
+        self._push_spine(self.root, right=True)
+        return super()._last_node()
+
+    def _ceiling_node(self, key: KT, inclusive: bool = True) -> Optional[TreapNode]:
+        self._push_path(key, self.root, "left" if inclusive else "right")
+        return super()._ceiling_node(key, inclusive)
+
+    def _floor_node(self, key: KT, inclusive: bool = True) -> Optional[TreapNode]:
+        self._push_path(key, self.root, "right" if inclusive else "left")
+        return super()._floor_node(key, inclusive)
+
+    def _successor(self, node: TreapNode) -> Optional[TreapNode]:
+        if node.right_child is not None:
+            self._push(node)
+            self._push_spine(node.right_child, right=False)
+        return super()._successor(node)
+
+    def _predecessor(self, node: TreapNode) -> Optional[TreapNode]:
+        if node.left_child is not None:
+            self._push(node)
+            self._push_spine(node.left_child, right=True)
+        return super()._predecessor(node)
+
+    def _push_bounds(
+        self, lo: Optional[KT], hi: Optional[KT], inclusive: Tuple[bool, bool]
+    ) -> None:
+        # Push along both boundary paths of a range, as aggregate walks them
+        lo_inclusive, hi_inclusive = inclusive
+        if lo is None:
+            self._push_spine(self.root, right=False)
+        else:
+            self._push_path(lo, self.root, "left" if lo_inclusive else "right")
+        if hi is None:
+            self._push_spine(self.root, right=True)
+        else:
+            self._push_path(hi, self.root, "right" if hi_inclusive else "left")
+
+    def aggregate(
+        self,
+        lo: Optional[KT] = None,
+        hi: Optional[KT] = None,
+        inclusive: Tuple[bool, bool] = (True, False),
+    ) -> Any:
+        self._push_bounds(lo, hi, inclusive)
+        return super().aggregate(lo, hi, inclusive)
+
+    # range updates
+
+    def add_range(
+        self,
+        delta: Any,
+        lo: Optional[KT] = None,
+        hi: Optional[KT] = None,
+        inclusive: Tuple[bool, bool] = (True, False),
+    ) -> None:
+        """Add `delta` to every value whose key lies between two bounds.
+
+        Args:
+            delta: The amount to add.
+            lo: The lower bound, or `None` for no lower bound.
+            hi: The upper bound, or `None` for no upper bound.
+            inclusive: Whether `lo` and `hi` themselves are in range.
+        """
+        self._update_range(lo, hi, inclusive, None, delta)
+
+    def assign_range(
+        self,
+        value: Any,
+        lo: Optional[KT] = None,
+        hi: Optional[KT] = None,
+        inclusive: Tuple[bool, bool] = (True, False),
+    ) -> None:
+        """Set every value whose key lies between two bounds to `value`.
+
+        Args:
+            value: The new value. It cannot be None.
+            lo: The lower bound, or `None` for no lower bound.
+            hi: The upper bound, or `None` for no upper bound.
+            inclusive: Whether `lo` and `hi` themselves are in range.
+        """
+        if value is None:
+            raise ValueError("cannot assign None")
+        self._update_range(lo, hi, inclusive, value, None)
+
+    def _update_range(
+        self,
+        lo: Optional[KT],
+        hi: Optional[KT],
+        inclusive: Tuple[bool, bool],
+        assign: Any,
+        add: Any,
+    ) -> None:
+        # Walk the same two paths as aggregate, updating the nodes on them
+        # and tagging the whole subtrees hanging between them
+        lo_inclusive, hi_inclusive = inclusive
+
+        def above_lo(key: KT) -> bool:
+            return lo is None or lo < key or (lo_inclusive and not key < lo)
+
+        def below_hi(key: KT) -> bool:
+            return hi is None or key < hi or (hi_inclusive and not hi < key)
+
+        def update_value(node: TreapNode) -> None:
+            if assign is not None:
+                node.value = assign
+            if add is not None:
+                node.value = node.value + add
+
+        node = self.root
+        while node is not None:
+            self._push(node)
+            if not above_lo(node.key):
+                node = node.right_child
+            elif not below_hi(node.key):
+                node = node.left_child
+            else:
+                break
+        if node is None:
+            return
+        self._modifications += 1
+        split_node = node
+        update_value(split_node)
+
+        left_deepest = split_node
+        node = split_node.left_child
+        while node is not None:
+            self._push(node)
+            left_deepest = node
+            if above_lo(node.key):
+                update_value(node)
+                if node.right_child is not None:
+                    self._apply(node.right_child, assign, add)
+                node = node.left_child
+            else:
+                node = node.right_child
+
+        node = split_node.right_child
+        right_deepest = split_node
+        while node is not None:
+            self._push(node)
+            right_deepest = node
+            if below_hi(node.key):
+                update_value(node)
+                if node.left_child is not None:
+                    self._apply(node.left_child, assign, add)
+                node = node.right_child
+            else:
+                node = node.left_child
+
+        # refresh the aggregates bottom up along both paths
+        self._update_path(left_deepest)
+        self._update_path(right_deepest)
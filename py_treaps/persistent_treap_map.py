@@ -0,0 +1,315 @@
+"""
+This module contains PersistentTreapMap, an immutable treap map whose
+updates return new versions of the map.
+
+An update copies only the nodes on the paths it changes and shares every
+other subtree with the version it started from, so older versions stay
+intact and readable for O(log n) extra nodes per update. Since a shared
+node can sit under a different parent in each version, nodes carry no
+parent pointers; operations remember the path they descended instead.
+"""
+
+from __future__ import annotations
+import typing
+from collections.abc import Iterable
+from operator import itemgetter
+from typing import List, Optional, Tuple
+
+from py_treaps.comparable import KT, VT
+from py_treaps.priorities import PrioritySource, RandomPriorities
+from py_treaps.treap_node import PersistentTreapNode
+
+Node = PersistentTreapNode
+# the nodes above a position and, for each, whether the descent went left
+Path = List[Tuple[Node, bool]]
+
+
+def _rebuild(path: Path, node: Optional[Node]) -> Optional[Node]:
+    # Copy the nodes of `path` bottom up so that they lead to `node`
+    for above, went_left in reversed(path):
+        if went_left:
+            node = Node(above.key, above.value, above.priority, node, above.right_child)
+        else:
+            node = Node(above.key, above.value, above.priority, above.left_child, node)
+    return node
+
+
+def _split(
+    node: Optional[Node], threshold: KT
+) -> Tuple[Optional[Node], Optional[Node], Optional[Node]]:
+    """Split a subtree around `threshold`, copying the nodes on the way.
+
+    Returns:
+        The roots of the subtrees of keys less than and greater than
+        `threshold`, and between them the node holding `threshold`, if
+        there is one. That node is not copied and keeps its children.
+    """
+    path: Path = []
+    equal_node = None
+    while node is not None:
+        if node.key < threshold:
+            path.append((node, True))
+            node = node.right_child
+        elif threshold < node.key:
+            path.append((node, False))
+            node = node.left_child
+        else:
+            equal_node = node
+            break
+    left = equal_node.left_child if equal_node is not None else None
+    right = equal_node.right_child if equal_node is not None else None
+    for above, goes_left in reversed(path):
+        if goes_left:
+            left = Node(above.key, above.value, above.priority, above.left_child, left)
+        else:
+            right = Node(above.key, above.value, above.priority, right, above.right_child)
+    return left, equal_node, right
+
+
+def _merge(low: Optional[Node], high: Optional[Node]) -> Optional[Node]:
+    # Zip the right spine of `low` and the left spine of `high` by priority
+    path = []
+    while low is not None and high is not None:
+        if low.priority >= high.priority:
+            path.append((low, True))
+            low = low.right_child
+        else:
+            path.append((high, False))
+            high = high.left_child
+    node = low if low is not None else high
+    for above, from_low in reversed(path):
+        if from_low:
+            node = Node(above.key, above.value, above.priority, above.left_child, node)
+        else:
+            node = Node(above.key, above.value, above.priority, node, above.right_child)
+    return node
+
+
+def _end(node: Node, right: bool) -> Node:
+    # The node with the largest key below `node` if `right`, else the smallest
+    while True:
+        child = node.right_child if right else node.left_child
+        if child is None:
+            return node
+        node = child
+
+
+class PersistentTreapMap(typing.Generic[KT, VT], Iterable):
+    """An immutable treap map whose updates return new versions.
+
+    `insert`, `remove`, `split` and `join` leave the map they are called
+    on unchanged and return new PersistentTreapMaps sharing its
+    unchanged subtrees. Every version can be read at any time, from any
+    number of threads.
+
+    Args:
+        priorities: The priority source, as for TreapMap. It is shared by
+            every version derived from this one.
+    """
+
+    def __init__(self, priorities: Optional[PrioritySource] = None):
+        self.priorities = RandomPriorities() if priorities is None else priorities
+        self.root: Optional[Node] = None
+
+    def _version(self, root: Optional[Node]) -> PersistentTreapMap[KT, VT]:
+        version: PersistentTreapMap[KT, VT] = type(self)(self.priorities)
+        version.root = root
+        return version
+
+    @classmethod
+    def from_sorted(
+        cls, items: typing.Iterable[Tuple[KT, VT]], priorities: Optional[PrioritySource] = None
+    ) -> PersistentTreapMap[KT, VT]:
+        """Build a map from (key, value) pairs in O(n) if sorted by key.
+
+        Unsorted input is sorted first. As with `insert`, the last value
+        given for a repeated key wins.
+        """
+        treap: PersistentTreapMap[KT, VT] = cls(priorities)
+        pairs = list(items)
+        if any(pairs[i + 1][0] < pairs[i][0] for i in range(len(pairs) - 1)):
+            pairs.sort(key=itemgetter(0))
+        unique: List[Tuple[KT, VT]] = []
+        for pair in pairs:
+            if unique and not unique[-1][0] < pair[0]:
+                unique[-1] = pair
+            else:
+                unique.append(pair)
+
+        # link the Cartesian tree by index over a right spine, then build
+        # the nodes children first
+        ranks = [treap.priorities(key) for key, _ in unique]
+        left = [-1] * len(unique)
+        right = [-1] * len(unique)
+        spine: List[int] = []
+        for i, rank in enumerate(ranks):
+            below = -1
+            while spine and ranks[spine[-1]] < rank:
+                below = spine.pop()
+            left[i] = below
+            if spine:
+                right[spine[-1]] = i
+            spine.append(i)
+
+        nodes: List[Optional[Node]] = [None] * len(unique)
+        stack = [(spine[0], False)] if spine else []
+        while stack:
+            i, children_built = stack.pop()
+            if not children_built:
+                stack.append((i, True))
+                for child in (left[i], right[i]):
+                    if child != -1:
+                        stack.append((child, False))
+                continue
+            key, value = unique[i]
+            nodes[i] = Node(
+                key,
+                value,
+                ranks[i],
+                nodes[left[i]] if left[i] != -1 else None,
+                nodes[right[i]] if right[i] != -1 else None,
+            )
+        treap.root = nodes[spine[0]] if spine else None
+        return treap
+
+    def get_root_node(self) -> Optional[Node]:
+        return self.root
+
+    def __len__(self) -> int:
+        return self.root.size if self.root is not None else 0
+
+    def _find(self, key: KT) -> Optional[Node]:
+        node = self.root
+        while node is not None:
+            node_key = node.key
+            if key == node_key:
+                return node
+            node = node.left_child if key < node_key else node.right_child
+        return None
+
+    def lookup(self, key: KT) -> Optional[VT]:
+        node = self._find(key)
+        return node.value if node is not None else None
+
+    def __getitem__(self, key: KT) -> Optional[VT]:
+        return self.lookup(key)
+
+    def __contains__(self, key: KT) -> bool:
+        return self._find(key) is not None
+
+    def snapshot(self) -> PersistentTreapMap[KT, VT]:
+        """Return a version that later updates cannot change, in O(1).
+
+        Versions are immutable, so this is the map itself.
+        """
+        return self
+
+    def insert(self, key: KT, value: VT) -> PersistentTreapMap[KT, VT]:
+        """Return a new version with `key` mapped to `value`.
+
+        Any old value associated with the key is replaced in the new
+        version only.
+        """
+        path: Path = []
+        node = self.root
+        while node is not None:
+            node_key = node.key
+            if key == node_key:
+                node = Node(key, value, node.priority, node.left_child, node.right_child)
+                return self._version(_rebuild(path, node))
+            went_left = key < node_key
+            path.append((node, went_left))
+            node = node.left_child if went_left else node.right_child
+
+        # the new node takes the place of the first node it outranks
+        priority = self.priorities(key)
+        depth = 0
+        while depth < len(path) and path[depth][0].priority >= priority:
+            depth += 1
+        below = path[depth][0] if depth < len(path) else None
+        left, _, right = _split(below, key)
+        return self._version(_rebuild(path[:depth], Node(key, value, priority, left, right)))
+
+    def remove(self, key: KT) -> PersistentTreapMap[KT, VT]:
+        """Return a new version without `key`, or this map if it is absent."""
+        path: Path = []
+        node = self.root
+        while node is not None:
+            node_key = node.key
+            if key == node_key:
+                return self._version(_rebuild(path, _merge(node.left_child, node.right_child)))
+            went_left = key < node_key
+            path.append((node, went_left))
+            node = node.left_child if went_left else node.right_child
+        return self
+
+    def split(self, threshold: KT) -> List[PersistentTreapMap[KT, VT]]:
+        """Return the versions holding keys below and from `threshold` on.
+
+        As with TreapMap.split, `threshold` itself goes to the right.
+        """
+        left, equal_node, right = _split(self.root, threshold)
+        if equal_node is not None:
+            leaf = Node(equal_node.key, equal_node.value, equal_node.priority)
+            right = _merge(leaf, right)
+        return [self._version(left), self._version(right)]
+
+    def join(self, other: PersistentTreapMap[KT, VT]) -> PersistentTreapMap[KT, VT]:
+        """Return the union of two versions whose key ranges do not overlap.
+
+        Every key of one map must be less than every key of the other.
+
+        Raises:
+            ValueError: If `other` is this map, or if the key ranges of
+                the two maps overlap.
+        """
+        if other is self:
+            raise ValueError("cannot join a map with itself")
+        if other.root is None:
+            return self
+        if self.root is None:
+            return self._version(other.root)
+        low, high = self.root, other.root
+        if high.key < low.key:
+            low, high = high, low
+        if not _end(low, right=True).key < _end(high, right=False).key:
+            raise ValueError("cannot join maps whose key ranges overlap")
+        return self._version(_merge(low, high))
+
+    def _iter_nodes(self) -> typing.Iterator[Node]:
+        stack: List[Node] = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left_child
+            node = stack.pop()
+            yield node
+            node = node.right_child
+
+    def __iter__(self) -> typing.Iterator[KT]:
+        for node in self._iter_nodes():
+            yield node.key
+
+    def items(self) -> typing.Iterator[Tuple[KT, VT]]:
+        """Iterate over the (key, value) pairs in key order."""
+        for node in self._iter_nodes():
+            yield node.key, node.value
+
+    def __str__(self) -> str:
+        if self.root is None:
+            return "Empty Treap"
+        lines = []
+        stack: List[Tuple[Optional[Node], int]] = [(self.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node is None:
+                lines.append(f"{' ' * depth * 2}- None\n")
+                continue
+            lines.append(
+                f"{' ' * depth * 2}- (Key: {node.key}, "
+                f"Value: {node.value}, Priority: {node.priority})\n"
+            )
+            stack.append((node.right_child, depth + 1))
+            stack.append((node.left_child, depth + 1))
+        return "".join(lines)
@@ -0,0 +1,92 @@
+"""
+This module contains the priority sources a TreapMap can draw node
+priorities from.
+
+A priority source is a callable taking the key of the node being
+created and returning its priority. Every source also exposes
+`max_priority`, an exclusive upper bound on the priorities it
+generates: a node given that priority outranks every other node.
+"""
+
+from __future__ import annotations
+import random
+from typing import Optional
+
+from py_treaps.comparable import KT
+from py_treaps.treap_node import TreapNode
+
+_MASK64 = (1 << 64) - 1
+
+
+class PrioritySource:
+    """Base class for priority sources."""
+
+    max_priority: int = TreapNode.MAX_PRIORITY
+
+    def __call__(self, key: KT) -> int:
+        raise NotImplementedError("unimplemented method `__call__`")
+
+
+class PooledPriorities(PrioritySource):
+    """Draw from the process-wide shuffled pool of `TreapNode.get_priority`.
+
+    This is the original behaviour: priorities are unique, but a process
+    can only ever create `TreapNode.MAX_PRIORITY` nodes.
+    """
+
+    max_priority = TreapNode.MAX_PRIORITY
+
+    def __call__(self, key: KT) -> int:
+        return TreapNode.get_priority(None)
+
+
+class RandomPriorities(PrioritySource):
+    """Uniform priorities from a private, optionally seeded PRNG stream.
+
+    Args:
+        seed: Seed for the stream. Maps built with the same seed and the
+            same sequence of operations have the same shape.
+        bits: Width of the generated priorities. The default keeps them
+            below `TreapNode.MAX_PRIORITY + 1`, matching the original
+            pool. Use 32 or more for maps with millions of nodes: at a
+            million keys, 16-bit ties make the mean depth 28 instead of
+            25.
+    """
+
+    def __init__(self, seed: Optional[int] = None, bits: int = 16):
+        self.bits = bits
+        self.max_priority = 1 << bits
+        self._getrandbits = random.Random(seed).getrandbits
+
+    def __call__(self, key: KT) -> int:
+        return self._getrandbits(self.bits)
+
+
+class HashPriorities(PrioritySource):
+    """Priorities derived from the hash of the key.
+
+    The same key always receives the same priority, so the shape of the
+    treap depends only on the set of keys it holds and not on the order
+    of operations. String hashes are salted per process unless
+    PYTHONHASHSEED is set.
+
+    Args:
+        seed: Mixed into every hash to select a different family of
+            shapes.
+        bits: Width of the generated priorities, at most 64.
+    """
+
+    def __init__(self, seed: int = 0, bits: int = 32):
+        if not 0 < bits <= 64:
+            raise ValueError("bits must be between 1 and 64")
+        self.seed = seed & _MASK64
+        self.bits = bits
+        self.max_priority = 1 << bits
+
+    def __call__(self, key: KT) -> int:
+        # splitmix64 finalizer
+        z = (hash(key) ^ self.seed) + 0x9E3779B97F4A7C15 & _MASK64
+        z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+        z = (z ^ (z >> 27)) * 0x94D049BB133111EB & _MASK64
+        z ^= z >> 31
+        return z >> (64 - self.bits)
@@ -0,0 +1,172 @@
+"""
+This module contains a compact binary format for saving a TreapMap and
+loading it back with exactly the same shape.
+
+A file is a header followed by chunks of up to CHUNK_SIZE nodes in
+pre-order. Each chunk holds the node count and three sections: keys,
+values and priorities. A section is a one-byte encoding, the payload
+length and the payload:
+
+- `INT32` and `INT64`: signed integers, little-endian.
+- `UINT32` and `UINT64`: unsigned integers, little-endian.
+- `FLOAT64`: IEEE doubles, little-endian.
+- `PICKLE`: a pickled list, for anything else.
+
+A chunk with a count of 0 ends the file. Pre-order keys and priorities
+determine the tree, so loading links every node straight into place in
+O(n) without rotations. Writing walks the tree one chunk at a time, so a
+save never holds more than one chunk of flattened data in memory.
+
+Sections in PICKLE encoding can run arbitrary code when loaded, so only
+load files from trusted sources.
+"""
+
+from __future__ import annotations
+import os
+import pickle
+import struct
+import sys
+import typing
+from array import array
+from itertools import islice
+from typing import Any, BinaryIO, Iterator, List, Tuple, Union
+
+from py_treaps.treap_node import TreapNode
+
+if typing.TYPE_CHECKING:
+    from py_treaps.treap_map import TreapMap
+
+MAGIC = b"PYTREAP\x00"
+VERSION = 1
+CHUNK_SIZE = 1 << 16
+
+PICKLE, INT64, UINT64, FLOAT64, INT32, UINT32 = range(6)
+_TYPECODES = {INT32: "i", UINT32: "I", INT64: "q", UINT64: "Q", FLOAT64: "d"}
+
+_HEADER = struct.Struct("<8sH")
+_COUNT = struct.Struct("<I")
+_SECTION = struct.Struct("<BQ")
+
+PathOrFile = Union[str, "os.PathLike[str]", BinaryIO]
+
+
+def _encoding(items: List[Any]) -> int:
+    # The most compact encoding that holds every item exactly
+    if all(type(item) is int for item in items):
+        low, high = min(items), max(items)
+        if -(1 << 31) <= low and high < 1 << 31:
+            return INT32
+        if 0 <= low and high < 1 << 32:
+            return UINT32
+        if -(1 << 63) <= low and high < 1 << 63:
+            return INT64
+        if 0 <= low and high < 1 << 64:
+            return UINT64
+    elif all(type(item) is float for item in items):
+        return FLOAT64
+    return PICKLE
+
+
+def _write_section(file: BinaryIO, items: List[Any]) -> None:
+    encoding = _encoding(items)
+    if encoding == PICKLE:
+        payload = pickle.dumps(items, pickle.HIGHEST_PROTOCOL)
+    else:
+        packed = array(_TYPECODES[encoding], items)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        payload = packed.tobytes()
+    file.write(_SECTION.pack(encoding, len(payload)))
+    file.write(payload)
+
+
+def _read_exact(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("truncated TreapMap file")
+    return data
+
+
+def _read_section(file: BinaryIO, count: int) -> List[Any]:
+    encoding, length = _SECTION.unpack(_read_exact(file, _SECTION.size))
+    payload = _read_exact(file, length)
+    if encoding == PICKLE:
+        items = pickle.loads(payload)
+    elif encoding in _TYPECODES:
+        packed = array(_TYPECODES[encoding])
+        packed.frombytes(payload)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        items = packed.tolist()
+    else:
+        raise ValueError(f"unknown section encoding {encoding}")
+    if len(items) != count:
+        raise ValueError("corrupt TreapMap file: section length mismatch")
+    return items
+
+
+def _open(target: PathOrFile, mode: str) -> Tuple[BinaryIO, bool]:
+    # Returns the file and whether this module opened it and must close it
+    if hasattr(target, "read") or hasattr(target, "write"):
+        return typing.cast(BinaryIO, target), False
+    return typing.cast(BinaryIO, open(target, mode)), True
+
+
+def dump(treap: TreapMap, target: PathOrFile) -> None:
+    """Write a TreapMap to a path or a binary file object.
+
+    Args:
+        treap: The map to save.
+        target: A path, or a file object opened for binary writing,
+            which is left open.
+    """
+    file, owned = _open(target, "wb")
+    try:
+        file.write(_HEADER.pack(MAGIC, VERSION))
+        nodes: Iterator[TreapNode] = treap._iter_preorder()
+        while True:
+            chunk = list(islice(nodes, CHUNK_SIZE))
+            file.write(_COUNT.pack(len(chunk)))
+            if not chunk:
+                break
+            _write_section(file, [node.key for node in chunk])
+            _write_section(file, [node.value for node in chunk])
+            _write_section(file, [node.priority for node in chunk])
+    finally:
+        if owned:
+            file.close()
+
+
+def _read_items(file: BinaryIO) -> Iterator[Tuple[Any, Any, int]]:
+    magic, version = _HEADER.unpack(_read_exact(file, _HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("not a TreapMap file")
+    if version != VERSION:
+        raise ValueError(f"unsupported TreapMap file version {version}")
+    while True:
+        (count,) = _COUNT.unpack(_read_exact(file, _COUNT.size))
+        if count == 0:
+            return
+        keys = _read_section(file, count)
+        values = _read_section(file, count)
+        priorities = _read_section(file, count)
+        yield from zip(keys, values, priorities)
+
+
+def load_into(treap: TreapMap, source: PathOrFile) -> None:
+    """Replace the contents of a TreapMap with a map saved by `dump`.
+
+    The saved shape and priorities are restored exactly, in O(n).
+
+    Args:
+        treap: The map to load into. Its node type and priority source
+            are kept.
+        source: A path, or a file object opened for binary reading,
+            which is left open.
+    """
+    file, owned = _open(source, "rb")
+    try:
+        treap._load_preorder_items(_read_items(file))
+    finally:
+        if owned:
+            file.close()
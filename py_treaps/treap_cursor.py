@@ -0,0 +1,152 @@
+"""
+This module contains TreapCursor, a movable position in a TreapMap.
+
+A cursor remembers the node it is on, so stepping to a neighbour
+follows parent pointers instead of descending from the root again, and
+reading, updating or deleting the current entry needs no search at all.
+"""
+
+from __future__ import annotations
+import typing
+from typing import Generic, Optional
+
+from py_treaps.comparable import KT, VT
+from py_treaps.treap_node import TreapNode
+
+if typing.TYPE_CHECKING:
+    from py_treaps.treap_map import TreapMap
+
+
+class TreapCursor(Generic[KT, VT]):
+    """A position in a TreapMap that can seek, step, update and delete.
+
+    A cursor is either on an entry or past the end, where it is falsy
+    and has no key or value. Stepping costs O(1) amortized; `seek` from
+    the current position costs O(log d) expected for a target d keys
+    away.
+
+    Like an iterator, a cursor stops working when the map gains or loses
+    keys other than through the cursor itself: every method except
+    `seek`, `first` and `last` then raises RuntimeError. Those three
+    reposition the cursor and make it usable again.
+
+    Attributes:
+        treap (TreapMap): The map the cursor moves over.
+    """
+
+    __slots__ = ("treap", "_node", "_modifications")
+
+    def __init__(self, treap: TreapMap[KT, VT]):
+        self.treap = treap
+        self._node: Optional[TreapNode] = None
+        self._modifications = treap._modifications
+
+    def _check(self) -> Optional[TreapNode]:
+        if self._modifications != self.treap._modifications:
+            raise RuntimeError("TreapMap changed outside of the cursor")
+        return self._node
+
+    def _move(self, node: Optional[TreapNode]) -> bool:
+        self._node = node
+        self._modifications = self.treap._modifications
+        return node is not None
+
+    def __bool__(self) -> bool:
+        return self._check() is not None
+
+    @property
+    def key(self) -> KT:
+        """The key at the cursor. Raises KeyError past the end."""
+        node = self._check()
+        if node is None:
+            raise KeyError("cursor is past the end")
+        return node.key
+
+    @property
+    def value(self) -> VT:
+        """The value at the cursor. Raises KeyError past the end."""
+        node = self._check()
+        if node is None:
+            raise KeyError("cursor is past the end")
+        self.treap._settle(node)
+        return node.value
+
+    @value.setter
+    def value(self, value: VT) -> None:
+        node = self._check()
+        if node is None:
+            raise KeyError("cursor is past the end")
+        self.treap._settle(node)
+        node.value = value
+        # let augmented maps refresh what the ancestors cache
+        self.treap._refresh_path(node)
+
+    def first(self) -> bool:
+        """Move to the smallest key. Returns False if the map is empty."""
+        return self._move(self.treap._first_node())
+
+    def last(self) -> bool:
+        """Move to the largest key. Returns False if the map is empty."""
+        return self._move(self.treap._last_node())
+
+    def next(self) -> bool:
+        """Step to the next larger key. Returns False past the end."""
+        node = self._check()
+        if node is None:
+            raise KeyError("cursor is past the end")
+        return self._move(self.treap._successor(node))
+
+    def prev(self) -> bool:
+        """Step to the next smaller key. Returns False past the end."""
+        node = self._check()
+        if node is None:
+            raise KeyError("cursor is past the end")
+        return self._move(self.treap._predecessor(node))
+
+    def seek(self, key: KT) -> bool:
+        """Move to `key`, or to the smallest larger key if it is absent.
+
+        From a valid position this is a finger search: the cursor climbs
+        only until its subtree spans `key` and then descends, so nearby
+        targets are found without starting from the root.
+
+        Returns:
+            Whether `key` itself was found. If no key is at least `key`,
+            the cursor ends up past the end.
+        """
+        node = self._node
+        if node is None or self._modifications != self.treap._modifications:
+            node = self.treap.root
+        elif node.key < key:
+            while node.parent is not None and not key < node.parent.key:
+                node = node.parent
+        elif key < node.key:
+            while node.parent is not None and not node.parent.key < key:
+                node = node.parent
+
+        # the subtree at `node` now spans `key`, or `node` is the root
+        best = last = None
+        while node is not None:
+            last = node
+            node_key = node.key
+            if key == node_key:
+                return self._move(node)
+            if key < node_key:
+                best = node
+                node = node.left_child
+            else:
+                node = node.right_child
+        if best is None and last is not None:
+            # every key below the subtree's top is smaller than `key`
+            best = self.treap._successor(last)
+        self._move(best)
+        return False
+
+    def delete(self) -> None:
+        """Remove the entry at the cursor and move to the next larger key."""
+        node = self._check()
+        if node is None:
+            raise KeyError("cursor is past the end")
+        following = self.treap._successor(node)
+        self.treap._remove_node(node)
+        self._move(following)
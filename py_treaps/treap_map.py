@@ -1,20 +1,103 @@
 from __future__ import annotations
+import math
 import random
 import typing
-from collections.abc import Iterator
-from typing import List, Optional, cast
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from operator import itemgetter
+from typing import Any, Callable, List, Mapping, NamedTuple, Optional, Tuple, Type, Union, cast
 
+from py_treaps import serialization
+from py_treaps.priorities import PrioritySource, RandomPriorities
 from py_treaps.treap import KT, VT, Treap
+from py_treaps.treap_cursor import TreapCursor
 from py_treaps.treap_node import TreapNode
 
 
+class BatchResult(NamedTuple):
+    """How many keys of a batch were new and how many overwrote a value."""
+
+    inserted: int
+    overwritten: int
+
+
+class TreapStats(NamedTuple):
+    """The shape of a TreapMap, as reported by `TreapMap.stats`.
+
+    Depths count edges from the root, so the root has depth 0; the
+    height counts levels, so a single node has height 1.
+    """
+
+    size: int
+    height: int
+    leaf_count: int
+    mean_depth: float
+    depth_counts: List[int]
+
+    @property
+    def expected_depth(self) -> float:
+        """The expected depth of a node in a random treap, about 2 ln n."""
+        return 2 * math.log(self.size) if self.size > 1 else 0.0
+
+    def depth_percentile(self, percent: float) -> int:
+        """Return the depth at or above which `percent` % of nodes sit."""
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+        if self.size == 0:
+            return 0
+        needed = max(1, math.ceil(self.size * percent / 100))
+        seen = 0
+        for depth, count in enumerate(self.depth_counts):
+            seen += count
+            if seen >= needed:
+                return depth
+        return len(self.depth_counts) - 1
+
+
+def _take_other(key: Any, mine: Any, theirs: Any) -> Any:
+    return theirs
+
+
+def _keep_mine(key: Any, mine: Any, theirs: Any) -> Any:
+    return mine
+
+
+# Named policies for keys present in both treaps of a meld
+_CONFLICT_POLICIES = {"theirs": _take_other, "mine": _keep_mine}
+
+
 # Example usage found in test_treaps.py
 class TreapMap(Treap[KT, VT]):
     # Add an __init__ if you want. Make the parameters optional, though.
 
-    def __init__(self):
+    def __init__(
+        self,
+        node_type: Type[TreapNode] = TreapNode,
+        priorities: Optional[PrioritySource] = None,
+    ):
+        """Create an empty TreapMap.
+
+        Args:
+            node_type: The node class. SlimTreapNode suits maps that only
+                need keys.
+            priorities: The priority source. The default draws 16-bit
+                priorities, so that a node given a priority above
+                `TreapNode.MAX_PRIORITY` outranks every other node, as
+                the original pool guaranteed. With millions of nodes,
+                16 bits give many ties and trees about 15% deeper than
+                wider priorities do. For large maps, pass
+                `RandomPriorities(bits=32)`, or HashPriorities.
+        """
+        self.node_type = node_type
+        self.priorities = RandomPriorities() if priorities is None else priorities
         self.root = None
         self.size = 0
+        # bumped by every change to the tree's shape, so iterators can fail fast
+        self._modifications = 0
+
+    def _new_empty(self) -> TreapMap[KT, VT]:
+        # An empty map with the same configuration, for split results and batches
+        return TreapMap(self.node_type, self.priorities)
 
     def length(self):
         return self.size
@@ -28,23 +111,23 @@ class TreapMap(Treap[KT, VT]):
         return self.root
 
     def lookup(self, key: KT) -> Optional[VT]:
-        if self.root:
-            found_node = self.recursive_lookup(key, self.root)
-            if found_node:
-                return found_node.value
-            else:
-                return None
+        found_node = self.recursive_lookup(key, self.root)
+        if found_node is not None:
+            return found_node.value
+        return None
 
     def recursive_lookup(self, key: KT, current_node: TreapNode) -> Optional[TreapNode]:
-        if not current_node:
-            return None
-        elif current_node.key == key:
-            return current_node
-        elif key < current_node.key:
-            return self.recursive_lookup(key, current_node.left_child)
-        else:
-            return self.recursive_lookup(key, current_node.right_child)
-        
+        # Despite the name this is a loop: deep trees cannot hit the recursion limit
+        while current_node is not None:
+            node_key = current_node.key
+            if key == node_key:
+                return current_node
+            elif key < node_key:
+                current_node = current_node.left_child
+            else:
+                current_node = current_node.right_child
+        return None
+
     def __getitem__(self, key: KT) -> Optional[VT]:
         return self.lookup(key)
     
@@ -56,350 +139,940 @@ class TreapMap(Treap[KT, VT]):
 
 
 
-    def insert(self, key: KT, value: VT) -> None:
-        if self.root:
-            #print("DIVING IN FROM insert")
-            new_node = self.recursive_insert(key, value, self.root)
-            self.priority_reorder(new_node)
-        else:
-            new_node = TreapNode(key, value)
-            #print("FIRST NODE: ", new_node.key, new_node.value, new_node.priority)
-            self.root = new_node
-        self.size += 1
+    def lookup_many(self, keys: Iterable[KT]) -> List[Optional[VT]]:
+        """Retrieve the values associated with a batch of keys.
+
+        The batch is sorted and resolved in one coordinated descent: each
+        node is visited once for all the keys whose search paths pass
+        through it, splitting the sorted batch around the node's key.
+
+        Args:
+            keys: The keys to look up.
+
+        Returns:
+            The values in the order of `keys`, with `None` for absent keys.
+        """
+        return [
+            node.value if node is not None else None
+            for node in self._find_many(keys)
+        ]
+
+    def contains_many(self, keys: Iterable[KT]) -> List[bool]:
+        """Test a batch of keys for membership, in the order of `keys`."""
+        return [node is not None for node in self._find_many(keys)]
+
+    def _find_many(self, keys: Iterable[KT]) -> List[Optional[TreapNode]]:
+        keys = list(keys)
+        found: List[Optional[TreapNode]] = [None] * len(keys)
+        if self.root is None or not keys:
+            return found
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        sorted_keys = [keys[i] for i in order]
+
+        # each entry is a node and the slice of the sorted batch below it
+        stack = [(self.root, 0, len(sorted_keys))]
+        while stack:
+            node, low, high = stack.pop()
+            if high - low == 1:
+                # a lone key gains nothing from sharing: finish it with a plain descent
+                found[order[low]] = self.recursive_lookup(sorted_keys[low], node)
+                continue
+            node_key = node.key
+            if node_key < sorted_keys[low]:
+                start = end = low
+            elif sorted_keys[high - 1] < node_key:
+                start = end = high
+            else:
+                start = end = bisect_left(sorted_keys, node_key, low, high)
+                if start < high and not node_key < sorted_keys[start]:
+                    end = bisect_right(sorted_keys, node_key, start, high)
+                    for i in range(start, end):
+                        found[order[i]] = node
+            if low < start and node.left_child is not None:
+                stack.append((node.left_child, low, start))
+            if end < high and node.right_child is not None:
+                stack.append((node.right_child, end, high))
+        return found
+
+    def rank(self, key: KT) -> int:
+        """Return the number of keys in this Treap less than `key`.
+
+        `key` does not have to be present. Runs in O(log n) using the
+        subtree sizes.
+        """
+        rank = 0
+        current_node = self.root
+        while current_node is not None:
+            if current_node.key < key:
+                left = current_node.left_child
+                rank += 1 + (left.size if left is not None else 0)
+                current_node = current_node.right_child
+            else:
+                current_node = current_node.left_child
+        return rank
+
+    def select(self, index: int) -> KT:
+        """Return the key at position `index` in sorted order.
 
-        
+        Negative indices count from the largest key, as for lists.
 
-    def recursive_insert(self, key: KT, value: VT, current_node: TreapNode) -> Optional[TreapNode]:
-        #print(f"Inserting node with key: {key}, current_node.key: {current_node.key}")
-        if key < current_node.key:
-            if current_node.has_left_child() is not None:
-                #print("Current Node has left child:", current_node.key, current_node.priority, current_node.left_child.key)
-                #print("INTO RECURSION*")
-                return self.recursive_insert(key, value, current_node.left_child)
+        Raises:
+            IndexError: If `index` is out of range.
+        """
+        node = self._select_node(index)
+        return node.key
+
+    def _select_node(self, index: int) -> TreapNode:
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("TreapMap index out of range")
+        current_node = self.root
+        while True:
+            left = current_node.left_child
+            left_size = left.size if left is not None else 0
+            if index < left_size:
+                current_node = left
+            elif index == left_size:
+                return current_node
             else:
-                #print("I AM HERE 3")
-                current_node.left_child = TreapNode(key, value, parent = current_node)
-                return current_node.left_child
-        elif key > current_node.key:
-            if current_node.has_right_child() is not None:
-                #print("Current Node has right child:", current_node.key, current_node.priority, current_node.right_child.key)
-                #print("INTO RECURSION+")
-                return self.recursive_insert(key, value, current_node.right_child)
+                index -= left_size + 1
+                current_node = current_node.right_child
+
+    def kth_smallest(self, k: int) -> KT:
+        """Return the k-th smallest key, counting from 1."""
+        if k < 1:
+            raise IndexError("k must be at least 1")
+        return self.select(k - 1)
+
+    def median(self) -> KT:
+        """Return the median key; the lower median for an even size.
+
+        Raises:
+            ValueError: If this Treap is empty.
+        """
+        if self.size == 0:
+            raise ValueError("median of an empty TreapMap")
+        return self.select((self.size - 1) // 2)
+
+    def floor(self, key: KT) -> Optional[Tuple[KT, VT]]:
+        """Return the (key, value) pair with the largest key <= `key`.
+
+        Like the other nearest-key queries this is a single descent, in
+        O(log n) expected. Returns `None` if there is no such key.
+        """
+        return self._pair(self._floor_node(key, True))
+
+    def ceiling(self, key: KT) -> Optional[Tuple[KT, VT]]:
+        """Return the (key, value) pair with the smallest key >= `key`, or `None`."""
+        return self._pair(self._ceiling_node(key, True))
+
+    def lower(self, key: KT) -> Optional[Tuple[KT, VT]]:
+        """Return the (key, value) pair with the largest key < `key`, or `None`."""
+        return self._pair(self._floor_node(key, False))
+
+    def higher(self, key: KT) -> Optional[Tuple[KT, VT]]:
+        """Return the (key, value) pair with the smallest key > `key`, or `None`."""
+        return self._pair(self._ceiling_node(key, False))
+
+    def min(self) -> Tuple[KT, VT]:
+        """Return the (key, value) pair with the smallest key.
+
+        Raises:
+            ValueError: If this Treap is empty.
+        """
+        if self.root is None:
+            raise ValueError("min of an empty TreapMap")
+        return self._pair(self._first_node())
+
+    def max(self) -> Tuple[KT, VT]:
+        """Return the (key, value) pair with the largest key.
+
+        Raises:
+            ValueError: If this Treap is empty.
+        """
+        if self.root is None:
+            raise ValueError("max of an empty TreapMap")
+        return self._pair(self._last_node())
+
+    @staticmethod
+    def _pair(node: Optional[TreapNode]) -> Optional[Tuple[KT, VT]]:
+        return (node.key, node.value) if node is not None else None
+
+    def insert(self, key: KT, value: VT) -> None:
+        parent_node = None
+        current_node = self.root
+        while current_node is not None:
+            node_key = current_node.key
+            if key == node_key:
+                # an overwrite leaves every size as it was
+                current_node.value = value
+                self._refresh_path(current_node)
+                return
+            parent_node = current_node
+            if key < node_key:
+                current_node = current_node.left_child
             else:
-                #print("I AM HERE 2")
-                current_node.right_child = TreapNode(key, value, parent = current_node)
-                return current_node.right_child
+                current_node = current_node.right_child
+
+        new_node = self.node_type(
+            key, value, parent=parent_node, priority=self.priorities(key)
+        )
+        if parent_node is None:
+            self.root = new_node
+        elif key < parent_node.key:
+            parent_node.left_child = new_node
         else:
-            #print("I AM HERE")
-            current_node.value = value
-            return current_node
+            parent_node.right_child = new_node
+        self.size += 1
+        self._modifications += 1
+        ancestor = parent_node
+        while ancestor is not None:
+            ancestor.size += 1
+            ancestor = ancestor.parent
+        self._refresh_path(new_node)
+        self.priority_reorder(new_node)
 
-    def priority_reorder(self, current_node: TreapNode):
+    @classmethod
+    def from_sorted(cls, items: Iterable[Tuple[KT, VT]], **kwargs: Any) -> TreapMap[KT, VT]:
+        """Build a new TreapMap from (key, value) pairs sorted by key.
 
-        while current_node.parent and current_node.priority > current_node.parent.priority:
+        Sorted input is loaded in linear time; see `bulk_load`.
+
+        Args:
+            items: The (key, value) pairs to load.
+            **kwargs: Passed on to the constructor.
+        """
+        treap = cls(**kwargs)
+        treap.bulk_load(items)
+        return treap
+
+    def bulk_load(self, items: Iterable[Tuple[KT, VT]]) -> None:
+        """Replace the contents of this Treap with (key, value) pairs.
 
-            #print(f"Before Rotation | Node: {current_node.key}, Priority: {current_node.priority}")
-            #print(f"Before Rotation | Parent Node: {current_node.parent.key}, Priority: {current_node.parent.priority}")
+        Pairs sorted by key are linked into place in O(n) as a Cartesian
+        tree, without any descents or rotations. As soon as a key is
+        found out of order the input is sorted and loaded again. As
+        with `insert`, the last value given for a repeated key wins.
 
-            parent_is_lc = False
-            parent_is_rc = False
+        Args:
+            items: The (key, value) pairs to load.
+        """
+        iterator = iter(items)
+        out_of_order = self._build_sorted(iterator)
+        if out_of_order is not None:
+            pending = [(node.key, node.value) for node in self._iter_nodes(self.root)]
+            pending.append(out_of_order)
+            pending.extend(iterator)
+            pending.sort(key=itemgetter(0))
+            self._build_sorted(iter(pending))
 
-            parent_node = current_node.parent
-            if parent_node.is_root():
-                grandparent_node = None
-            else: 
-                grandparent_node = parent_node.parent
-                if parent_node.is_left_child():
-                    parent_is_lc = True
+    def _build_sorted(self, iterator: Iterator[Tuple[KT, VT]]) -> Optional[Tuple[KT, VT]]:
+        """Link sorted pairs from `iterator` into a new tree for this Treap.
+
+        Returns:
+            `None` once the iterator is exhausted, or the first pair whose
+            key is smaller than its predecessor's. In that case the
+            Treap holds the pairs before it and the rest of the iterator
+            is left unconsumed.
+        """
+        node_type = self.node_type
+        priorities = self.priorities
+        # right spine of the tree built so far, from the root down
+        spine: List[TreapNode] = []
+        size = 0
+        out_of_order = None
+        for item in iterator:
+            key, value = item
+            if spine:
+                last_key = spine[-1].key
+                if key == last_key:
+                    spine[-1].value = value
+                    continue
+                if key < last_key:
+                    out_of_order = item
+                    break
+            node = node_type(key, value, priority=priorities(key))
+            below = None
+            while spine and spine[-1].priority < node.priority:
+                # a node leaving the spine has a complete subtree
+                below = spine.pop()
+                self._update_node(below)
+            if below is not None:
+                node.left_child = below
+                below.parent = node
+            if spine:
+                spine[-1].right_child = node
+                node.parent = spine[-1]
+            spine.append(node)
+            size += 1
+
+        for node in reversed(spine):
+            self._update_node(node)
+        self.root = spine[0] if spine else None
+        self.size = size
+        self._modifications += 1
+        return out_of_order
+
+    def insert_many(self, items: Iterable[Tuple[KT, VT]]) -> BatchResult:
+        """Insert a batch of (key, value) pairs.
+
+        The batch is sorted and bulk-loaded into a treap of its own, which
+        is then merged into this one with a split/join union. For a batch
+        of m keys this costs O(m log(n/m + 1)) instead of m descents.
+        Batches much smaller than this Treap are inserted key by key in
+        sorted order instead, which is cheaper at that size. Values from
+        the batch overwrite existing values, and the last value given
+        for a repeated key wins.
+
+        Args:
+            items: The (key, value) pairs to insert.
+
+        Returns:
+            The number of new keys and of overwritten keys.
+        """
+        pending = sorted(items, key=itemgetter(0))
+        if len(pending) * 4 < self.size:
+            size_before = self.size
+            distinct = 0
+            for i, (key, value) in enumerate(pending):
+                if i + 1 < len(pending) and not key < pending[i + 1][0]:
+                    continue  # a later pair for the same key wins
+                self.insert(key, value)
+                distinct += 1
+            inserted = self.size - size_before
+            return BatchResult(inserted, distinct - inserted)
+
+        batch = self._new_empty()
+        batch.bulk_load(pending)
+        if batch.root is None:
+            return BatchResult(0, 0)
+        self.root, overwritten = self._union_nodes(self.root, batch.root, _take_other)
+        self.root.parent = None
+        inserted = batch.size - overwritten
+        self.size += inserted
+        self._modifications += 1
+        return BatchResult(inserted, overwritten)
+
+    def update(self, other: Union[Mapping[KT, VT], Iterable[Tuple[KT, VT]]]) -> BatchResult:
+        """Insert every pair of a mapping or iterable, like `dict.update`.
+
+        See `insert_many`.
+        """
+        if hasattr(other, "keys"):
+            mapping = cast(Mapping[KT, VT], other)
+            return self.insert_many((key, mapping[key]) for key in mapping.keys())
+        return self.insert_many(cast(Iterable[Tuple[KT, VT]], other))
+
+    def priority_reorder(self, current_node: TreapNode):
+        # Rotate the node up until its parent outranks it
+        while current_node.parent and current_node.priority > current_node.parent.priority:
+            self._rotate_up(current_node)
 
+    def _rotate_up(self, current_node: TreapNode) -> None:
+        """Rotate a node above its parent, keeping subtree sizes correct.
+
+        A left child rotates right and a right child rotates left.
+        """
+        parent_node = current_node.parent
+        grandparent_node = parent_node.parent
+
+        if parent_node.left_child is current_node:
             # rotate right
-            if current_node.is_left_child():
-                #print("ROTATE RIGHT")
-                if current_node.right_child is not None:
-                    child_node = current_node.right_child
-                    parent_node.left_child = child_node
-                    child_node.parent = parent_node
-                else:
-                    parent_node.left_child = None
-                current_node.right_child = parent_node
-                parent_node.parent = current_node
-                if grandparent_node is not None:
-                    current_node.parent = grandparent_node
-                    if parent_is_lc:
-                       grandparent_node.left_child = current_node
-                    else:
-                       grandparent_node.right_child = current_node
-                else:
-                    self.root = current_node
-                    current_node.parent = None
-           
+            child_node = current_node.right_child
+            parent_node.left_child = child_node
+            current_node.right_child = parent_node
+        else:
             # rotate left
-            else:
-                #print("ROTATE LEFT")
-                if current_node.left_child is not None:
-                    child_node = current_node.left_child
-                    parent_node.right_child = child_node
-                    child_node.parent = parent_node
-                else:
-                    parent_node.right_child = None
-                current_node.left_child = parent_node
-                parent_node.parent = current_node
-                if grandparent_node is not None:
-                    current_node.parent = grandparent_node
-                    if parent_is_lc:
-                       grandparent_node.left_child = current_node
-                    else:
-                       grandparent_node.right_child = current_node
-                else:
-                    self.root = current_node
-                    current_node.parent = None
+            child_node = current_node.left_child
+            parent_node.right_child = child_node
+            current_node.left_child = parent_node
+        if child_node is not None:
+            child_node.parent = parent_node
+        parent_node.parent = current_node
+
+        current_node.parent = grandparent_node
+        if grandparent_node is None:
+            self.root = current_node
+        elif grandparent_node.left_child is parent_node:
+            grandparent_node.left_child = current_node
+        else:
+            grandparent_node.right_child = current_node
 
-            #print(f"After Rotation | New Parent: {self.root.key if self.root else None}")
-            #print(f"Left Child of New Root: {self.root.left_child.key if self.root.left_child else None}")
-            #print(f"Right Child of New Root: {self.root.right_child.key if self.root.right_child else None}")
-        
-        #if current_node.parent:
-            #print("priority_reorder | BOTTOM OF LOOP:", current_node.parent.key, current_node.parent.priority)
-        #else:
-            #print("priority_reorder | BOTTOM OF LOOP: Root node reached")
-        #print("priority_reorder | BOTTOM OF LOOP | current_node.key, current_node.priority")
-        #print("priority_reorder | BOTTOM OF LOOP: ", current_node.key, current_node.priority)
+        self._update_node(parent_node)
+        self._update_node(current_node)
 
+    def _update_node(self, node: TreapNode) -> None:
+        # Recompute what a node caches about its subtree from its children
+        left, right = node.left_child, node.right_child
+        node.size = 1 + (left.size if left is not None else 0) + (right.size if right is not None else 0)
 
+    def _settle(self, node: TreapNode) -> None:
+        # Hook for subclasses that defer work on whole subtrees: bring the
+        # fields of a node found without a descent from the root up to date
+        pass
+
+    def _update_path(self, node: Optional[TreapNode]) -> None:
+        # Refresh a node and all of its ancestors, bottom up
+        while node is not None:
+            self._update_node(node)
+            node = node.parent
+
+    def _refresh_path(self, node: Optional[TreapNode]) -> None:
+        # Hook for subclasses that cache more than sizes: refresh a node
+        # and its ancestors after a value changed or a leaf came or went
+        # at `node`. Callers keep the sizes themselves, so this does nothing
+        pass
 
     def remove(self, key: KT) -> Optional[VT]:
-        if self.size > 1:
-            node_to_remove = self.recursive_lookup(key, self.root)
-            if node_to_remove:
-               self.reorder_to_remove(node_to_remove)
-               self.size -= 1
-            else:
-               return None
-        elif self.size == 1 and self.root.key == key:
-            self.root = None
-            self.size -= 1
-        else: 
+        node_to_remove = self.recursive_lookup(key, self.root)
+        if node_to_remove is None:
             return None
-        #print("*** Node to remove value: ", node_to_remove.value)
+        self._remove_node(node_to_remove)
         return node_to_remove.value
-        
-  
+
+    def _remove_node(self, node: TreapNode) -> None:
+        # Unlink a node that a search or a cursor has already found
+        self.reorder_to_remove(node)
+        self.size -= 1
+        self._modifications += 1
+
     def reorder_to_remove(self, current_node: TreapNode) -> None:
-            
+        # Rotate the node down, always lifting its higher-priority child,
+        # until it is a leaf
         while not current_node.is_leaf():
-
-            #print("reorder_to_remove | current_node.key: ", current_node.key)
-																														
-            current_is_lc = False
-            current_is_rc = False
- 
-            if current_node.is_root():
-                parent_node = None
-            else: 
-                parent_node = current_node.parent
-                if current_node.is_left_child():
-                    current_is_lc = True
-						  
             if current_node.has_both_children():
-                if current_node.left_child.priority > current_node.right_child.priority:  
-                    #print("ROTATE RIGHT")
-                    child_node = current_node.left_child           # DEFINE CHILD
-                    if child_node.right_child is not None:
-                        grandchild_node = child_node.right_child
-                        current_node.left_child = grandchild_node   # DEFINE GRANDCHILD
-                        grandchild_node.parent = current_node
-                    else:
-                        current_node.left_child = None
-                    child_node.right_child = current_node
-                    current_node.parent = child_node			   
-                    if parent_node is not None:
-                        child_node.parent = parent_node
-                        if current_is_lc:
-                           parent_node.left_child = child_node
-                        else:
-                           parent_node.right_child = child_node						   
-                    else:
-                        self.root = child_node
-                        child_node.parent = None					   
-
-                else: 
-                    #print("ROTATE LEFT")
-                    child_node = current_node.right_child            # DEFINE CHILD
-                    if child_node.left_child is not None:
-                        grandchild_node = child_node.left_child      # DEFINE GRANDCHILD
-                        current_node.right_child = grandchild_node
-                        grandchild_node.parent = current_node
-                    else:
-                        current_node.right_child = None
-                    child_node.left_child = current_node
-                    current_node.parent = child_node			   
-                    if parent_node is not None:
-                        child_node.parent = parent_node
-                        if current_is_lc:
-                           parent_node.left_child = child_node
-                        else:
-                           parent_node.right_child = child_node						   
-                    else:
-                        self.root = child_node
-                        child_node.parent = None		
- 
+                if current_node.left_child.priority > current_node.right_child.priority:
+                    child_node = current_node.left_child
+                else:
+                    child_node = current_node.right_child
+            elif current_node.has_left_child():
+                child_node = current_node.left_child
             else:
+                child_node = current_node.right_child
+            self._rotate_up(child_node)
 
-                if current_node.has_left_child():
-                    #print("ROTATE RIGHT")
-                    child_node = current_node.left_child            # DEFINE CHILD
-                    if child_node.right_child is not None:
-                        grandchild_node = child_node.right_child
-                        current_node.left_child = grandchild_node   # DEFINE GRANDCHILD
-                        grandchild_node.parent = current_node
-                    else:
-                        current_node.left_child = None
-                    child_node.right_child = current_node
-                    current_node.parent = child_node			   
-                    if parent_node is not None:
-                        child_node.parent = parent_node
-                        if current_is_lc:
-                           parent_node.left_child = child_node
-                        else:
-                           parent_node.right_child = child_node						   
-                    else:
-                        self.root = child_node
-                        child_node.parent = None	
+        # current node is now a leaf; remove current node
+        parent_node = current_node.parent
+        if parent_node is None:
+            self.root = None
+        elif current_node is parent_node.left_child:
+            parent_node.left_child = None
+        else:
+            parent_node.right_child = None
+        current_node.parent = None
+        ancestor = parent_node
+        while ancestor is not None:
+            ancestor.size -= 1
+            ancestor = ancestor.parent
+        self._refresh_path(parent_node)
+
+    def split(self, threshold: KT) -> List[Treap[KT, VT]]:
+        # One descent splits the tree; the threshold key itself goes right
+        left_root, threshold_node, right_root = self._split_nodes(self.root, threshold)
+        if threshold_node is not None:
+            right_root = self._merge_nodes(threshold_node, right_root)
+
+        left_treap = self._new_empty()
+        right_treap = self._new_empty()
+        for treap, root in ((left_treap, left_root), (right_treap, right_root)):
+            if root is not None:
+                root.parent = None
+                treap.root = root
+                treap.size = root.size
 
+        # the nodes now belong to the two new treaps
+        self.root = None
+        self.size = 0
+        self._modifications += 1
+        return [left_treap, right_treap]
+
+    def join(self, _other: Treap[KT, VT]) -> None:
+        """Join with a Treap whose keys all lie on one side of this one's.
+
+        Runs in O(log n). The other treap is left empty.
+
+        Raises:
+            ValueError: If `other` is this treap, or if the key ranges of
+                the two treaps overlap.
+        """
+        other = cast(TreapMap, _other)
+        if other is self:
+            raise ValueError("cannot join a map with itself")
+
+        # Check if second treap is empty
+        if other.root is None:
+            return
+        # Check if first treap is empty
+        if self.root is None:
+            self.root = other.root
+        else:
+            low, high = (self, other) if self.root.key < other.root.key else (other, self)
+            if not low._last_node().key < high._first_node().key:
+                raise ValueError("cannot join maps whose key ranges overlap")
+            # Zip the inner spines of the two treaps together by priority
+            self.root = self._merge_nodes(low.root, high.root)
+        self.root.parent = None
+        self.size += other.size
+        self._modifications += 1
+
+        # the nodes now belong to this treap
+        other.root = None
+        other.size = 0
+        other._modifications += 1
+
+    def _split_nodes(
+        self, root: Optional[TreapNode], threshold: KT
+    ) -> Tuple[Optional[TreapNode], Optional[TreapNode], Optional[TreapNode]]:
+        """Split the subtree at `root` around `threshold` in one descent.
+
+        Returns:
+            The roots of the subtrees of keys less than and greater than
+            `threshold`, and between them the detached node holding
+            `threshold` itself, if there is one.
+        """
+        left_root = right_root = None
+        # the deepest node of each side, whose inner child is still open
+        left_tail = right_tail = None
+        equal_node = None
+        left_rest = right_rest = None
+        visited = []
+        current_node = root
+        while current_node is not None:
+            visited.append(current_node)
+            node_key = current_node.key
+            if node_key < threshold:
+                if left_tail is None:
+                    left_root = current_node
+                else:
+                    left_tail.right_child = current_node
+                current_node.parent = left_tail
+                left_tail = current_node
+                current_node = current_node.right_child
+            elif threshold < node_key:
+                if right_tail is None:
+                    right_root = current_node
                 else:
-                    #print("ROTATE LEFT")
-                    child_node = current_node.right_child            # DEFINE CHILD
-                    if child_node.left_child is not None:
-                        grandchild_node = child_node.left_child      # DEFINE GRANDCHILD
-                        current_node.right_child = grandchild_node
-                        grandchild_node.parent = current_node
-                    else:
-                        current_node.right_child = None
-                    child_node.left_child = current_node
-                    current_node.parent = child_node			   
-                    if parent_node is not None:
-                        child_node.parent = parent_node
-                        if current_is_lc:
-                           parent_node.left_child = child_node
-                        else:
-                           parent_node.right_child = child_node						   
-                    else:
-                        self.root = child_node
-                        child_node.parent = None	
+                    right_tail.left_child = current_node
+                current_node.parent = right_tail
+                right_tail = current_node
+                current_node = current_node.left_child
+            else:
+                equal_node = current_node
+                left_rest = equal_node.left_child
+                right_rest = equal_node.right_child
+                equal_node.parent = equal_node.left_child = equal_node.right_child = None
+                break
 
-        # current node is now a leaf; remove current node
-        if current_node == current_node.parent.left_child:
-            current_node.parent.left_child = None
-        else:																		 
-            current_node.parent.right_child = None
-																							
+        if left_tail is None:
+            left_root = left_rest
+        else:
+            left_tail.right_child = left_rest
+        if left_rest is not None:
+            left_rest.parent = left_tail
+        if right_tail is None:
+            right_root = right_rest
+        else:
+            right_tail.left_child = right_rest
+        if right_rest is not None:
+            right_rest.parent = right_tail
+        if equal_node is not None:
+            visited.pop()
+            self._update_node(equal_node)
+        for node in reversed(visited):
+            self._update_node(node)
+        return left_root, equal_node, right_root
 
+    def _merge_nodes(
+        self, low: Optional[TreapNode], high: Optional[TreapNode]
+    ) -> Optional[TreapNode]:
+        """Merge two subtrees whose keys are all less in `low` than in `high`.
 
-    def split(self, threshold: KT) -> List[Treap[KT, VT]]:
+        The right spine of `low` and the left spine of `high` are zipped
+        together by priority. Returns the root of the merged subtree, whose
+        parent is left for the caller to set.
+        """
+        root = above = None
+        attach_right = False
+        visited = []
+        while low is not None and high is not None:
+            if low.priority >= high.priority:
+                node, low = low, low.right_child
+                next_right = True
+            else:
+                node, high = high, high.left_child
+                next_right = False
+            if above is None:
+                root = node
+            elif attach_right:
+                above.right_child = node
+            else:
+                above.left_child = node
+            node.parent = above
+            above, attach_right = node, next_right
+            visited.append(node)
+        rest = low if low is not None else high
+        if above is None:
+            return rest
+        if attach_right:
+            above.right_child = rest
+        else:
+            above.left_child = rest
+        if rest is not None:
+            rest.parent = above
+        for node in reversed(visited):
+            self._update_node(node)
+        return root
+
+    def _union_nodes(
+        self,
+        mine: Optional[TreapNode],
+        theirs: Optional[TreapNode],
+        resolve: Callable[[KT, VT, VT], VT],
+    ) -> Tuple[Optional[TreapNode], int]:
+        """Union two subtrees by recursively splitting on the higher root.
+
+        The recursion depth is bounded by the heights of the subtrees.
 
-        # Check if threshold key already exists in treap
-        dummy_threshold_node = False
-        threshold_node = self.recursive_lookup(threshold, self.root)
-        #print(f"Splitting at threshold key: {threshold}")
+        Args:
+            mine: Root of the first subtree.
+            theirs: Root of the second subtree.
+            resolve: Called as `resolve(key, my_value, their_value)` for a key
+                present in both, returning the value to keep.
 
-        if threshold_node is None:
-            dummy_threshold_node = True
-            threshold_node = self.split_insert(threshold, None)
+        Returns:
+            The root of the union, with its parent left for the caller to
+            set, and the number of keys present in both subtrees.
+        """
+        if mine is None:
+            return theirs, 0
+        if theirs is None:
+            return mine, 0
+        if mine.priority >= theirs.priority:
+            root = mine
+            low, equal_node, high = self._split_nodes(theirs, mine.key)
+            if equal_node is not None:
+                root.value = resolve(root.key, root.value, equal_node.value)
+            left, left_common = self._union_nodes(root.left_child, low, resolve)
+            right, right_common = self._union_nodes(root.right_child, high, resolve)
         else:
-            threshold_node.priority = TreapNode.MAX_PRIORITY 
-            self.priority_reorder(threshold_node)
-        
-        left_treap = TreapMap()
-        right_treap = TreapMap()
-
-        left_treap.root = threshold_node.left_child
-        if dummy_threshold_node == False: 
-            right_treap.root = threshold_node
-        elif dummy_threshold_node == True: 
-            right_treap.root = threshold_node.right_child
-        left_treap.size = left_treap.count_nodes()
-        right_treap.size = right_treap.count_nodes()
-
-        #print("right_treap")
-        #print(right_treap)
-        #print("left_treap")
-        #print(left_treap)
-
-        #print("left treap count nodes")
-        #print(left_treap.count_nodes())
-
-        #print("right treap count nodes")
-        #print(right_treap.count_nodes())
-
-        threshold_node.left_child = None
-        
-        #print(f"Left treap root: {left_treap.root.key if left_treap.root else None}")
-        #print(f"Right treap root: {right_treap.root.key if right_treap.root else None}")
-        #print(f"Threshold node left child after split: {threshold_node.left_child.key}")
-        #print(f"Threshold node right child after split: {threshold_node.right_child.key}")
+            root = theirs
+            low, equal_node, high = self._split_nodes(mine, theirs.key)
+            if equal_node is not None:
+                root.value = resolve(root.key, equal_node.value, root.value)
+            left, left_common = self._union_nodes(low, root.left_child, resolve)
+            right, right_common = self._union_nodes(high, root.right_child, resolve)
+        self._set_children(root, left, right)
+        return root, left_common + right_common + (equal_node is not None)
 
-        return [left_treap, right_treap]
+    def _difference_nodes(
+        self, mine: Optional[TreapNode], theirs: Optional[TreapNode]
+    ) -> Optional[TreapNode]:
+        # Keep the nodes of `mine` whose keys are not in `theirs`
+        if mine is None or theirs is None:
+            return mine
+        low, equal_node, high = self._split_nodes(theirs, mine.key)
+        left = self._difference_nodes(mine.left_child, low)
+        right = self._difference_nodes(mine.right_child, high)
+        if equal_node is not None:
+            return self._merge_nodes(left, right)
+        return self._set_children(mine, left, right)
 
+    def _intersection_nodes(
+        self,
+        mine: Optional[TreapNode],
+        theirs: Optional[TreapNode],
+        resolve: Callable[[KT, VT, VT], VT],
+    ) -> Optional[TreapNode]:
+        # Keep the nodes of `mine` whose keys are also in `theirs`
+        if mine is None or theirs is None:
+            return None
+        low, equal_node, high = self._split_nodes(theirs, mine.key)
+        left = self._intersection_nodes(mine.left_child, low, resolve)
+        right = self._intersection_nodes(mine.right_child, high, resolve)
+        if equal_node is None:
+            return self._merge_nodes(left, right)
+        mine.value = resolve(mine.key, mine.value, equal_node.value)
+        return self._set_children(mine, left, right)
 
-    def split_insert(self, key: KT, value: None) -> TreapNode:
-        if self.root:
-            threshold_node = self.recursive_insert(key, value, self.root)
+    def _symmetric_difference_nodes(
+        self, mine: Optional[TreapNode], theirs: Optional[TreapNode]
+    ) -> Optional[TreapNode]:
+        # Keep the nodes of either subtree whose keys are not in the other
+        if mine is None:
+            return theirs
+        if theirs is None:
+            return mine
+        if mine.priority >= theirs.priority:
+            root = mine
+            low, equal_node, high = self._split_nodes(theirs, mine.key)
+            left = self._symmetric_difference_nodes(mine.left_child, low)
+            right = self._symmetric_difference_nodes(mine.right_child, high)
         else:
-            threshold_node = TreapNode(key, value)
-            self.root = threshold_node
-        self.size =+ 1
+            root = theirs
+            low, equal_node, high = self._split_nodes(mine, theirs.key)
+            left = self._symmetric_difference_nodes(low, theirs.left_child)
+            right = self._symmetric_difference_nodes(high, theirs.right_child)
+        if equal_node is not None:
+            return self._merge_nodes(left, right)
+        return self._set_children(root, left, right)
 
-        threshold_node.priority = TreapNode.MAX_PRIORITY
+    def _set_children(
+        self, root: TreapNode, left: Optional[TreapNode], right: Optional[TreapNode]
+    ) -> TreapNode:
+        root.left_child = left
+        root.right_child = right
+        if left is not None:
+            left.parent = root
+        if right is not None:
+            right.parent = root
+        self._update_node(root)
+        return root
 
-        self.priority_reorder(threshold_node)
-        #print(f"After priority_reorder | threshold_node.key: {threshold_node.key}")
-        #print(f"Left child key (should be left subheap root): {threshold_node.left_child.key if threshold_node.left_child else None}")
-        #print(f"Right child key (should be right subheap root): {threshold_node.right_child.key if threshold_node.right_child else None}")
+    def meld(
+        self,
+        other: Treap[KT, VT],
+        conflict: Union[str, Callable[[KT, VT, VT], VT]] = "theirs",
+    ) -> None:
+        """Meld another Treap into this one, as a set union of keys.
 
-        return threshold_node
+        Both treaps are combined by recursively splitting the one with
+        the lower root priority on the key of the other's root, which
+        runs in O(m log(n/m + 1)) for sizes m <= n. The other treap is
+        left empty.
 
+        Args:
+            other: The TreapMap to meld with.
+            conflict: What to do with a key present in both treaps:
+                "theirs" keeps the other treap's value, "mine" keeps this
+                treap's value, and a callable is called as
+                `conflict(key, my_value, their_value)` and returns the
+                value to keep.
 
-    def join(self, _other: Treap[KT, VT]) -> None:
+        Melding a treap with itself leaves it unchanged.
+        """
+        if other is self:
+            return
+        other_map = cast(TreapMap, other)
+        resolve = _CONFLICT_POLICIES[conflict] if isinstance(conflict, str) else conflict
+        root, _ = self._union_nodes(self.root, other_map.root, resolve)
+        self._set_root(root)
+        other_map._set_root(None)
 
-        # Check if first treap is empty
-        if self.root is None:
-            # If first treap is empty, return the other treap
-            self.root = _other.root
-            self.size = _other.size
+    def difference(self, other: Treap[KT, VT]) -> None:
+        """Remove the keys of another Treap from this one.
+
+        Runs in O(m log(n/m + 1)) by splitting the other treap on each
+        root key of this one. The other treap is left empty; the
+        difference of a treap with itself is empty.
+        """
+        if other is self:
+            self._set_root(None)
             return
-        # Check if second treap is empty
-        if _other.root is None:
-            # If second treap is empty, return the first treap
+        other_map = cast(TreapMap, other)
+        self._set_root(self._difference_nodes(self.root, other_map.root))
+        other_map._set_root(None)
+
+    def intersection(
+        self,
+        other: Treap[KT, VT],
+        conflict: Union[str, Callable[[KT, VT, VT], VT]] = "mine",
+    ) -> None:
+        """Keep only the keys that are also in another Treap.
+
+        Runs in O(m log(n/m + 1)). The other treap is left empty;
+        intersecting a treap with itself leaves it unchanged.
+
+        Args:
+            other: The TreapMap to intersect with.
+            conflict: Which value to keep for each remaining key; see
+                `meld`. Defaults to this treap's value.
+        """
+        if other is self:
             return
-        
-        # Create dummy root for joined treap
-        dummy_root = TreapNode(key='dummy', value=None)
-        dummy_root.priority = TreapNode.MAX_PRIORITY
-        # Determine the dummy root's left child and right child
-        if self.root.key < _other.root.key:
-            dummy_root.left_child = self.root
-            dummy_root.right_child = _other.root
-        else:
-            dummy_root.left_child = _other.root
-            dummy_root.right_child = self.root   
+        other_map = cast(TreapMap, other)
+        resolve = _CONFLICT_POLICIES[conflict] if isinstance(conflict, str) else conflict
+        self._set_root(self._intersection_nodes(self.root, other_map.root, resolve))
+        other_map._set_root(None)
 
-        # Make dummy root the parent of the two treaps to be joined
-        self.root.parent = dummy_root
-        _other.root.parent = dummy_root
+    def symmetric_difference(self, other: Treap[KT, VT]) -> None:
+        """Keep the keys that are in exactly one of the two Treaps.
 
-        self.root = dummy_root
-        self.remove(key='dummy')
+        Runs in O(m log(n/m + 1)). The other treap is left empty; the
+        symmetric difference of a treap with itself is empty.
+        """
+        if other is self:
+            self._set_root(None)
+            return
+        other_map = cast(TreapMap, other)
+        self._set_root(self._symmetric_difference_nodes(self.root, other_map.root))
+        other_map._set_root(None)
 
-        self.size += _other.size
+    def _set_root(self, root: Optional[TreapNode]) -> None:
+        if root is not None:
+            root.parent = None
+        self.root = root
+        self.size = root.size if root is not None else 0
+        self._modifications += 1
 
-  
-    
-    def meld(self, other: Treap[KT, VT]) -> None: # KARMA
-        raise AttributeError
-    def difference(self, other: Treap[KT, VT]) -> None: # KARMA
-        raise AttributeError
-    def balance_factor(self) -> float: # KARMA
-        raise AttributeError
+    def _to_preorder(self) -> Tuple[List[KT], List[VT], List[int]]:
+        """Flatten this Treap into pre-order keys, values and priorities.
+
+        The three lists describe the tree exactly: `_load_preorder`
+        rebuilds the same shape from them.
+        """
+        keys: List[KT] = []
+        values: List[VT] = []
+        priorities: List[int] = []
+        for node in self._iter_preorder():
+            keys.append(node.key)
+            values.append(node.value)
+            priorities.append(node.priority)
+        return keys, values, priorities
+
+    def _iter_preorder(self) -> typing.Iterator[TreapNode]:
+        # Parents before children, left subtrees before right ones
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right_child is not None:
+                stack.append(node.right_child)
+            if node.left_child is not None:
+                stack.append(node.left_child)
+
+    def _load_preorder(
+        self, keys: Iterable[KT], values: Iterable[VT], priorities: Iterable[int]
+    ) -> None:
+        """Replace the contents of this Treap with a pre-order flattening.
+
+        Runs in O(n) without rotations: each node becomes the left child
+        of the previous node, or the right child of the last ancestor on
+        the stack with a smaller key.
+        """
+        self._load_preorder_items(zip(keys, values, priorities))
+
+    def _load_preorder_items(self, items: Iterable[Tuple[KT, VT, int]]) -> None:
+        # _load_preorder over (key, value, priority) triples, read lazily
+        node_type = self.node_type
+        root = None
+        stack: List[TreapNode] = []
+        nodes: List[TreapNode] = []
+        for key, value, priority in items:
+            node = node_type(key, value, priority=priority)
+            if not stack:
+                root = node
+            elif key < stack[-1].key:
+                stack[-1].left_child = node
+                node.parent = stack[-1]
+            else:
+                above = stack.pop()
+                while stack and stack[-1].key < key:
+                    above = stack.pop()
+                above.right_child = node
+                node.parent = above
+            stack.append(node)
+            nodes.append(node)
+        # children come after their parents in pre-order
+        for node in reversed(nodes):
+            self._update_node(node)
+        self.root = root
+        self.size = len(nodes)
+        self._modifications += 1
+
+    def dump(self, path: serialization.PathOrFile) -> None:
+        """Save this Treap in a compact binary format; see `serialization`.
+
+        The tree is written one chunk of nodes at a time, so saving does
+        not need a second copy of the map in memory.
+
+        Args:
+            path: A path, or a file object opened for binary writing.
+        """
+        serialization.dump(self, path)
+
+    @classmethod
+    def load(cls, path: serialization.PathOrFile, **kwargs: Any) -> TreapMap[KT, VT]:
+        """Build a TreapMap from a file written by `dump`.
+
+        The saved shape and priorities are restored exactly, in O(n)
+        and without rotations. Only load files from trusted sources.
+
+        Args:
+            path: A path, or a file object opened for binary reading.
+            **kwargs: Passed on to the constructor.
+        """
+        treap = cls(**kwargs)
+        serialization.load_into(treap, path)
+        return treap
+
+    def copy(self) -> TreapMap[KT, VT]:
+        """Return a copy of this Treap with the same shape and priorities."""
+        treap = self._new_empty()
+        treap._load_preorder(*self._to_preorder())
+        return treap
+
+    def __or__(self, other: TreapMap[KT, VT]) -> TreapMap[KT, VT]:
+        result = self.copy()
+        result.meld(other.copy())
+        return result
+
+    def __and__(self, other: TreapMap[KT, VT]) -> TreapMap[KT, VT]:
+        result = self.copy()
+        result.intersection(other.copy())
+        return result
+
+    def __sub__(self, other: TreapMap[KT, VT]) -> TreapMap[KT, VT]:
+        result = self.copy()
+        result.difference(other.copy())
+        return result
+
+    def __xor__(self, other: TreapMap[KT, VT]) -> TreapMap[KT, VT]:
+        result = self.copy()
+        result.symmetric_difference(other.copy())
+        return result
+
+    def balance_factor(self) -> float:
+        """Return the height divided by the minimum height for this size.
+
+        An empty or perfectly balanced Treap has a balance factor of 1.0.
+        """
+        if self.size == 0:
+            return 1.0
+        return self.stats().height / self.size.bit_length()
+
+    def stats(self) -> TreapStats:
+        """Measure the shape of this Treap in one iterative pass.
+
+        Returns:
+            A TreapStats with the height, leaf count, mean depth and the
+            number of nodes at each depth.
+        """
+        depth_counts: List[int] = []
+        leaf_count = 0
+        total_depth = 0
+        stack = [(self.root, 0)] if self.root is not None else []
+        while stack:
+            node, depth = stack.pop()
+            if depth == len(depth_counts):
+                depth_counts.append(0)
+            depth_counts[depth] += 1
+            total_depth += depth
+            left, right = node.left_child, node.right_child
+            if left is None and right is None:
+                leaf_count += 1
+                continue
+            if right is not None:
+                stack.append((right, depth + 1))
+            if left is not None:
+                stack.append((left, depth + 1))
+        return TreapStats(
+            size=self.size,
+            height=len(depth_counts),
+            leaf_count=leaf_count,
+            mean_depth=total_depth / self.size if self.size else 0.0,
+            depth_counts=depth_counts,
+        )
 
     
     def __str__(self) -> str:
@@ -407,45 +1080,242 @@ class TreapMap(Treap[KT, VT]):
         if not self.root:
             return "Empty Treap"
 
-        # Inner recursive function to help format each node
-        def display(node: TreapNode, depth: int = 0, max_depth: int = 10) -> str:
-            if not node:
-                return ""
-        
+        # Pre-order walk with an explicit stack of (node, depth) pairs
+        lines = []
+        stack = [(self.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node is None:
+                lines.append(f"{' ' * depth * 2}- None\n")
+                continue
             # Format current node's info: key, value, and priority
-            node_info = f"{' ' * depth * 2}- (Key: {node.key}, Value: {node.value}, Priority: {node.priority})\n"
-        
-            # Recursively format the left and right children
-            left_info = display(node.left_child, depth + 1) if node.left_child else f"{' ' * (depth + 1) * 2}- None\n"
-            right_info = display(node.right_child, depth + 1) if node.right_child else f"{' ' * (depth + 1) * 2}- None\n"
-        
-            return node_info + left_info + right_info
-    
-        # Generate the display string for the entire treap
-        return display(self.root)
+            lines.append(f"{' ' * depth * 2}- (Key: {node.key}, Value: {node.value}, Priority: {node.priority})\n")
+            stack.append((node.right_child, depth + 1))
+            stack.append((node.left_child, depth + 1))
+        return "".join(lines)
 
 
+    def __iter__(self) -> typing.Iterator[KT]:
+        for node in self._walk():
+            yield node.key
 
+    def __reversed__(self) -> typing.Iterator[KT]:
+        for node in self._walk(reverse=True):
+            yield node.key
 
-    def __iter__(self) -> typing.Iterator[KT]:
-        # empty case
-        if self.root is None:
+    def traverse(self, current_node: TreapNode) -> typing.Iterator[KT]:
+        # In-order walk with an explicit stack of pending ancestors
+        stack = []
+        while stack or current_node is not None:
+            # Descend through the left subtreap, remembering the path
+            while current_node is not None:
+                stack.append(current_node)
+                current_node = current_node.left_child
+            # yield the deepest pending node, then walk its right subtreap
+            current_node = stack.pop()
+            yield current_node.key
+            current_node = current_node.right_child
+
+    def _iter_nodes(self, current_node: Optional[TreapNode]) -> typing.Iterator[TreapNode]:
+        # Same walk as traverse, yielding the nodes themselves
+        stack = []
+        while stack or current_node is not None:
+            while current_node is not None:
+                stack.append(current_node)
+                current_node = current_node.left_child
+            current_node = stack.pop()
+            yield current_node
+            current_node = current_node.right_child
+
+    def cursor(self, key: Optional[KT] = None) -> TreapCursor[KT, VT]:
+        """Return a cursor on `key` or the smallest larger key.
+
+        Without a key the cursor starts on the smallest key. See
+        TreapCursor.
+        """
+        cursor: TreapCursor[KT, VT] = TreapCursor(self)
+        if key is None:
+            cursor.first()
+        else:
+            cursor.seek(key)
+        return cursor
+
+    def _walk(self, reverse: bool = False) -> typing.Iterator[TreapNode]:
+        # In-order walk with an explicit stack that fails fast if the tree
+        # changes shape between two steps
+        modifications = self._modifications
+        stack = []
+        current_node = self.root
+        if not reverse:
+            while stack or current_node is not None:
+                while current_node is not None:
+                    stack.append(current_node)
+                    current_node = current_node.left_child
+                current_node = stack.pop()
+                yield current_node
+                if self._modifications != modifications:
+                    raise RuntimeError("TreapMap changed during iteration")
+                current_node = current_node.right_child
+        else:
+            while stack or current_node is not None:
+                while current_node is not None:
+                    stack.append(current_node)
+                    current_node = current_node.right_child
+                current_node = stack.pop()
+                yield current_node
+                if self._modifications != modifications:
+                    raise RuntimeError("TreapMap changed during iteration")
+                current_node = current_node.left_child
+
+    def irange(
+        self,
+        lo: Optional[KT] = None,
+        hi: Optional[KT] = None,
+        inclusive: Tuple[bool, bool] = (True, False),
+        reverse: bool = False,
+    ) -> typing.Iterator[KT]:
+        """Iterate lazily over the keys between two bounds.
+
+        The iterator descends once to the first key in range and then
+        steps to its neighbours along parent pointers, so a window of k
+        keys costs O(log n + k). Without bounds it walks the whole tree
+        in O(1) amortized per key.
+
+        Like iterating a dict, advancing the iterator after the tree has
+        gained or lost keys raises RuntimeError. Overwriting the value
+        of an existing key is allowed.
+
+        Args:
+            lo: The lower bound, or `None` for no lower bound.
+            hi: The upper bound, or `None` for no upper bound.
+            inclusive: Whether `lo` and `hi` themselves are in range.
+            reverse: Iterate from the largest key down.
+        """
+        for node in self._irange_nodes(lo, hi, inclusive, reverse):
+            yield node.key
+
+    def keys(
+        self,
+        lo: Optional[KT] = None,
+        hi: Optional[KT] = None,
+        inclusive: Tuple[bool, bool] = (True, False),
+        reverse: bool = False,
+    ) -> typing.Iterator[KT]:
+        """Iterate lazily over keys; the same as `irange`."""
+        return self.irange(lo, hi, inclusive, reverse)
+
+    def items(
+        self,
+        lo: Optional[KT] = None,
+        hi: Optional[KT] = None,
+        inclusive: Tuple[bool, bool] = (True, False),
+        reverse: bool = False,
+    ) -> typing.Iterator[Tuple[KT, VT]]:
+        """Iterate lazily over (key, value) pairs; see `irange`."""
+        for node in self._irange_nodes(lo, hi, inclusive, reverse):
+            yield node.key, node.value
+
+    def values(
+        self,
+        lo: Optional[KT] = None,
+        hi: Optional[KT] = None,
+        inclusive: Tuple[bool, bool] = (True, False),
+        reverse: bool = False,
+    ) -> typing.Iterator[VT]:
+        """Iterate lazily over values in key order; see `irange`."""
+        for node in self._irange_nodes(lo, hi, inclusive, reverse):
+            yield node.value
+
+    def _irange_nodes(
+        self,
+        lo: Optional[KT],
+        hi: Optional[KT],
+        inclusive: Tuple[bool, bool],
+        reverse: bool,
+    ) -> typing.Iterator[TreapNode]:
+        if lo is None and hi is None:
+            yield from self._walk(reverse)
             return
+        lo_inclusive, hi_inclusive = inclusive
+        modifications = self._modifications
+        if not reverse:
+            if lo is None:
+                node = self._first_node()
+            else:
+                node = self._ceiling_node(lo, lo_inclusive)
+            while node is not None:
+                if hi is not None and (hi < node.key or (not hi_inclusive and not node.key < hi)):
+                    return
+                yield node
+                if self._modifications != modifications:
+                    raise RuntimeError("TreapMap changed during iteration")
+                node = self._successor(node)
         else:
-            yield from self.traverse(self.root)
+            if hi is None:
+                node = self._last_node()
+            else:
+                node = self._floor_node(hi, hi_inclusive)
+            while node is not None:
+                if lo is not None and (node.key < lo or (not lo_inclusive and not lo < node.key)):
+                    return
+                yield node
+                if self._modifications != modifications:
+                    raise RuntimeError("TreapMap changed during iteration")
+                node = self._predecessor(node)
+
+    def _first_node(self) -> Optional[TreapNode]:
+        return self.root.findMin() if self.root is not None else None
+
+    def _last_node(self) -> Optional[TreapNode]:
+        current_node = self.root
+        if current_node is not None:
+            while current_node.right_child is not None:
+                current_node = current_node.right_child
+        return current_node
+
+    def _ceiling_node(self, key: KT, inclusive: bool = True) -> Optional[TreapNode]:
+        # Smallest node with a key above `key` (or equal to it, if inclusive)
+        best = None
+        current_node = self.root
+        while current_node is not None:
+            node_key = current_node.key
+            if key < node_key or (inclusive and not node_key < key):
+                best = current_node
+                current_node = current_node.left_child
+            else:
+                current_node = current_node.right_child
+        return best
+
+    def _floor_node(self, key: KT, inclusive: bool = True) -> Optional[TreapNode]:
+        # Largest node with a key below `key` (or equal to it, if inclusive)
+        best = None
+        current_node = self.root
+        while current_node is not None:
+            node_key = current_node.key
+            if node_key < key or (inclusive and not key < node_key):
+                best = current_node
+                current_node = current_node.right_child
+            else:
+                current_node = current_node.left_child
+        return best
+
+    def _successor(self, node: TreapNode) -> Optional[TreapNode]:
+        if node.right_child is not None:
+            return node.right_child.findMin()
+        while node.parent is not None and node.parent.right_child is node:
+            node = node.parent
+        return node.parent
+
+    def _predecessor(self, node: TreapNode) -> Optional[TreapNode]:
+        if node.left_child is not None:
+            node = node.left_child
+            while node.right_child is not None:
+                node = node.right_child
+            return node
+        while node.parent is not None and node.parent.left_child is node:
+            node = node.parent
+        return node.parent
 
-    def traverse(self, current_node: TreapNode) -> typing.Iterator[KT]:
-        # Traverse through left subtreap
-        if current_node.left_child is not None:
-            #print(f"In traverse: Checking left child is not None (key value =): {current_node.left_child.key}")
-            yield from self.traverse(current_node.left_child)
-        # yield current node key (root key)
-        yield current_node.key
-        # Traverse through right subtreap
-        if current_node.right_child is not None:
-            #print(f"In traverse: Checking right child is not None (key value =): {current_node.right_child.key}")
-            yield from self.traverse(current_node.right_child)
-    
     def count_nodes(self) -> int:
         # Using the iterator directly to count nodes
         return sum(1 for _ in self.__iter__())
@@ -6,7 +6,50 @@ from typing import List, Optional, cast, Set
 
 from py_treaps.comparable import KT, VT
 
-class TreapNode:
+
+class _TreapNodeBase:
+    """Slot layout and tree helpers shared by the node classes.
+
+    Nodes are allocated in large numbers, so every node class declares
+    `__slots__` instead of carrying a per-instance `__dict__`.
+    """
+
+    __slots__ = ("key", "priority", "parent", "left_child", "right_child", "size")
+
+    def has_left_child(self):
+        return self.left_child
+
+    def has_right_child(self):
+        return self.right_child
+    
+    def is_left_child(self):
+        return self.parent and self.parent.left_child == self
+
+    def is_right_child(self):
+        return self.parent and self.parent.right_child == self
+    
+    def is_root(self):
+        return not self.parent
+    
+    def is_leaf(self):
+        return not (self.left_child or self.right_child)
+    
+    def has_any_children(self):
+        return self.left_child or self.right_child
+    
+    def has_both_children(self):
+        return self.left_child and self.right_child
+    
+    def findMin(self):
+        current = self
+        while current.has_left_child():
+            current = current.left_child
+        return current
+
+
+class TreapNode(_TreapNodeBase):
+
+    __slots__ = ("value",)
 
     unused_priorities: Optional[List[int]] = None
 
@@ -31,40 +74,22 @@ class TreapNode:
     """
 
     def __init__(
-        self, key: KT, value: VT, parent: Optional[TreapNode] = None
+        self,
+        key: KT,
+        value: VT,
+        parent: Optional[TreapNode] = None,
+        priority: Optional[int] = None,
     ):
         self.key: KT = key
         self.value: VT = value
-        self.priority: int = self.get_priority()
+        self.priority: int = self.get_priority() if priority is None else priority
 
         self.parent: Optional[TreapNode] = parent
         self.left_child: Optional[TreapNode] = None
         self.right_child: Optional[TreapNode] = None
+        # number of nodes in the subtree rooted here, kept up to date by TreapMap
+        self.size: int = 1
 
-    def has_left_child(self):
-        return self.left_child
-
-    def has_right_child(self):
-        return self.right_child
-    
-    def is_left_child(self):
-        return self.parent and self.parent.left_child == self
-
-    def is_right_child(self):
-        return self.parent and self.parent.right_child == self
-    
-    def is_root(self):
-        return not self.parent
-    
-    def is_leaf(self):
-        return not (self.left_child or self.right_child)
-    
-    def has_any_children(self):
-        return self.left_child or self.right_child
-    
-    def has_both_children(self):
-        return self.left_child and self.right_child
-    
     def replace_node_data(self, key, value, priority, left_child, right_child):
         self.key = key
         self.value = value
@@ -76,12 +101,6 @@ class TreapNode:
         if self.has_right_child():
             self.right_child.parent = self
 
-    def findMin(self):
-        current = self
-        while current.has_left_child():
-            current = current.left_child
-        return current
-
     def get_priority(self):
         """Generate a new priority for a treap node.
     
@@ -97,4 +116,130 @@ class TreapNode:
             random.shuffle(TreapNode.unused_priorities)
         return TreapNode.unused_priorities.pop()
 
+
+class AggregateTreapNode(TreapNode):
+    """A TreapNode that also caches an aggregate of its subtree's values.
+
+    Attributes:
+        agg (Any): The aggregate of the values in the subtree rooted at
+            this node, maintained by AggregateTreapMap.
+    """
+
+    __slots__ = ("agg",)
+
+    def __init__(
+        self,
+        key: KT,
+        value: VT,
+        parent: Optional[TreapNode] = None,
+        priority: Optional[int] = None,
+    ):
+        super().__init__(key, value, parent, priority)
+        self.agg = None
+
+
+class LazyTreapNode(AggregateTreapNode):
+    """An AggregateTreapNode that can hold an update for its subtree.
+
+    The node's own value and aggregate already include the pending
+    update; its children do not until the update is pushed down.
+
+    Attributes:
+        assign (VT): A value every node below is pending to be set to,
+            or `None`.
+        add (VT): An amount pending to be added to every value below,
+            applied after `assign`, or `None`.
+    """
+
+    __slots__ = ("assign", "add")
+
+    def __init__(
+        self,
+        key: KT,
+        value: VT,
+        parent: Optional[TreapNode] = None,
+        priority: Optional[int] = None,
+    ):
+        super().__init__(key, value, parent, priority)
+        self.assign = None
+        self.add = None
+
+
+class SlimTreapNode(_TreapNodeBase):
+    """A key-only node for TreapMaps that are used as sorted sets.
+
+    It has the same attributes as TreapNode except that `value` is not
+    stored: it reads back as `True` for every node and assignments to
+    it are ignored. Pass this class as the `node_type` of a TreapMap to
+    save one slot per entry.
+    """
+
+    __slots__ = ()
+
+    MAX_PRIORITY = TreapNode.MAX_PRIORITY
+
+    def __init__(
+        self,
+        key: KT,
+        value: VT = None,
+        parent: Optional[_TreapNodeBase] = None,
+        priority: Optional[int] = None,
+    ):
+        self.key: KT = key
+        self.priority: int = self.get_priority() if priority is None else priority
+
+        self.parent: Optional[_TreapNodeBase] = parent
+        self.left_child: Optional[_TreapNodeBase] = None
+        self.right_child: Optional[_TreapNodeBase] = None
+        self.size: int = 1
+
+    @property
+    def value(self) -> bool:
+        return True
+
+    @value.setter
+    def value(self, _value: VT) -> None:
+        pass
+
+    replace_node_data = TreapNode.replace_node_data
+    get_priority = TreapNode.get_priority
+
+
+class PersistentTreapNode:
+    """An immutable node for PersistentTreapMap.
+
+    Nodes are shared between versions of a map, so they have no parent
+    pointer and are never modified once built; changing a node means
+    building a new one.
+
+    Attributes:
+        key (KT): The key of the node.
+        value (VT): The value associated with the key of the node.
+        priority (int): The priority of the node.
+        left_child (PersistentTreapNode): The left child of the node.
+        right_child (PersistentTreapNode): The right child of the node.
+        size (int): The number of nodes in the subtree rooted here.
+    """
+
+    __slots__ = ("key", "value", "priority", "left_child", "right_child", "size")
+
+    def __init__(
+        self,
+        key: KT,
+        value: VT,
+        priority: int,
+        left_child: Optional[PersistentTreapNode] = None,
+        right_child: Optional[PersistentTreapNode] = None,
+    ):
+        self.key: KT = key
+        self.value: VT = value
+        self.priority: int = priority
+        self.left_child = left_child
+        self.right_child = right_child
+        self.size: int = (
+            1
+            + (left_child.size if left_child is not None else 0)
+            + (right_child.size if right_child is not None else 0)
+        )
+
 #crs5682
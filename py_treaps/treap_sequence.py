@@ -0,0 +1,261 @@
+"""
+This module contains TreapSequence, an implicit-key treap used as a
+mutable sequence (a rope).
+
+Nodes store no key: the position of a node is the number of nodes before
+it in an in-order walk, which the subtree sizes give in one descent. The
+sequence splits by position instead of by key and reuses the merge and
+size maintenance of TreapMap, so inserting, deleting, slicing and
+concatenating all run in O(log n) expected, however long the sequence.
+"""
+
+from __future__ import annotations
+import typing
+from collections.abc import MutableSequence
+from typing import Any, Generic, Iterable, List, Optional, Tuple, Union, overload
+
+from py_treaps.comparable import VT
+from py_treaps.priorities import PrioritySource, RandomPriorities
+from py_treaps.treap_map import TreapMap
+from py_treaps.treap_node import TreapNode
+
+
+def _size(node: Optional[TreapNode]) -> int:
+    return node.size if node is not None else 0
+
+
+class TreapSequence(MutableSequence, Generic[VT]):
+    """A list-like sequence with O(log n) insertion and deletion anywhere.
+
+    It supports the whole `MutableSequence` interface. Indexing, `del`
+    of a step-1 slice and `insert` cost O(log n); reading or assigning a
+    step-1 slice of k elements costs O(k + log n), and building a
+    sequence from an iterable costs O(n).
+
+    Args:
+        values: The initial elements.
+        priorities: The priority source. It is called with `None`, since
+            elements have no key, so sources that hash the key, such as
+            HashPriorities, do not suit.
+    """
+
+    # merging and size maintenance never look at keys
+    _merge_nodes = TreapMap._merge_nodes
+    _update_node = TreapMap._update_node
+    _iter_nodes = TreapMap._iter_nodes
+
+    def __init__(self, values: Iterable[VT] = (), priorities: Optional[PrioritySource] = None):
+        self.priorities = RandomPriorities() if priorities is None else priorities
+        self.root: Optional[TreapNode] = self._build(values)
+
+    def _new_node(self, value: VT) -> TreapNode:
+        return TreapNode(None, value, priority=self.priorities(None))
+
+    def _build(self, values: Iterable[VT]) -> Optional[TreapNode]:
+        # Link the values as a Cartesian tree over its right spine, in O(n)
+        spine: List[TreapNode] = []
+        for value in values:
+            node = self._new_node(value)
+            below = None
+            while spine and spine[-1].priority < node.priority:
+                below = spine.pop()
+                self._update_node(below)
+            if below is not None:
+                node.left_child = below
+                below.parent = node
+            if spine:
+                spine[-1].right_child = node
+                node.parent = spine[-1]
+            spine.append(node)
+        for node in reversed(spine):
+            self._update_node(node)
+        return spine[0] if spine else None
+
+    def _split_nodes(
+        self, root: Optional[TreapNode], index: int
+    ) -> Tuple[Optional[TreapNode], Optional[TreapNode]]:
+        """Split a subtree into its first `index` nodes and the rest.
+
+        Both roots are returned with their parent set to None.
+        """
+        left_root = right_root = None
+        left_tail = right_tail = None
+        visited = []
+        current_node = root
+        while current_node is not None:
+            visited.append(current_node)
+            left_size = _size(current_node.left_child)
+            if left_size < index:
+                # this node and its left subtree go to the left
+                index -= left_size + 1
+                if left_tail is None:
+                    left_root = current_node
+                else:
+                    left_tail.right_child = current_node
+                current_node.parent = left_tail
+                left_tail = current_node
+                current_node = current_node.right_child
+            else:
+                if right_tail is None:
+                    right_root = current_node
+                else:
+                    right_tail.left_child = current_node
+                current_node.parent = right_tail
+                right_tail = current_node
+                current_node = current_node.left_child
+        if left_tail is not None:
+            left_tail.right_child = None
+        if right_tail is not None:
+            right_tail.left_child = None
+        for node in reversed(visited):
+            self._update_node(node)
+        return left_root, right_root
+
+    def _set_root(self, root: Optional[TreapNode]) -> None:
+        if root is not None:
+            root.parent = None
+        self.root = root
+
+    def _join(self, *roots: Optional[TreapNode]) -> None:
+        root = None
+        for part in roots:
+            root = self._merge_nodes(root, part)
+        self._set_root(root)
+
+    def _node_at(self, index: int) -> TreapNode:
+        current_node = self.root
+        while current_node is not None:
+            left_size = _size(current_node.left_child)
+            if index < left_size:
+                current_node = current_node.left_child
+            elif index == left_size:
+                return current_node
+            else:
+                index -= left_size + 1
+                current_node = current_node.right_child
+        raise IndexError("TreapSequence index out of range")
+
+    def _index(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("TreapSequence index out of range")
+        return index
+
+    def _cut(self, start: int, stop: int) -> Tuple[Optional[TreapNode], ...]:
+        # Split into the nodes before `start`, in [start, stop) and after
+        left, rest = self._split_nodes(self.root, start)
+        middle, right = self._split_nodes(rest, stop - start)
+        return left, middle, right
+
+    def __len__(self) -> int:
+        return _size(self.root)
+
+    @overload
+    def __getitem__(self, index: int) -> VT: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> TreapSequence[VT]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                values = list(self)[index]
+            elif start >= stop:
+                values = []
+            else:
+                left, middle, right = self._cut(start, stop)
+                values = [node.value for node in self._iter_nodes(middle)]
+                self._join(left, middle, right)
+            return TreapSequence(values, self.priorities)
+        return self._node_at(self._index(index)).value
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                values = list(self)
+                values[index] = value
+                self.root = self._build(values)
+                return
+            # materialize first: `value` may be this sequence itself
+            values = list(value)
+            left, _, right = self._cut(start, max(start, stop))
+            self._join(left, self._build(values), right)
+            return
+        self._node_at(self._index(index)).value = value
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                values = list(self)
+                del values[index]
+                self.root = self._build(values)
+                return
+            if start < stop:
+                left, _, right = self._cut(start, stop)
+                self._join(left, right)
+            return
+        index = self._index(index)
+        left, _, right = self._cut(index, index + 1)
+        self._join(left, right)
+
+    def insert(self, index: int, value: VT) -> None:
+        """Insert `value` before position `index`, clamped like `list.insert`."""
+        size = len(self)
+        if index < 0:
+            index = max(0, index + size)
+        left, right = self._split_nodes(self.root, min(index, size))
+        self._join(left, self._new_node(value), right)
+
+    def append(self, value: VT) -> None:
+        self._join(self.root, self._new_node(value))
+
+    def extend(self, values: Iterable[VT]) -> None:
+        self._join(self.root, self._build(values))
+
+    def concat(self, other: TreapSequence[VT]) -> None:
+        """Move every element of `other` to the end of this sequence.
+
+        This takes O(log n) and leaves `other` empty.
+        """
+        if other is self:
+            raise ValueError("cannot concatenate a sequence to itself")
+        self._join(self.root, other.root)
+        other.root = None
+
+    def split(self, index: int) -> List[TreapSequence[VT]]:
+        """Split into the elements before `index` and the rest, in O(log n).
+
+        Like TreapMap.split, this leaves this sequence empty.
+        """
+        index = max(0, min(len(self), index if index >= 0 else index + len(self)))
+        parts = self._split_nodes(self.root, index)
+        self.root = None
+        result = []
+        for root in parts:
+            sequence: TreapSequence[VT] = TreapSequence(priorities=self.priorities)
+            sequence._set_root(root)
+            result.append(sequence)
+        return result
+
+    def __iter__(self) -> typing.Iterator[VT]:
+        for node in self._iter_nodes(self.root):
+            yield node.value
+
+    def __reversed__(self) -> typing.Iterator[VT]:
+        stack = []
+        current_node = self.root
+        while stack or current_node is not None:
+            while current_node is not None:
+                stack.append(current_node)
+                current_node = current_node.right_child
+            current_node = stack.pop()
+            yield current_node.value
+            current_node = current_node.left_child
+
+    def __repr__(self) -> str:
+        return f"TreapSequence({list(self)!r})"
@@ -0,0 +1,92 @@
+from py_treaps.aggregate_treap_map import AggregateTreapMap
+from py_treaps.priorities import RandomPriorities
+
+import itertools
+import operator
+import random
+
+
+def check_aggregates(treap: AggregateTreapMap) -> None:
+    """Check every cached aggregate against a recomputation."""
+
+    def visit(node):
+        if node is None:
+            return treap.identity
+        agg = treap.op(treap.op(visit(node.left_child), treap.measure(node.value)),
+                       visit(node.right_child))
+        assert node.agg == agg
+        return agg
+
+    visit(treap.root)
+
+
+def test_sum_aggregate_matches_scan() -> None:
+    """Test range sums against summing a filtered dict."""
+
+    rng = random.Random(13)
+    treap = AggregateTreapMap(operator.add, 0, priorities=RandomPriorities(seed=13))
+    expected = {}
+    for _ in range(1500):
+        key = rng.randrange(300)
+        if rng.random() < 0.3:
+            treap.remove(key)
+            expected.pop(key, None)
+        else:
+            value = rng.randrange(100)
+            treap.insert(key, value)
+            expected[key] = value
+    check_aggregates(treap)
+
+    for lo, hi in itertools.product([None, -1, 0, 57, 57.5, 150, 299, 400], repeat=2):
+        for inclusive in itertools.product((True, False), repeat=2):
+            total = sum(
+                value for key, value in expected.items()
+                if (lo is None or key > lo or (inclusive[0] and key == lo))
+                and (hi is None or key < hi or (inclusive[1] and key == hi))
+            )
+            assert treap.aggregate(lo, hi, inclusive) == total
+
+
+def test_non_commutative_aggregate_keeps_order() -> None:
+    """Test that aggregates combine in key order."""
+
+    treap = AggregateTreapMap(operator.add, "")
+    for key in random.Random(14).sample(range(26), 26):
+        treap.insert(key, chr(ord("a") + key))
+
+    assert treap.aggregate() == "abcdefghijklmnopqrstuvwxyz"
+    assert treap.aggregate(3, 7) == "defg"
+    assert treap.aggregate(3, 7, inclusive=(False, True)) == "efgh"
+    assert treap.aggregate(30) == ""
+
+
+def test_aggregates_through_split_and_join() -> None:
+    """Test that split halves and joined maps keep correct aggregates."""
+
+    treap = AggregateTreapMap.from_sorted(
+        ((i, i) for i in range(100)), op=max, identity=float("-inf"),
+        measure=lambda value: value % 17,
+    )
+    check_aggregates(treap)
+    left, right = treap.split(50)
+    check_aggregates(left)
+    check_aggregates(right)
+    assert left.aggregate() == 16
+    assert right.aggregate(50, 60) == 16
+    assert right.aggregate(52, 60) == 8
+
+    right.join(left)
+    check_aggregates(right)
+    assert right.aggregate(0, 16) == 15
+    assert len(right) == 100
+
+
+def test_aggregates_after_batches() -> None:
+    """Test aggregates after batched inserts and value overwrites."""
+
+    treap = AggregateTreapMap(operator.add, 0)
+    treap.insert_many((i, 1) for i in range(100))
+    treap.insert_many((i, 2) for i in range(50, 150))
+    treap.insert(10, 5)
+    check_aggregates(treap)
+    assert treap.aggregate() == 50 + 200 + 4
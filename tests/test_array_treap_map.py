@@ -0,0 +1,221 @@
+import random
+
+import pytest
+
+from py_treaps.array_treap_map import ArrayTreapMap
+from py_treaps.priorities import RandomPriorities
+
+
+def check_invariants(treap: ArrayTreapMap) -> None:
+    """Check BST order, heap order, parent links and subtree counts."""
+    store = treap.store
+    assert store.count[treap.root] == len(treap)
+
+    def visit(index, parent, low, high):
+        if index == 0:
+            return 0
+        key = store.keys[index]
+        assert store.parent[index] == parent
+        assert low is None or low < key
+        assert high is None or key < high
+        if parent != 0:
+            assert store.priority[index] <= store.priority[parent]
+        count = 1 + visit(store.left[index], index, low, key)
+        count += visit(store.right[index], index, key, high)
+        assert store.count[index] == count
+        return count
+
+    visit(treap.root, 0, None, None)
+
+
+def test_insert_lookup_remove() -> None:
+    """Test the basic map operations against a dict."""
+
+    rng = random.Random(5)
+    treap = ArrayTreapMap(priorities=RandomPriorities(seed=5))
+    expected = {}
+    for _ in range(2000):
+        key = rng.randrange(500)
+        if rng.random() < 0.3:
+            assert treap.remove(key) == expected.pop(key, None)
+        else:
+            treap.insert(key, str(key))
+            expected[key] = str(key)
+
+    check_invariants(treap)
+    assert list(treap) == sorted(expected)
+    assert all(treap.lookup(key) == value for key, value in expected.items())
+    assert treap.lookup(1000) is None
+
+
+def test_free_slots_are_reused() -> None:
+    """Test that removed slots go back through the free list."""
+
+    treap = ArrayTreapMap()
+    for i in range(100):
+        treap.insert(i, i)
+    for i in range(50):
+        treap.remove(i)
+    slots = len(treap.store.keys)
+    for i in range(100, 150):
+        treap.insert(i, i)
+
+    assert len(treap.store.keys) == slots
+    check_invariants(treap)
+
+
+def test_split_and_join() -> None:
+    """Test that split halves rejoin into the original map."""
+
+    treap = ArrayTreapMap()
+    for i in range(100):
+        treap.insert(i, str(i))
+
+    left, right = treap.split(40)
+    assert list(left) == list(range(40))
+    assert list(right) == list(range(40, 100))
+    assert len(left) == 40 and len(right) == 60
+    check_invariants(left)
+    check_invariants(right)
+
+    right.join(left)
+    assert list(right) == list(range(100))
+    check_invariants(right)
+
+
+def test_join_separate_stores() -> None:
+    """Test joining maps that were built independently."""
+
+    low = ArrayTreapMap()
+    high = ArrayTreapMap()
+    for i in range(20):
+        low.insert(i, i)
+        high.insert(i + 20, i + 20)
+
+    low.join(high)
+    assert list(low) == list(range(40))
+    assert len(high) == 0
+    check_invariants(low)
+
+
+def test_root_node_view() -> None:
+    """Test the TreapNode-like view of the root."""
+
+    treap = ArrayTreapMap()
+    assert treap.get_root_node() is None
+    for i in range(10):
+        treap.insert(i, i)
+    root = treap.get_root_node()
+    assert root.parent is None
+    assert root.key in range(10)
+    assert root.left_child is None or root.left_child.parent == root
+    assert str(treap).startswith(f"- (Key: {root.key}")
+
+
+def test_dropped_split_halves_are_freed() -> None:
+    """Test that a discarded split half does not stay allocated."""
+
+    treap = ArrayTreapMap()
+    for i in range(1000):
+        treap.insert(i, [i])
+    for i in range(500):
+        low, treap = treap.split(i + 1)
+        treap.insert(1000 + i, [1000 + i])
+        check_invariants(low)
+        check_invariants(treap)
+
+    assert len(treap) == 1000
+    assert list(treap) == list(range(500, 1500))
+    assert treap.store.allocated() < 2 * len(treap)
+    assert sum(value is not None for value in treap.store.values) == len(treap)
+
+
+def test_removals_compact_the_store() -> None:
+    """Test that the store shrinks once most of its slots are free."""
+
+    treap = ArrayTreapMap()
+    for i in range(1000):
+        treap.insert(i, i)
+    for i in range(900):
+        treap.remove(i)
+
+    assert treap.store.allocated() < 2 * len(treap)
+    assert list(treap) == list(range(900, 1000))
+    check_invariants(treap)
+
+
+def test_length_and_count_nodes() -> None:
+    """Test the size accessors shared with TreapMap."""
+
+    treap = ArrayTreapMap()
+    for i in range(25):
+        treap.insert(i, i)
+    low, high = treap.split(10)
+
+    assert low.length() == low.count_nodes() == 10
+    assert high.length() == high.count_nodes() == 15
+    assert treap.length() == treap.count_nodes() == 0
+
+
+def build(keys, tag, seed) -> ArrayTreapMap:
+    treap = ArrayTreapMap(priorities=RandomPriorities(seed=seed))
+    for key in keys:
+        treap.insert(key, (tag, key))
+    return treap
+
+
+def test_meld_and_difference_match_dicts() -> None:
+    """Test meld and difference against dict union and set difference."""
+
+    rng = random.Random(6)
+    for mine_size, theirs_size in ((0, 20), (20, 0), (5, 300), (300, 5), (200, 200)):
+        mine = set(rng.sample(range(600), mine_size))
+        theirs = set(rng.sample(range(600), theirs_size))
+
+        treap, other = build(mine, "mine", 1), build(theirs, "theirs", 2)
+        treap.meld(other)
+        check_invariants(treap)
+        assert len(other) == 0
+        expected = {key: ("mine", key) for key in mine}
+        expected.update((key, ("theirs", key)) for key in theirs)
+        assert [(key, treap.lookup(key)) for key in treap] == sorted(expected.items())
+
+        treap, other = build(mine, "mine", 3), build(theirs, "theirs", 4)
+        treap.difference(other)
+        check_invariants(treap)
+        assert list(treap) == sorted(mine - theirs)
+        assert len(other) == 0
+
+
+def test_meld_conflict_and_self() -> None:
+    """Test conflict policies and operations with the map itself."""
+
+    treap = build([1, 2], "mine", 1)
+    treap.meld(build([2, 3], "theirs", 2), conflict="mine")
+    assert [treap.lookup(key) for key in treap] == [("mine", 1), ("mine", 2), ("theirs", 3)]
+    treap.meld(treap)
+    assert len(treap) == 3
+    treap.difference(treap)
+    assert len(treap) == 0 and list(treap) == []
+
+
+def test_join_rejects_overlaps() -> None:
+    """Test that join refuses overlapping key ranges and leaves both maps intact."""
+
+    evens = build(range(0, 20, 2), "even", 1)
+    odds = build(range(1, 20, 2), "odd", 2)
+    with pytest.raises(ValueError):
+        evens.join(odds)
+    assert list(evens) == list(range(0, 20, 2))
+    assert list(odds) == list(range(1, 20, 2))
+
+
+def test_balance_factor() -> None:
+    """Test balance_factor against the TreapMap definition."""
+
+    assert ArrayTreapMap().balance_factor() == 1.0
+    treap = ArrayTreapMap(priorities=RandomPriorities(seed=7))
+    for key in range(1000):
+        treap.insert(key, key)
+    height = treap.balance_factor() * (1000).bit_length()
+    assert 10 <= height < 60 and height == int(height)
@@ -0,0 +1,92 @@
+from py_treaps.concurrent_treap_map import ConcurrentTreapMap
+from py_treaps.priorities import RandomPriorities
+
+import threading
+
+
+def test_single_thread_operations() -> None:
+    """Test the map API from a single thread."""
+
+    treap = ConcurrentTreapMap(RandomPriorities(1))
+    for key in range(10):
+        treap.insert(key, str(key))
+    treap.insert(3, "three")
+
+    assert len(treap) == 10
+    assert treap[3] == "three" and treap.lookup(11) is None
+    assert 9 in treap and 10 not in treap
+    assert treap.remove(4) == "4"
+    assert treap.remove(4) is None
+    assert list(treap) == [0, 1, 2, 3, 5, 6, 7, 8, 9]
+    assert dict(treap.items())[5] == "5"
+
+
+def test_snapshot_is_stable() -> None:
+    """Test that snapshots and started iterators ignore later writes."""
+
+    treap = ConcurrentTreapMap()
+    for key in range(100):
+        treap.insert(key, key)
+    snapshot = treap.snapshot()
+    iterator = iter(treap)
+    first = [next(iterator) for _ in range(10)]
+    for key in range(0, 100, 2):
+        treap.remove(key)
+    treap.insert(1000, 1000)
+
+    assert first + list(iterator) == list(range(100))
+    assert len(snapshot) == 100 and 1000 not in snapshot
+    assert len(treap) == 51
+
+
+def test_apply_is_atomic_for_readers() -> None:
+    """Test that readers never see half of a multi-key update."""
+
+    treap = ConcurrentTreapMap(RandomPriorities(2))
+    treap.apply(lambda version: version.insert("a", 100).insert("b", 0))
+    stop = threading.Event()
+    failures = []
+
+    def transfer(version):
+        return version.insert("a", version["a"] - 1).insert("b", version["b"] + 1)
+
+    def writer() -> None:
+        for _ in range(100):
+            treap.apply(transfer)
+
+    def reader() -> None:
+        while not stop.is_set():
+            values = dict(treap.items())
+            if values["a"] + values["b"] != 100:
+                failures.append(values)
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    writers = [threading.Thread(target=writer) for _ in range(2)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert failures == []
+    assert treap["a"] == -100 and treap["b"] == 200
+
+
+def test_concurrent_writers_lose_nothing() -> None:
+    """Test that serialized writers keep every insert."""
+
+    treap = ConcurrentTreapMap()
+
+    def writer(offset: int) -> None:
+        for key in range(offset, 2000, 4):
+            treap.insert(key, key)
+
+    threads = [threading.Thread(target=writer, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert list(treap) == list(range(2000))
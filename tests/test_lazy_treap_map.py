@@ -0,0 +1,151 @@
+from py_treaps.lazy_treap_map import LazyTreapMap
+from py_treaps.priorities import RandomPriorities
+
+import pytest
+import random
+
+
+def in_range(key, lo, hi, inclusive) -> bool:
+    lo_inclusive, hi_inclusive = inclusive
+    return (lo is None or lo < key or (lo_inclusive and key == lo)) and (
+        hi is None or key < hi or (hi_inclusive and key == hi)
+    )
+
+
+def check_sums(treap: LazyTreapMap) -> None:
+    """Check sizes and that every cached sum matches its subtree."""
+    for node in treap._iter_nodes(treap.root):
+        children = [c for c in (node.left_child, node.right_child) if c is not None]
+        assert node.size == 1 + sum(c.size for c in children)
+        assert node.agg == sum(n.value for n in treap._iter_nodes(node))
+
+
+def random_range(rng):
+    lo, hi = sorted(rng.randrange(-5, 210) for _ in range(2))
+    inclusive = (rng.random() < 0.5, rng.random() < 0.5)
+    return (lo if rng.random() < 0.9 else None), (hi if rng.random() < 0.9 else None), inclusive
+
+
+def test_matches_dict_under_random_operations() -> None:
+    """Test range updates mixed with every other operation against a dict."""
+
+    rng = random.Random(14)
+    treap = LazyTreapMap(priorities=RandomPriorities(14))
+    expected = {}
+    for step in range(3000):
+        choice = rng.randrange(8)
+        key = rng.randrange(200)
+        if choice == 0:
+            treap.insert(key, step)
+            expected[key] = step
+        elif choice == 1:
+            assert treap.remove(key) == expected.pop(key, None)
+        elif choice == 2:
+            lo, hi, inclusive = random_range(rng)
+            delta = rng.randrange(-50, 50)
+            treap.add_range(delta, lo, hi, inclusive)
+            for k in expected:
+                if in_range(k, lo, hi, inclusive):
+                    expected[k] += delta
+        elif choice == 3:
+            lo, hi, inclusive = random_range(rng)
+            treap.assign_range(step, lo, hi, inclusive)
+            for k in expected:
+                if in_range(k, lo, hi, inclusive):
+                    expected[k] = step
+        elif choice == 4:
+            lo, hi, inclusive = random_range(rng)
+            assert treap.aggregate(lo, hi, inclusive) == sum(
+                v for k, v in expected.items() if in_range(k, lo, hi, inclusive)
+            )
+        elif choice == 5:
+            assert treap.lookup(key) == expected.get(key)
+        elif choice == 6:
+            below = [k for k in expected if k <= key]
+            assert treap.floor(key) == ((max(below), expected[max(below)]) if below else None)
+        else:
+            left, right = treap.split(key)
+            assert len(left) == sum(1 for k in expected if k < key)
+            left.join(right)
+            treap = left
+    assert list(treap.items()) == sorted(expected.items())
+    check_sums(treap)
+
+
+def test_range_updates() -> None:
+    """Test add and assign over explicit ranges."""
+
+    treap = LazyTreapMap(priorities=RandomPriorities(15))
+    for key in range(10):
+        treap.insert(key, 1)
+    treap.add_range(10, 3, 6, (True, True))
+    treap.assign_range(0, 5, None)
+    treap.add_range(2, None, 2)
+
+    assert list(treap.values()) == [3, 3, 1, 11, 11, 0, 0, 0, 0, 0]
+    assert treap.aggregate() == 29
+    assert treap.aggregate(3, 5) == 22
+    treap.add_range(1, 100, 200)
+    assert treap.aggregate() == 29
+    with pytest.raises(ValueError):
+        treap.assign_range(None)
+
+
+def test_min_aggregate_with_repeat() -> None:
+    """Test a minimum aggregate, which needs its own repeat function."""
+
+    treap = LazyTreapMap(min, float("inf"), lambda value, count: value,
+                         priorities=RandomPriorities(16))
+    for key in range(100):
+        treap.insert(key, key)
+    treap.add_range(-1000, 50, 60)
+    assert treap.aggregate() == -950
+    assert treap.aggregate(60) == 60
+    treap.assign_range(7, None, None)
+    assert treap.aggregate(10, 20) == 7
+
+
+def test_cursor_and_iteration_see_pending_updates() -> None:
+    """Test that cursors, iterators and copies see pending updates."""
+
+    treap = LazyTreapMap(priorities=RandomPriorities(17))
+    for key in range(50):
+        treap.insert(key, 0)
+    treap.add_range(5, 10, 20)
+
+    cursor = treap.cursor(15)
+    assert cursor.value == 5
+    cursor.value = 100
+    assert treap.aggregate(10, 20) == 145
+    assert list(reversed(treap)) == list(range(49, -1, -1))
+    assert sum(treap.copy().values()) == 145
+    assert list(treap.irange(18, 22)) == [18, 19, 20, 21]
+    assert list(treap.values(18, 22)) == [5, 5, 0, 0]
+    assert list(treap.values(18, 22, reverse=True)) == [0, 0, 5, 5]
+
+
+def test_range_update_during_iteration_fails_fast() -> None:
+    """Test that iterators and cursors stop after a range update."""
+
+    treap = LazyTreapMap(priorities=RandomPriorities(18))
+    for key in range(50):
+        treap.insert(key, 0)
+
+    values = treap.values()
+    next(values)
+    treap.add_range(5, 10, 40)
+    with pytest.raises(RuntimeError):
+        list(values)
+
+    cursor = treap.cursor(20)
+    treap.assign_range(1, 30)
+    with pytest.raises(RuntimeError):
+        cursor.next()
+    assert cursor.seek(20)
+    assert cursor.value == 5
+
+    # an update that covers no key changes nothing
+    items = treap.items()
+    next(items)
+    treap.add_range(1, 100, 200)
+    assert len(list(items)) == 49
@@ -0,0 +1,128 @@
+from py_treaps.persistent_treap_map import PersistentTreapMap
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+import pytest
+import random
+
+
+def check_treap(treap: PersistentTreapMap) -> None:
+    """Check key order, heap order and sizes of every node."""
+    stack = [(treap.get_root_node(), None, None)]
+    while stack:
+        node, lo, hi = stack.pop()
+        if node is None:
+            continue
+        assert (lo is None or lo < node.key) and (hi is None or node.key < hi)
+        size = 1
+        for child in (node.left_child, node.right_child):
+            if child is not None:
+                assert child.priority <= node.priority
+                size += child.size
+        assert node.size == size
+        stack.append((node.left_child, lo, node.key))
+        stack.append((node.right_child, node.key, hi))
+
+
+def test_updates_leave_old_versions_intact() -> None:
+    """Test that every version keeps its contents after later updates."""
+
+    rng = random.Random(1)
+    versions = [PersistentTreapMap(RandomPriorities(1))]
+    expected = [{}]
+    for _ in range(400):
+        key = rng.randrange(100)
+        if rng.random() < 0.7:
+            versions.append(versions[-1].insert(key, rng.random()))
+            expected.append({**expected[-1], key: versions[-1][key]})
+        else:
+            versions.append(versions[-1].remove(key))
+            expected.append({k: v for k, v in expected[-1].items() if k != key})
+
+    for version, contents in zip(versions, expected):
+        check_treap(version)
+        assert len(version) == len(contents)
+        assert list(version.items()) == sorted(contents.items())
+
+
+def test_same_shape_as_treap_map() -> None:
+    """Test that the same priorities give the same tree as TreapMap."""
+
+    keys = random.Random(2).sample(range(1000), 300)
+    mutable = TreapMap(priorities=RandomPriorities(7))
+    persistent = PersistentTreapMap(RandomPriorities(7))
+    for key in keys:
+        mutable.insert(key, key)
+        persistent = persistent.insert(key, key)
+    assert str(persistent) == str(mutable)
+
+    for key in keys[::3]:
+        mutable.remove(key)
+        persistent = persistent.remove(key)
+    assert str(persistent) == str(mutable)
+
+
+def test_updates_share_unchanged_subtrees() -> None:
+    """Test that an update copies only one path."""
+
+    old = PersistentTreapMap.from_sorted(((i, i) for i in range(1000)), RandomPriorities(3))
+    new = old.insert(500, "changed")
+
+    def nodes(treap):
+        stack, seen = [treap.get_root_node()], set()
+        while stack:
+            node = stack.pop()
+            if node is not None:
+                seen.add(id(node))
+                stack.extend((node.left_child, node.right_child))
+        return seen
+
+    copied = nodes(new) - nodes(old)
+    assert 1 <= len(copied) <= 40
+    assert old[500] == 500 and new[500] == "changed"
+    assert old.remove(-1) is old
+    assert old.snapshot() is old
+
+
+def test_split_and_join() -> None:
+    """Test split and join against the original version."""
+
+    treap = PersistentTreapMap.from_sorted(((i, str(i)) for i in range(200)), RandomPriorities(4))
+    for threshold in (-1, 0, 57, 57.5, 199, 500):
+        left, right = treap.split(threshold)
+        check_treap(left)
+        check_treap(right)
+        assert list(left) == [k for k in range(200) if k < threshold]
+        assert list(right) == [k for k in range(200) if k >= threshold]
+        for joined in (left.join(right), right.join(left)):
+            check_treap(joined)
+            assert list(joined.items()) == list(treap.items())
+    assert len(treap) == 200
+
+
+def test_from_sorted() -> None:
+    """Test bulk building, including unsorted input and repeated keys."""
+
+    treap = PersistentTreapMap.from_sorted([(3, "a"), (1, "b"), (3, "c"), (2, "d")])
+    check_treap(treap)
+    assert list(treap.items()) == [(1, "b"), (2, "d"), (3, "c")]
+    assert str(PersistentTreapMap.from_sorted([])) == "Empty Treap"
+    assert 4 not in treap and treap.lookup(4) is None
+
+
+def test_join_rejects_itself_and_overlaps() -> None:
+    """Test that join refuses a version itself and overlapping ranges."""
+
+    treap = PersistentTreapMap.from_sorted((i, i) for i in range(20))
+    with pytest.raises(ValueError):
+        treap.join(treap)
+    evens = PersistentTreapMap.from_sorted((i, i) for i in range(0, 20, 2))
+    odds = PersistentTreapMap.from_sorted((i, i) for i in range(1, 20, 2))
+    with pytest.raises(ValueError):
+        evens.join(odds)
+    with pytest.raises(ValueError):
+        odds.join(evens)
+    # another version over the same nodes overlaps too
+    with pytest.raises(ValueError):
+        treap.join(treap.insert(100, 100))
+    assert len(treap) == 20
@@ -0,0 +1,113 @@
+from py_treaps.aggregate_treap_map import AggregateTreapMap
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import build, check_treap
+
+import operator
+import pytest
+import random
+
+
+def test_step_through_the_map() -> None:
+    """Test walking the whole map forwards and backwards."""
+
+    keys = random.Random(8).sample(range(10000), 300)
+    treap = build(keys)
+    ordered = sorted(keys)
+
+    cursor = treap.cursor()
+    seen = [cursor.key]
+    while cursor.next():
+        seen.append(cursor.key)
+    assert seen == ordered
+    assert not cursor
+
+    assert cursor.last()
+    seen = [cursor.key]
+    while cursor.prev():
+        seen.append(cursor.key)
+    assert seen == ordered[::-1]
+
+    assert not TreapMap().cursor()
+    with pytest.raises(KeyError):
+        TreapMap().cursor().key
+
+
+def test_seek_matches_ceiling() -> None:
+    """Test finger search from many positions against a sorted list."""
+
+    rng = random.Random(9)
+    keys = sorted(rng.sample(range(0, 20000, 2), 2000))
+    treap = build(keys)
+    cursor = treap.cursor()
+    for _ in range(2000):
+        target = rng.randrange(-10, 20010)
+        found = cursor.seek(target)
+        ceiling = [k for k in keys if k >= target][:1]
+        assert found == (target in keys)
+        if ceiling:
+            assert cursor.key == ceiling[0]
+        else:
+            assert not cursor
+            cursor.first()
+
+
+def test_seek_nearby() -> None:
+    """Test seeking a few keys away in both directions."""
+
+    treap = build(range(0, 1000, 10))
+    cursor = treap.cursor(500)
+    assert cursor.key == 500
+    assert cursor.seek(530) and cursor.key == 530
+    assert not cursor.seek(485) and cursor.key == 490
+    assert not cursor.seek(991) and not cursor
+    assert treap.cursor(-5).key == 0
+
+
+def test_update_and_delete_at_cursor() -> None:
+    """Test changing and removing entries through a cursor."""
+
+    treap = build(range(20))
+    cursor = treap.cursor(5)
+    cursor.value = "five"
+    cursor.delete()
+    assert cursor.key == 6
+    while cursor and cursor.key < 10:
+        cursor.delete()
+
+    assert treap[5] is None and 5 not in treap
+    assert list(treap) == [0, 1, 2, 3, 4] + list(range(10, 20))
+    assert len(treap) == 15
+    check_treap(treap)
+
+    cursor.last()
+    cursor.delete()
+    assert not cursor
+    assert list(treap)[-1] == 18
+
+
+def test_cursor_value_updates_aggregates() -> None:
+    """Test that writing through a cursor keeps aggregates correct."""
+
+    treap = AggregateTreapMap(operator.add, 0, priorities=RandomPriorities(8))
+    for key in range(100):
+        treap.insert(key, 1)
+    cursor = treap.cursor(40)
+    for _ in range(10):
+        cursor.value = 3
+        cursor.next()
+    assert treap.aggregate() == 120
+    assert treap.aggregate(40, 45) == 15
+
+
+def test_outside_mutation_invalidates() -> None:
+    """Test that changes made around the cursor are detected."""
+
+    treap = build(range(10))
+    cursor = treap.cursor(3)
+    treap.remove(3)
+    for action in (lambda: cursor.key, cursor.next, cursor.delete, lambda: bool(cursor)):
+        with pytest.raises(RuntimeError):
+            action()
+    assert not cursor.seek(3)
+    assert cursor.key == 4
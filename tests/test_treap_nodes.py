@@ -0,0 +1,42 @@
+from py_treaps.treap_map import TreapMap
+from py_treaps.treap_node import SlimTreapNode, TreapNode
+
+import pytest
+
+
+def test_nodes_have_no_instance_dict() -> None:
+    """Test that node instances use slots instead of a __dict__."""
+
+    node = TreapNode(1, "one", priority=5)
+    slim = SlimTreapNode(1, priority=5)
+
+    assert not hasattr(node, "__dict__")
+    assert not hasattr(slim, "__dict__")
+    with pytest.raises(AttributeError):
+        node.extra = 1
+
+
+def test_explicit_priority() -> None:
+    """Test that an explicit priority bypasses the shared pool."""
+
+    node = TreapNode(1, "one", priority=123)
+    assert node.priority == 123
+
+
+def test_slim_node_map() -> None:
+    """Test a TreapMap built from key-only nodes."""
+
+    treap = TreapMap(node_type=SlimTreapNode)
+    for i in range(20):
+        treap.insert(i, str(i))
+
+    assert list(treap) == list(range(20))
+    assert treap.lookup(7) is True
+    assert treap.lookup(20) is None
+    assert treap.remove(7) is True
+    assert 7 not in treap
+
+    left, right = treap.split(10)
+    assert list(left) == [i for i in range(10) if i != 7]
+    assert list(right) == list(range(10, 20))
+    assert isinstance(right.get_root_node(), SlimTreapNode)
@@ -0,0 +1,63 @@
+from py_treaps.priorities import HashPriorities, PooledPriorities, RandomPriorities
+from py_treaps.treap_map import TreapMap
+from py_treaps.treap_node import TreapNode
+
+import random
+
+
+def shape(node):
+    """Return the preorder (key, priority) sequence of a subtree."""
+    if node is None:
+        return []
+    return [(node.key, node.priority)] + shape(node.left_child) + shape(node.right_child)
+
+
+def test_more_nodes_than_pool() -> None:
+    """Test that a map can hold more nodes than the legacy pool."""
+
+    treap = TreapMap(priorities=RandomPriorities(seed=1, bits=32))
+    keys = list(range(TreapNode.MAX_PRIORITY + 5000))
+    random.Random(0).shuffle(keys)
+    for key in keys:
+        treap.insert(key, key)
+
+    assert len(treap) == len(keys)
+    assert treap.lookup(TreapNode.MAX_PRIORITY + 1) == TreapNode.MAX_PRIORITY + 1
+
+
+def test_seeded_shapes_are_reproducible() -> None:
+    """Test that two maps with the same seed have the same shape."""
+
+    treaps = [TreapMap(priorities=RandomPriorities(seed=7)) for _ in range(2)]
+    for treap in treaps:
+        for i in range(100):
+            treap.insert(i, i)
+
+    assert shape(treaps[0].get_root_node()) == shape(treaps[1].get_root_node())
+
+
+def test_hash_priorities_ignore_insertion_order() -> None:
+    """Test that key-derived priorities give an order-independent shape."""
+
+    keys = list(range(200))
+    forward = TreapMap(priorities=HashPriorities(seed=3))
+    backward = TreapMap(priorities=HashPriorities(seed=3))
+    for key in keys:
+        forward.insert(key, key)
+    for key in reversed(keys):
+        backward.insert(key, key)
+
+    assert shape(forward.get_root_node()) == shape(backward.get_root_node())
+    source = HashPriorities(bits=20)
+    assert all(0 <= source(key) < source.max_priority for key in keys)
+
+
+def test_pooled_priorities() -> None:
+    """Test the legacy pool as an explicit priority source."""
+
+    treap = TreapMap(priorities=PooledPriorities())
+    for i in range(50):
+        treap.insert(i, str(i))
+
+    assert list(treap) == list(range(50))
+    assert treap.get_root_node().priority < PooledPriorities.max_priority
@@ -0,0 +1,118 @@
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_sequence import TreapSequence
+
+import pytest
+import random
+
+
+def check_sequence(sequence: TreapSequence) -> None:
+    """Check parent pointers, heap order and sizes of every node."""
+    stack = [(sequence.root, None)]
+    while stack:
+        node, parent = stack.pop()
+        if node is None:
+            continue
+        assert node.parent is parent
+        size = 1
+        for child in (node.left_child, node.right_child):
+            if child is not None:
+                assert child.priority <= node.priority
+                size += child.size
+                stack.append((child, node))
+        assert node.size == size
+
+
+def test_matches_list_under_random_edits() -> None:
+    """Test a random mix of edits against a Python list."""
+
+    rng = random.Random(13)
+    expected = list(range(50))
+    sequence = TreapSequence(expected, RandomPriorities(13))
+    for step in range(2000):
+        choice = rng.randrange(6)
+        i = rng.randrange(-len(expected) - 2, len(expected) + 2)
+        if choice == 0:
+            sequence.insert(i, step)
+            expected.insert(i, step)
+        elif choice == 1 and expected:
+            j = rng.randrange(len(expected))
+            del sequence[j]
+            del expected[j]
+        elif choice == 2 and expected:
+            j = rng.randrange(len(expected))
+            sequence[j] = -step
+            expected[j] = -step
+        elif choice == 3:
+            a, b = sorted(rng.randrange(len(expected) + 1) for _ in range(2))
+            del sequence[a:b]
+            del expected[a:b]
+        elif choice == 4:
+            a, b = sorted(rng.randrange(len(expected) + 1) for _ in range(2))
+            sequence[a:b] = [step] * 3
+            expected[a:b] = [step] * 3
+        else:
+            sequence.append(step)
+            expected.append(step)
+    check_sequence(sequence)
+    assert list(sequence) == expected
+    assert len(sequence) == len(expected)
+
+
+def test_indexing_and_slicing() -> None:
+    """Test index access, negative indices and slices."""
+
+    sequence = TreapSequence(range(100))
+    assert sequence[0] == 0 and sequence[-1] == 99 and sequence[57] == 57
+    assert list(sequence[10:20]) == list(range(10, 20))
+    assert list(sequence[::-7]) == list(range(100))[::-7]
+    assert list(sequence[50:40]) == []
+    assert list(sequence) == list(range(100))
+    assert list(reversed(sequence)) == list(range(99, -1, -1))
+    with pytest.raises(IndexError):
+        sequence[100]
+    with pytest.raises(IndexError):
+        sequence[-101] = 1
+    check_sequence(sequence)
+
+
+def test_split_and_concat() -> None:
+    """Test splitting at an index and concatenating back."""
+
+    sequence = TreapSequence("abcdefghij")
+    left, right = sequence.split(4)
+    assert "".join(left) == "abcd" and "".join(right) == "efghij"
+    assert len(sequence) == 0
+
+    right.concat(left)
+    assert "".join(right) == "efghijabcd"
+    assert len(left) == 0
+    check_sequence(right)
+    with pytest.raises(ValueError):
+        right.concat(right)
+
+
+def test_mutable_sequence_mixins() -> None:
+    """Test methods inherited from MutableSequence."""
+
+    sequence = TreapSequence([3, 1, 2])
+    sequence.extend([5, 4])
+    assert sequence.pop() == 4
+    assert sequence.pop(0) == 3
+    sequence.reverse()
+    assert list(sequence) == [5, 2, 1]
+    assert sequence.index(2) == 1
+    assert 5 in sequence
+    sequence.remove(2)
+    assert repr(sequence) == "TreapSequence([5, 1])"
+
+
+def test_assign_slice_from_itself() -> None:
+    """Test slice assignment whose source is the sequence itself."""
+
+    for index in (slice(1, 3), slice(6, 6), slice(None), slice(None, None, -1)):
+        expected = list(range(6))
+        expected[index] = expected
+        sequence = TreapSequence(range(6))
+        sequence[index] = sequence
+        assert list(sequence) == expected
+        check_sequence(sequence)
@@ -0,0 +1,66 @@
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import BatchResult, TreapMap
+from tests.treap_helpers import check_treap
+
+import random
+
+
+def test_insert_many_counts() -> None:
+    """Test that insert_many reports new and overwritten keys."""
+
+    treap = TreapMap(priorities=RandomPriorities(seed=4))
+    for i in range(0, 100, 2):
+        treap.insert(i, "old")
+
+    result = treap.insert_many((i, "new") for i in range(50, 150))
+    assert result == BatchResult(inserted=75, overwritten=25)
+    assert len(treap) == 125
+    assert treap.lookup(52) == "new"
+    assert treap.lookup(48) == "old"
+    assert treap.lookup(149) == "new"
+    check_treap(treap)
+
+
+def test_insert_many_into_empty_and_empty_batch() -> None:
+    """Test the degenerate batch cases."""
+
+    treap = TreapMap()
+    assert treap.insert_many([]) == BatchResult(0, 0)
+    assert treap.insert_many([(3, "c"), (1, "a"), (2, "b")]) == BatchResult(3, 0)
+    assert list(treap) == [1, 2, 3]
+    check_treap(treap)
+
+
+def test_update_matches_dict() -> None:
+    """Test update against dict.update on random batches."""
+
+    rng = random.Random(8)
+    treap = TreapMap(priorities=RandomPriorities(seed=8))
+    expected = {}
+    for _ in range(20):
+        batch = {rng.randrange(1000): rng.random() for _ in range(rng.randrange(100))}
+        new = len(batch.keys() - expected.keys())
+        assert treap.update(batch) == BatchResult(new, len(batch) - new)
+        expected.update(batch)
+
+    pairs = [(key, "pair") for key in range(5)]
+    treap.update(pairs)
+    expected.update(pairs)
+
+    check_treap(treap)
+    assert list(treap) == sorted(expected)
+    assert all(treap.lookup(key) == value for key, value in expected.items())
+
+
+def test_small_batch_repeated_keys() -> None:
+    """Test a batch small enough to be inserted key by key."""
+
+    treap = TreapMap()
+    treap.insert_many((i, "old") for i in range(100))
+
+    result = treap.insert_many([(5, "a"), (200, "b"), (5, "c"), (200, "d")])
+    assert result == BatchResult(inserted=1, overwritten=1)
+    assert treap.lookup(5) == "c"
+    assert treap.lookup(200) == "d"
+    assert len(treap) == 101
+    check_treap(treap)
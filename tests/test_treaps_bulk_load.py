@@ -0,0 +1,54 @@
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+from py_treaps.treap_node import SlimTreapNode
+from tests.treap_helpers import check_treap
+
+import random
+
+
+def test_from_sorted() -> None:
+    """Test building a map from sorted pairs."""
+
+    items = [(i, str(i)) for i in range(1000)]
+    treap = TreapMap.from_sorted(items, priorities=RandomPriorities(seed=2))
+
+    check_treap(treap)
+    assert list(treap) == list(range(1000))
+    assert treap.lookup(500) == "500"
+
+
+def test_from_sorted_empty() -> None:
+    """Test building a map from no pairs."""
+
+    treap = TreapMap.from_sorted([])
+    assert treap.get_root_node() is None
+    assert len(treap) == 0
+
+
+def test_bulk_load_unsorted_falls_back() -> None:
+    """Test that unsorted input is sorted before loading."""
+
+    keys = list(range(500))
+    random.Random(3).shuffle(keys)
+    treap = TreapMap()
+    treap.insert(-1, "replaced")
+    treap.bulk_load((key, key * 2) for key in keys)
+
+    check_treap(treap)
+    assert list(treap) == list(range(500))
+    assert treap.lookup(-1) is None
+    assert treap.lookup(250) == 500
+
+
+def test_bulk_load_duplicates_last_wins() -> None:
+    """Test that the last value for a repeated key is kept."""
+
+    sorted_pairs = [(1, "a"), (1, "b"), (2, "c"), (3, "d"), (3, "e")]
+    unsorted_pairs = [(3, "d"), (1, "a"), (3, "e"), (1, "b"), (2, "c")]
+
+    for pairs in (sorted_pairs, unsorted_pairs):
+        treap = TreapMap.from_sorted(pairs, node_type=SlimTreapNode)
+        assert list(treap) == [1, 2, 3]
+        treap = TreapMap.from_sorted(pairs)
+        assert [treap.lookup(key) for key in (1, 2, 3)] == ["b", "c", "e"]
+        check_treap(treap)
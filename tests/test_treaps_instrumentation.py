@@ -0,0 +1,152 @@
+from py_treaps.instrumentation import (
+    OperationHistogram, OperationRecord, instrument, is_instrumented, uninstrument,
+)
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import LowestBitPriorities, check_treap
+
+import pytest
+import random
+
+
+def test_counts_on_a_known_shape() -> None:
+    """Test the counters against a perfect tree of height 4."""
+
+    treap = TreapMap(priorities=LowestBitPriorities())
+    for key in range(1, 16):
+        treap.insert(key, key)
+    records = []
+    instrument(treap, records.append)
+
+    assert treap.lookup(8) == 8
+    assert treap.lookup(1) == 1
+    assert treap.lookup(100) is None
+    # the root holds 8; 1 is a leaf three levels down
+    assert [(r.operation, r.nodes_visited) for r in records] == [
+        ("lookup", 1), ("lookup", 4), ("lookup", 4),
+    ]
+    assert records[0].comparisons == 1
+    assert records[1].comparisons == 7
+    assert all(r.rotations == 0 and r.elapsed >= 0 for r in records)
+
+    del records[:]
+    assert treap.remove(8) == 8
+    assert records[0].operation == "remove"
+    assert records[0].nodes_visited == 1
+    # the root rotates past the inner spines of both subtrees
+    assert records[0].rotations == 6
+    check_treap(treap)
+
+
+def test_insert_keeps_real_keys() -> None:
+    """Test that instrumented inserts store the real key and priority."""
+
+    treap = TreapMap(priorities=LowestBitPriorities())
+    records = []
+    instrument(treap, records.append)
+    for key in range(1, 16):
+        treap.insert(key, key)
+    treap.insert(8, "again")
+
+    check_treap(treap)
+    assert all(type(key) is int for key in treap)
+    assert treap.get_root_node().key == 8
+    assert treap.get_root_node().value == "again"
+    assert [r.operation for r in records] == ["insert"] * 16
+    assert sum(r.rotations for r in records) > 0
+    assert records[-1].nodes_visited == 1
+
+
+def test_failing_hook_leaves_real_keys() -> None:
+    """Test that a hook raising during insert leaves no probe in the map."""
+
+    def hook(record):
+        raise RuntimeError("exporter down")
+
+    treap = TreapMap(priorities=RandomPriorities(6))
+    instrument(treap, hook)
+    for key in range(20):
+        with pytest.raises(RuntimeError):
+            treap.insert(key, key)
+    uninstrument(treap)
+
+    check_treap(treap)
+    assert all(type(key) is int for key in treap)
+    assert type(treap.priorities) is RandomPriorities
+    assert isinstance(treap.node_type, type)
+    assert list(treap) == list(range(20))
+
+
+def test_split_and_join() -> None:
+    """Test records for split and join."""
+
+    treap = TreapMap.from_sorted(((i, i) for i in range(1000)),
+                                 priorities=RandomPriorities(4))
+    records = []
+    instrument(treap, records.append)
+    low, high = treap.split(500)
+
+    assert records[-1].operation == "split"
+    assert records[-1].comparisons >= records[-1].nodes_visited > 0
+    assert not is_instrumented(low)
+
+    instrument(low, records.append)
+    low.join(high)
+    assert records[-1].operation == "join"
+    assert records[-1].comparisons == 2
+    assert records[-1].nodes_visited > 0
+    assert list(low) == list(range(1000))
+    check_treap(low)
+
+
+def test_uninstrument() -> None:
+    """Test that uninstrument restores the plain methods."""
+
+    treap = TreapMap()
+    records = []
+    instrument(treap, records.append)
+    assert is_instrumented(treap)
+    treap.insert(1, 1)
+    uninstrument(treap)
+    treap.insert(2, 2)
+    treap.lookup(2)
+
+    assert not is_instrumented(treap)
+    assert len(records) == 1
+    assert "insert" not in vars(treap)
+
+
+def test_histogram() -> None:
+    """Test the histogram sink."""
+
+    histogram = OperationHistogram()
+    for visited in (1, 2, 2, 3, 10):
+        histogram(OperationRecord("lookup", 2 * visited, visited, 0, 0.5))
+
+    assert histogram.calls["lookup"] == 5
+    assert histogram.elapsed["lookup"] == pytest.approx(2.5)
+    assert histogram.mean("lookup", "nodes_visited") == pytest.approx(3.6)
+    assert histogram.percentile("lookup", "nodes_visited", 50) == 2
+    assert histogram.percentile("lookup", "nodes_visited", 100) == 10
+    assert histogram.percentile("lookup", "comparisons", 80) == 6
+    assert histogram.mean("insert", "rotations") == 0.0
+    with pytest.raises(ValueError):
+        histogram.percentile("lookup", "rotations", -1)
+
+
+def test_histogram_as_hook() -> None:
+    """Test collecting a random workload into a histogram."""
+
+    treap = TreapMap(priorities=RandomPriorities(5))
+    histogram = OperationHistogram()
+    instrument(treap, histogram)
+    rng = random.Random(5)
+    for _ in range(2000):
+        treap.insert(rng.randrange(500), 0)
+    for _ in range(300):
+        treap.remove(rng.randrange(500))
+
+    check_treap(treap)
+    assert histogram.calls["insert"] == 2000
+    assert histogram.calls["remove"] == 300
+    assert 1 < histogram.mean("insert", "nodes_visited") < 30
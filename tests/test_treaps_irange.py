@@ -0,0 +1,43 @@
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import build
+
+import itertools
+import random
+
+
+def test_irange_matches_filtered_sort() -> None:
+    """Test every bound combination against filtering a sorted list."""
+
+    keys = random.Random(12).sample(range(200), 80)
+    treap = build(keys)
+    ordered = sorted(keys)
+
+    bounds = [None, -1, 0, ordered[5], ordered[5] + 0.5, ordered[40], 199, 300]
+    for lo, hi in itertools.product(bounds, repeat=2):
+        for inclusive in itertools.product((True, False), repeat=2):
+            expected = [
+                key for key in ordered
+                if (lo is None or key > lo or (inclusive[0] and key == lo))
+                and (hi is None or key < hi or (inclusive[1] and key == hi))
+            ]
+            assert list(treap.irange(lo, hi, inclusive)) == expected
+            assert list(treap.irange(lo, hi, inclusive, reverse=True)) == expected[::-1]
+
+
+def test_items_and_values() -> None:
+    """Test the item and value iterators with and without bounds."""
+
+    treap = build(range(10))
+    assert list(treap.items()) == [(i, str(i)) for i in range(10)]
+    assert list(treap.values(3, 6)) == ["3", "4", "5"]
+    assert list(treap.items(8, reverse=True)) == [(9, "9"), (8, "8")]
+    assert list(TreapMap().items()) == []
+
+
+def test_irange_is_lazy() -> None:
+    """Test that irange does not walk the whole map up front."""
+
+    treap = build(range(1000))
+    window = treap.irange(500)
+    assert next(window) == 500
+    assert next(window) == 501
@@ -0,0 +1,37 @@
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import DescendingPriorities, build
+
+import sys
+
+
+def test_deep_treap_has_no_recursion_limit() -> None:
+    """Test lookup, insert and iteration on a chain deeper than the
+    recursion limit.
+    """
+
+    n = sys.getrecursionlimit() + 200
+    treap = build(range(n), DescendingPriorities())
+
+    # the chain really is that deep
+    node, depth = treap.get_root_node(), 0
+    while node is not None:
+        node, depth = node.right_child, depth + 1
+    assert depth == n
+
+    assert treap.lookup(n - 1) == str(n - 1)
+    assert n - 1 in treap
+    assert list(treap) == list(range(n))
+    assert str(treap).count("Key:") == n
+
+
+def test_overwrite_keeps_size() -> None:
+    """Test that overwriting a key does not change the size."""
+
+    treap = TreapMap()
+    for i in range(10):
+        treap.insert(i, str(i))
+    for i in range(10):
+        treap.insert(i, "again")
+
+    assert len(treap) == 10
+    assert treap.lookup(3) == "again"
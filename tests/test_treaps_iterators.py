@@ -0,0 +1,74 @@
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import build
+
+import pytest
+import random
+
+
+def test_forward_and_reverse() -> None:
+    """Test every iterator in both directions."""
+
+    keys = random.Random(6).sample(range(10000), 700)
+    treap = build(keys)
+    ordered = sorted(keys)
+
+    assert list(treap) == ordered
+    assert list(reversed(treap)) == ordered[::-1]
+    assert list(treap.keys()) == ordered
+    assert list(treap.keys(reverse=True)) == ordered[::-1]
+    assert list(treap.values()) == [str(k) for k in ordered]
+    assert list(treap.items(reverse=True)) == [(k, str(k)) for k in ordered[::-1]]
+    assert list(treap.keys(ordered[10], ordered[20])) == ordered[10:20]
+    assert list(reversed(TreapMap())) == []
+
+
+@pytest.mark.parametrize("make_iterator", [
+    iter,
+    reversed,
+    lambda treap: treap.items(),
+    lambda treap: treap.values(reverse=True),
+    lambda treap: treap.irange(10, 90),
+    lambda treap: treap.irange(10, 90, reverse=True),
+])
+def test_mutation_during_iteration(make_iterator) -> None:
+    """Test that adding or removing keys breaks running iterators."""
+
+    for mutate in (
+        lambda treap: treap.insert(1000, "new"),
+        lambda treap: treap.remove(50),
+        lambda treap: treap.split(50),
+        lambda treap: treap.bulk_load([(1, 1)]),
+        lambda treap: treap.meld(build([500])),
+    ):
+        treap = build(range(100))
+        iterator = make_iterator(treap)
+        next(iterator)
+        mutate(treap)
+        with pytest.raises(RuntimeError):
+            next(iterator)
+
+
+def test_allowed_changes_during_iteration() -> None:
+    """Test that overwriting values and failed removals are allowed."""
+
+    treap = build(range(100))
+    seen = []
+    for key in treap:
+        treap.insert(key, "overwritten")
+        treap.remove(-1)
+        seen.append(key)
+    assert seen == list(range(100))
+    assert set(treap.values()) == {"overwritten"}
+
+
+def test_joined_treap_breaks_iterators() -> None:
+    """Test that join invalidates iterators over both treaps."""
+
+    low, high = build(range(50)), build(range(50, 100))
+    low_iterator, high_iterator = iter(low), iter(high)
+    next(low_iterator)
+    next(high_iterator)
+    low.join(high)
+    for iterator in (low_iterator, high_iterator):
+        with pytest.raises(RuntimeError):
+            next(iterator)
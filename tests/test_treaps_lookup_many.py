@@ -0,0 +1,34 @@
+from py_treaps.treap_map import TreapMap
+
+import random
+
+
+def test_lookup_many_matches_lookup() -> None:
+    """Test lookup_many against single lookups, in input order."""
+
+    rng = random.Random(9)
+    treap = TreapMap.from_sorted((i, str(i)) for i in range(0, 1000, 3))
+    keys = [rng.randrange(-10, 1010) for _ in range(500)]
+
+    assert treap.lookup_many(keys) == [treap.lookup(key) for key in keys]
+    assert treap.contains_many(keys) == [key in treap for key in keys]
+
+
+def test_lookup_many_repeated_keys() -> None:
+    """Test a batch that repeats keys."""
+
+    treap = TreapMap()
+    for i in range(10):
+        treap.insert(i, i * i)
+
+    assert treap.lookup_many([3, 3, 11, 0, 3]) == [9, 9, None, 0, 9]
+
+
+def test_lookup_many_empty() -> None:
+    """Test empty batches and empty maps."""
+
+    treap = TreapMap()
+    assert treap.lookup_many([1, 2]) == [None, None]
+    treap.insert(1, "one")
+    assert treap.lookup_many([]) == []
+    assert treap.contains_many(iter([1, 2])) == [True, False]
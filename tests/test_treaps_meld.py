@@ -0,0 +1,67 @@
+from py_treaps.aggregate_treap_map import AggregateTreapMap
+from py_treaps.priorities import RandomPriorities
+from tests.treap_helpers import build_items, check_treap
+
+import operator
+import pytest
+import random
+
+
+def test_meld_overlapping() -> None:
+    """Test meld against dict union for random overlapping maps."""
+
+    rng = random.Random(15)
+    for mine_size, theirs_size in ((0, 10), (10, 0), (5, 300), (300, 5), (200, 200)):
+        mine = {rng.randrange(500): ("mine", i) for i in range(mine_size)}
+        theirs = {rng.randrange(500): ("theirs", i) for i in range(theirs_size)}
+        left = build_items(mine.items(), RandomPriorities(rng.random()))
+        right = build_items(theirs.items(), RandomPriorities(rng.random()))
+
+        left.meld(right)
+        check_treap(left)
+        expected = {**mine, **theirs}
+        assert list(left) == sorted(expected)
+        assert all(left.lookup(key) == value for key, value in expected.items())
+        assert len(right) == 0 and right.get_root_node() is None
+
+
+def test_meld_conflict_policies() -> None:
+    """Test the named and callable conflict policies."""
+
+    for conflict, expected in (
+        ("theirs", "b"),
+        ("mine", "a"),
+        (lambda key, mine, theirs: mine + theirs + str(key), "ab1"),
+    ):
+        left = build_items([(1, "a"), (2, "a")], RandomPriorities(1))
+        right = build_items([(1, "b"), (3, "b")], RandomPriorities(2))
+        left.meld(right, conflict)
+        assert left.lookup(1) == expected
+        assert list(left.items()) == [(1, expected), (2, "a"), (3, "b")]
+
+    with pytest.raises(KeyError):
+        build_items([(1, "a")]).meld(build_items([(1, "b")]), "neither")
+
+
+def test_meld_with_itself() -> None:
+    """Test that melding a map with itself leaves it unchanged."""
+
+    treap = build_items((i, i) for i in range(50))
+    treap.meld(treap)
+    check_treap(treap)
+    assert list(treap.items()) == [(i, i) for i in range(50)]
+
+
+def test_meld_keeps_aggregates() -> None:
+    """Test meld on an aggregate-augmented map."""
+
+    left = AggregateTreapMap(operator.add, 0)
+    right = AggregateTreapMap(operator.add, 0)
+    for i in range(100):
+        left.insert(i, 1)
+        right.insert(i + 50, 10)
+
+    left.meld(right, lambda key, mine, theirs: mine + theirs)
+    check_treap(left)
+    assert left.aggregate() == 50 + 50 * 11 + 50 * 10
+    assert left.aggregate(50, 100) == 50 * 11
@@ -0,0 +1,48 @@
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import build
+
+import bisect
+import pytest
+import random
+
+
+def pair(key):
+    return (key, str(key)) if key is not None else None
+
+
+def test_nearest_keys_against_bisect() -> None:
+    """Test floor, ceiling, lower and higher against a sorted list."""
+
+    keys = sorted(random.Random(12).sample(range(0, 5000, 5), 400))
+    treap = build(keys)
+    for probe in range(-10, 5010, 3):
+        i = bisect.bisect_right(keys, probe)
+        j = bisect.bisect_left(keys, probe)
+        assert treap.floor(probe) == pair(keys[i - 1] if i else None)
+        assert treap.lower(probe) == pair(keys[j - 1] if j else None)
+        assert treap.ceiling(probe) == pair(keys[j] if j < len(keys) else None)
+        assert treap.higher(probe) == pair(keys[i] if i < len(keys) else None)
+
+
+def test_exact_keys() -> None:
+    """Test inclusive and exclusive queries on keys that are present."""
+
+    treap = build([10, 20, 30])
+    assert treap.floor(20) == treap.ceiling(20) == (20, "20")
+    assert treap.lower(20) == (10, "10")
+    assert treap.higher(20) == (30, "30")
+    assert treap.lower(10) is None and treap.higher(30) is None
+
+
+def test_min_and_max() -> None:
+    """Test min and max, including on an empty map."""
+
+    treap = build([7, 3, 9, 1])
+    assert treap.min() == (1, "1")
+    assert treap.max() == (9, "9")
+    empty = TreapMap()
+    assert empty.floor(1) is None and empty.ceiling(1) is None
+    with pytest.raises(ValueError):
+        empty.min()
+    with pytest.raises(ValueError):
+        empty.max()
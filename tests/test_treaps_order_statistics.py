@@ -0,0 +1,58 @@
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import build
+
+import pytest
+import random
+
+
+def test_rank_and_select_agree_with_sorted() -> None:
+    """Test rank and select against a sorted list."""
+
+    keys = random.Random(11).sample(range(10000), 500)
+    treap = build(keys)
+    ordered = sorted(keys)
+
+    for i, key in enumerate(ordered):
+        assert treap.select(i) == key
+        assert treap.rank(key) == i
+    assert treap.select(-1) == ordered[-1]
+    assert treap.rank(-5) == 0
+    assert treap.rank(10**6) == len(keys)
+    assert treap.rank(ordered[10] + 0.5) == 11
+
+
+def test_select_out_of_range() -> None:
+    """Test select and kth_smallest with bad positions."""
+
+    treap = build(range(5))
+    for index in (5, -6):
+        with pytest.raises(IndexError):
+            treap.select(index)
+    with pytest.raises(IndexError):
+        treap.kth_smallest(0)
+    with pytest.raises(IndexError):
+        TreapMap().select(0)
+
+
+def test_kth_smallest_and_median() -> None:
+    """Test the convenience wrappers."""
+
+    treap = build([5, 1, 9, 3, 7])
+    assert treap.kth_smallest(1) == 1
+    assert treap.kth_smallest(5) == 9
+    assert treap.median() == 5
+    treap.insert(11, "11")
+    assert treap.median() == 5
+    treap.remove(1)
+    assert treap.median() == 7
+    with pytest.raises(ValueError):
+        TreapMap().median()
+
+
+def test_order_statistics_after_split() -> None:
+    """Test that split halves answer order queries."""
+
+    left, right = build(range(100)).split(40)
+    assert left.select(-1) == 39
+    assert right.rank(50) == 10
+    assert right.median() == 69
@@ -0,0 +1,103 @@
+from py_treaps import serialization
+from py_treaps.lazy_treap_map import LazyTreapMap
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+
+import io
+import pytest
+import random
+
+
+def build(items, seed=18) -> TreapMap:
+    treap = TreapMap(priorities=RandomPriorities(seed, bits=32))
+    for key, value in items:
+        treap.insert(key, value)
+    return treap
+
+
+def round_trip(treap: TreapMap, **kwargs) -> TreapMap:
+    buffer = io.BytesIO()
+    treap.dump(buffer)
+    buffer.seek(0)
+    return type(treap).load(buffer, **kwargs)
+
+
+def test_round_trip_keeps_shape(tmp_path) -> None:
+    """Test that a saved map loads back with the same tree."""
+
+    keys = random.Random(18).sample(range(10**6), 3000)
+    treap = build((key, str(key)) for key in keys)
+    path = tmp_path / "map.treap"
+    treap.dump(path)
+    loaded = TreapMap.load(path)
+
+    assert str(loaded) == str(treap)
+    assert len(loaded) == len(treap)
+    assert loaded.get_root_node().size == len(treap)
+    assert loaded.get_root_node().parent is None
+
+
+@pytest.mark.parametrize("keys, values, encodings", [
+    (range(100), [i * 0.5 for i in range(100)], (serialization.INT32, serialization.FLOAT64)),
+    ([2**31 + i for i in range(10)], [-2**40 - i for i in range(10)],
+     (serialization.UINT32, serialization.INT64)),
+    ([2**63 + i for i in range(10)], [-i for i in range(10)],
+     (serialization.UINT64, serialization.INT32)),
+    ([f"k{i:03}" for i in range(50)], [None, True] * 25, (serialization.PICKLE,) * 2),
+    ([2**70 + i for i in range(5)], [(i, i) for i in range(5)], (serialization.PICKLE,) * 2),
+])
+def test_encodings(keys, values, encodings) -> None:
+    """Test that each kind of key and value picks its encoding and survives."""
+
+    treap = build(zip(keys, values))
+    buffer = io.BytesIO()
+    treap.dump(buffer)
+    data = buffer.getvalue()
+    header = serialization._HEADER.size + serialization._COUNT.size
+    assert data[header] == encodings[0]
+    key_bytes = serialization._SECTION.unpack_from(data, header)[1]
+    assert data[header + serialization._SECTION.size + key_bytes] == encodings[1]
+    assert str(round_trip(treap)) == str(treap)
+    assert list(round_trip(treap).items()) == sorted(zip(keys, values))
+
+
+def test_several_chunks(monkeypatch) -> None:
+    """Test maps larger than one chunk."""
+
+    monkeypatch.setattr(serialization, "CHUNK_SIZE", 7)
+    treap = build((i, i) for i in range(100))
+    assert str(round_trip(treap)) == str(treap)
+    assert str(round_trip(TreapMap())) == "Empty Treap"
+
+
+def test_typed_sections_are_compact() -> None:
+    """Test that small integer maps take about 12 bytes per node."""
+
+    treap = TreapMap.from_sorted(((i, i) for i in range(10000)),
+                                 priorities=RandomPriorities(1, bits=32))
+    buffer = io.BytesIO()
+    treap.dump(buffer)
+    assert len(buffer.getvalue()) < 12 * 10000 + 100
+
+
+def test_lazy_map_saves_pending_updates() -> None:
+    """Test that pending range updates are written out."""
+
+    treap = LazyTreapMap(priorities=RandomPriorities(19))
+    for key in range(200):
+        treap.insert(key, 1)
+    treap.add_range(4, 50, 150)
+    loaded = round_trip(treap)
+    assert loaded.aggregate() == 600
+    assert loaded.aggregate(100, 110) == 50
+
+
+def test_bad_files() -> None:
+    """Test that foreign or damaged files are rejected."""
+
+    with pytest.raises(ValueError):
+        TreapMap.load(io.BytesIO(b"not a treap file at all"))
+    buffer = io.BytesIO()
+    build((i, i) for i in range(100)).dump(buffer)
+    with pytest.raises(ValueError):
+        TreapMap.load(io.BytesIO(buffer.getvalue()[:-30]))
@@ -0,0 +1,93 @@
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import build_items, check_treap
+
+import random
+
+
+def build(keys, tag, seed) -> TreapMap:
+    return build_items(((key, (tag, key)) for key in keys), RandomPriorities(seed=seed))
+
+
+def random_key_sets(rng):
+    for mine_size, theirs_size in ((0, 20), (20, 0), (5, 300), (300, 5), (200, 200)):
+        yield (
+            set(rng.sample(range(600), mine_size)),
+            set(rng.sample(range(600), theirs_size)),
+        )
+
+
+def test_in_place_operations_match_sets() -> None:
+    """Test the in-place operations against Python sets."""
+
+    rng = random.Random(16)
+    for mine, theirs in random_key_sets(rng):
+        for method, expected in (
+            ("difference", mine - theirs),
+            ("intersection", mine & theirs),
+            ("symmetric_difference", mine ^ theirs),
+        ):
+            treap = build(mine, "mine", rng.random())
+            other = build(theirs, "theirs", rng.random())
+            getattr(treap, method)(other)
+
+            check_treap(treap)
+            assert list(treap) == sorted(expected)
+            assert len(other) == 0
+            for key in expected:
+                assert treap.lookup(key) == ("mine" if key in mine else "theirs", key)
+
+
+def test_intersection_conflict() -> None:
+    """Test choosing the other treap's values on intersection."""
+
+    treap = build([1, 2, 3], "mine", 1)
+    treap.intersection(build([2, 3, 4], "theirs", 2), conflict="theirs")
+    assert list(treap.items()) == [(2, ("theirs", 2)), (3, ("theirs", 3))]
+
+
+def test_operations_with_itself() -> None:
+    """Test each in-place operation with the map itself as the other map."""
+
+    for method, expected in (
+        ("intersection", list(range(30))),
+        ("difference", []),
+        ("symmetric_difference", []),
+    ):
+        treap = build(range(30), "mine", 3)
+        getattr(treap, method)(treap)
+        check_treap(treap)
+        assert list(treap) == expected
+        assert all(treap.lookup(key) == ("mine", key) for key in expected)
+
+
+def test_operators_return_new_maps() -> None:
+    """Test |, &, - and ^ without modifying their operands."""
+
+    mine = build(range(0, 20), "mine", 3)
+    theirs = build(range(10, 30), "theirs", 4)
+
+    assert list(mine | theirs) == list(range(30))
+    assert list(mine & theirs) == list(range(10, 20))
+    assert list(mine - theirs) == list(range(10))
+    assert list(mine ^ theirs) == list(range(10)) + list(range(20, 30))
+    assert (mine | theirs).lookup(15) == ("theirs", 15)
+
+    assert list(mine) == list(range(20)) and len(mine) == 20
+    assert list(theirs) == list(range(10, 30)) and len(theirs) == 20
+    check_treap(mine)
+    check_treap(theirs)
+
+
+def test_copy_is_independent() -> None:
+    """Test that a copy has the same shape and no shared nodes."""
+
+    treap = build(range(50), "mine", 5)
+    copy = treap.copy()
+    check_treap(copy)
+    assert str(copy) == str(treap)
+
+    copy.remove(10)
+    copy.insert(100, "new")
+    assert 10 in treap and 100 not in treap
+    assert len(treap) == 50
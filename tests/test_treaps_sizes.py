@@ -0,0 +1,96 @@
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import check_treap
+
+import pytest
+import random
+
+
+def test_sizes_through_insert_and_remove() -> None:
+    """Test sizes after a random mix of inserts, overwrites and removes."""
+
+    rng = random.Random(10)
+    treap = TreapMap(priorities=RandomPriorities(seed=10))
+    for _ in range(3000):
+        key = rng.randrange(300)
+        if rng.random() < 0.4:
+            treap.remove(key)
+        else:
+            treap.insert(key, key)
+    check_treap(treap)
+    assert len(treap) == treap.count_nodes()
+
+
+def test_split_sizes() -> None:
+    """Test that split results carry correct sizes without counting."""
+
+    for threshold in (-1, 0, 37, 37.5, 99, 100):
+        treap = TreapMap.from_sorted((i, i) for i in range(100))
+        check_treap(treap)
+        left, right = treap.split(threshold)
+        check_treap(left)
+        check_treap(right)
+        assert len(left) == len([i for i in range(100) if i < threshold])
+        assert len(left) + len(right) == 100
+        assert right.get_root_node() is None or right.get_root_node().size == len(right)
+
+
+def test_join_sizes() -> None:
+    """Test sizes after joins, including single-node treaps."""
+
+    for low_size, high_size in ((1, 1), (1, 10), (10, 1), (0, 5), (50, 70)):
+        low = TreapMap.from_sorted((i, i) for i in range(low_size))
+        high = TreapMap.from_sorted((i, i) for i in range(100, 100 + high_size))
+        low.join(high)
+        check_treap(low)
+        assert len(low) == low_size + high_size
+        assert list(low) == list(range(low_size)) + list(range(100, 100 + high_size))
+
+
+def test_batch_sizes() -> None:
+    """Test sizes after bulk loads and batched inserts."""
+
+    treap = TreapMap.from_sorted((i, i) for i in range(0, 200, 2))
+    check_treap(treap)
+    treap.insert_many((i, i) for i in range(100, 300))
+    check_treap(treap)
+    assert len(treap) == 250
+
+
+def test_join_without_sentinel() -> None:
+    """Test that join allocates no node and accepts keys of any type."""
+
+    low = TreapMap.from_sorted((i, i) for i in range(10))
+    high = TreapMap.from_sorted((i, i) for i in range(10, 20))
+    nodes = {id(node) for node in low._iter_nodes(low.root)}
+    nodes |= {id(node) for node in high._iter_nodes(high.root)}
+
+    high.join(low)
+    assert {id(node) for node in high._iter_nodes(high.root)} == nodes
+    assert list(high) == list(range(20))
+    assert low.get_root_node() is None and len(low) == 0
+    check_treap(high)
+
+
+def test_join_rejects_itself_and_overlaps() -> None:
+    """Test that join refuses inputs it would silently corrupt."""
+
+    treap = TreapMap.from_sorted((i, i) for i in range(20))
+    with pytest.raises(ValueError):
+        treap.join(treap)
+    assert len(treap) == 20
+
+    evens = TreapMap.from_sorted((i, i) for i in range(0, 20, 2))
+    odds = TreapMap.from_sorted((i, i) for i in range(1, 20, 2))
+    with pytest.raises(ValueError):
+        evens.join(odds)
+    with pytest.raises(ValueError):
+        odds.join(evens)
+    assert list(evens) == list(range(0, 20, 2))
+    assert list(odds) == list(range(1, 20, 2))
+
+    # a key present in both maps counts as an overlap
+    low = TreapMap.from_sorted((i, i) for i in range(10))
+    with pytest.raises(ValueError):
+        low.join(TreapMap.from_sorted([(9, 0), (10, 0)]))
+    assert len(low) == 10
@@ -0,0 +1,67 @@
+from py_treaps.priorities import RandomPriorities
+from py_treaps.treap_map import TreapMap
+from tests.treap_helpers import DescendingPriorities, LowestBitPriorities, build
+
+import math
+import pytest
+
+
+def test_perfect_tree() -> None:
+    """Test stats and balance_factor on a perfectly balanced tree."""
+
+    treap = build(range(1, 16), LowestBitPriorities())
+    stats = treap.stats()
+
+    assert stats.size == 15
+    assert stats.height == 4
+    assert stats.leaf_count == 8
+    assert stats.depth_counts == [1, 2, 4, 8]
+    assert stats.mean_depth == pytest.approx((2 + 8 + 24) / 15)
+    assert stats.depth_percentile(0) == 0
+    assert stats.depth_percentile(50) == 3
+    assert stats.depth_percentile(100) == 3
+    assert treap.balance_factor() == 1.0
+
+
+def test_chain() -> None:
+    """Test stats and balance_factor on a degenerate chain."""
+
+    treap = build(range(100), DescendingPriorities())
+    stats = treap.stats()
+
+    assert stats.height == 100
+    assert stats.leaf_count == 1
+    assert stats.depth_counts == [1] * 100
+    assert stats.mean_depth == pytest.approx(49.5)
+    assert stats.depth_percentile(90) == 89
+    assert treap.balance_factor() == pytest.approx(100 / 7)
+
+
+def test_small_and_empty() -> None:
+    """Test stats and balance_factor on empty and single-node maps."""
+
+    empty = TreapMap()
+    assert empty.stats() == (0, 0, 0, 0.0, [])
+    assert empty.stats().depth_percentile(50) == 0
+    assert empty.stats().expected_depth == 0.0
+    assert empty.balance_factor() == 1.0
+
+    single = build([1], RandomPriorities(0))
+    assert single.stats() == (1, 1, 1, 0.0, [1])
+    assert single.balance_factor() == 1.0
+    with pytest.raises(ValueError):
+        single.stats().depth_percentile(101)
+
+
+def test_random_treap_is_near_expected_depth() -> None:
+    """Test that a random treap stays near the expected 2 ln n depth."""
+
+    treap = TreapMap.from_sorted(((i, i) for i in range(20000)),
+                                 priorities=RandomPriorities(3, bits=32))
+    stats = treap.stats()
+
+    assert sum(stats.depth_counts) == len(treap)
+    assert stats.height - 1 == max(d for d, c in enumerate(stats.depth_counts) if c)
+    assert stats.mean_depth < stats.expected_depth
+    assert stats.expected_depth == pytest.approx(2 * math.log(20000))
+    assert 1.0 < treap.balance_factor() < 3.0
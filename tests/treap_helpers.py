@@ -0,0 +1,63 @@
+"""Invariant checks, priority sources and builders shared by the tests."""
+
+from py_treaps.priorities import PrioritySource
+from py_treaps.treap_map import TreapMap
+
+
+def check_treap(treap: TreapMap) -> None:
+    """Check BST order, heap order, parent links and sizes of every node."""
+    assert treap.root is None or treap.root.parent is None
+    count = 0
+    stack = [(treap.root, None, None)]
+    while stack:
+        node, low, high = stack.pop()
+        if node is None:
+            continue
+        count += 1
+        assert low is None or low < node.key
+        assert high is None or node.key < high
+        size = 1
+        for child in (node.left_child, node.right_child):
+            if child is not None:
+                assert child.parent is node
+                assert child.priority <= node.priority
+                size += child.size
+        assert node.size == size
+        stack.append((node.left_child, low, node.key))
+        stack.append((node.right_child, node.key, high))
+    assert count == len(treap)
+
+
+class LowestBitPriorities(PrioritySource):
+    """Rank keys by their lowest set bit, so 1..2**k - 1 builds a perfect tree."""
+
+    max_priority = 10**9
+
+    def __call__(self, key) -> int:
+        return key & -key
+
+
+class DescendingPriorities(PrioritySource):
+    """Hand out ever smaller priorities, so sorted inserts build a chain."""
+
+    max_priority = 10**9
+
+    def __init__(self):
+        self.next = self.max_priority
+
+    def __call__(self, key) -> int:
+        self.next -= 1
+        return self.next
+
+
+def build_items(items, priorities=None) -> TreapMap:
+    """Insert (key, value) pairs one at a time into a new TreapMap."""
+    treap = TreapMap(priorities=priorities)
+    for key, value in items:
+        treap.insert(key, value)
+    return treap
+
+
+def build(keys, priorities=None) -> TreapMap:
+    """Insert keys one at a time into a new TreapMap, with str(key) as the value."""
+    return build_items(((key, str(key)) for key in keys), priorities)